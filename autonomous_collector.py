@@ -3,6 +3,7 @@ import pandas as pd
 import time
 import sys
 from datetime import datetime
+from src.floodlight_poller import poll_flows, snapshots_to_dataframe
 
 CONTROLLER = 'http://localhost:8080'
 
@@ -28,32 +29,13 @@ else:
 print("\n=== Starting Automated Data Collection ===\n")
 
 def collect_flows(label_name):
-    """Collect all flows and label them"""
+    """Collect all flows concurrently and label them"""
     try:
-        switches = requests.get(f'{CONTROLLER}/wm/core/controller/switches/json').json()
-        all_flows = []
-        
-        for switch in switches:
-            dpid = switch['switchDPID']
-            flows_resp = requests.get(f'{CONTROLLER}/wm/core/switch/{dpid}/flow/json')
-            flows_data = flows_resp.json()
-            
-            if dpid in flows_data:
-                for flow in flows_data[dpid]:
-                    match = flow.get('match', {})
-                    all_flows.append({
-                        'src_ip': match.get('ipv4_src', '0.0.0.0'),
-                        'dst_ip': match.get('ipv4_dst', '0.0.0.0'),
-                        'src_port': match.get('tp_src', 0),
-                        'dst_port': match.get('tp_dst', 0),
-                        'protocol': match.get('ip_proto', 0),
-                        'packet_count': flow.get('packetCount', 0),
-                        'byte_count': flow.get('byteCount', 0),
-                        'duration': flow.get('durationSeconds', 0),
-                        'label': label_name
-                    })
-        
-        return pd.DataFrame(all_flows)
+        snapshots = poll_flows(CONTROLLER)
+        for snap in snapshots:
+            if snap.error:
+                print(f"Error polling {snap.dpid}: {snap.error}")
+        return snapshots_to_dataframe(snapshots, label=label_name)
     except Exception as e:
         print(f"Error: {e}")
         return pd.DataFrame()
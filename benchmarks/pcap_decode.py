@@ -0,0 +1,153 @@
+"""
+PCAP Decoding Benchmark
+Generates a synthetic capture and reports packets/sec for the bulk header
+decoder against the scapy (pcap_to_csv), tshark field export and pyshark
+(pcap_to_features) extractors.
+
+    python -m benchmarks.pcap_decode --packets 10000000
+
+The capture uses the Linux cooked link type that `tcpdump -i any` (and so
+every capture script here) writes; --ethernet benchmarks Ethernet frames.
+The other extractors are timed on the first --sample / --pyshark-sample
+packets only; at their rates the full capture would take hours.
+
+Results with the defaults on one core (Python 3.11, NumPy 2.4; tshark and
+pyshark not installed):
+
+    bulk decoder (mmap/NumPy)      10,000,000 packets     35.85 s        278,935 pkt/s
+    scapy PcapReader                   95,005 packets     33.30 s          2,853 pkt/s
+                                 bulk decoder is 98x faster
+
+With --ethernet: 324,232 pkt/s bulk vs 3,079 pkt/s scapy (105x).
+"""
+import argparse
+import os
+import struct
+import sys
+import tempfile
+import time
+import numpy as np
+
+FRAME_LEN = 64
+
+def _frames(rng, n):
+    """n random 64-byte Ethernet frames: 60% TCP, 25% UDP, 10% ICMP, 5% ARP."""
+    frames = np.zeros((n, FRAME_LEN), dtype=np.uint8)
+    frames[:, 0:12] = rng.integers(0, 256, (n, 12), dtype=np.uint8)
+    kind = rng.choice(4, n, p=[0.60, 0.25, 0.10, 0.05])
+    ip = kind < 3
+    frames[:, 12] = 0x08
+
+    # IPv4: version 4, IHL 5, total length 50, TTL 64, 10.0.x.y addresses
+    frames[ip, 14] = 0x45
+    frames[ip, 16:18] = [0, FRAME_LEN - 14]
+    frames[ip, 22] = 64
+    frames[ip, 23] = np.array([6, 17, 1], dtype=np.uint8)[kind[ip]]
+    frames[ip, 26] = frames[ip, 30] = 10
+    frames[ip, 28:30] = rng.integers(0, 256, (ip.sum(), 2), dtype=np.uint8)
+    frames[ip, 32:34] = rng.integers(0, 256, (ip.sum(), 2), dtype=np.uint8)
+
+    tcp, udp = kind == 0, kind == 1
+    frames[tcp | udp, 34:38] = rng.integers(0, 256, ((tcp | udp).sum(), 4), dtype=np.uint8)
+    frames[tcp, 46] = 0x50
+    frames[tcp, 47] = rng.choice([0x02, 0x12, 0x10, 0x18, 0x11], tcp.sum())
+    frames[tcp, 48:50] = [0xFF, 0xFF]
+    frames[udp, 38:40] = [0, FRAME_LEN - 34]
+    frames[kind == 2, 34] = 8
+
+    # ARP request: Ethernet/IPv4, opcode 1
+    arp = kind == 3
+    frames[arp, 13] = 0x06
+    frames[arp, 14:22] = [0, 1, 8, 0, 6, 4, 0, 1]
+    frames[arp, 22:28] = frames[arp, 6:12]
+    frames[arp, 28:32] = [10, 0, 0, 1]
+    frames[arp, 38:42] = [10, 0, 0, 2]
+    return frames
+
+def _cooked(frames):
+    """Ethernet frames -> Linux cooked (SLL) frames as written by `tcpdump -i any`."""
+    out = np.zeros((len(frames), frames.shape[1] + 2), dtype=np.uint8)
+    out[:, 0:6] = [0, 0, 0, 1, 0, 6]
+    out[:, 6:12] = frames[:, 6:12]
+    out[:, 14:] = frames[:, 12:]
+    return out
+
+def write_synthetic_pcap(path, n_packets, seed=0, chunk=1_000_000, cooked=False):
+    """
+    Writes a little-endian microsecond pcap of n_packets random frames, 1 ms
+    apart; cooked=True writes the Linux cooked link type the capture scripts produce.
+    """
+    rng = np.random.default_rng(seed)
+    frame_len = FRAME_LEN + 2 if cooked else FRAME_LEN
+    record = np.dtype([('sec', '<u4'), ('usec', '<u4'), ('incl', '<u4'), ('orig', '<u4'),
+                       ('frame', 'u1', frame_len)])
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<IHHiIII', 0xA1B2C3D4, 2, 4, 0, 0, 65535, 113 if cooked else 1))
+        for start in range(0, n_packets, chunk):
+            n = min(chunk, n_packets - start)
+            recs = np.zeros(n, dtype=record)
+            t = np.arange(start, start + n, dtype=np.int64)
+            recs['sec'], recs['usec'] = t // 1000, (t % 1000) * 1000
+            recs['incl'] = recs['orig'] = frame_len
+            recs['frame'] = _cooked(_frames(rng, n)) if cooked else _frames(rng, n)
+            f.write(recs.tobytes())
+
+def _rate(name, fn):
+    start = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {count:>12,} packets {elapsed:>9.2f} s {count / elapsed:>14,.0f} pkt/s")
+    return count / elapsed
+
+def bench_bulk(path):
+    from src.pcap_decoder import iter_pcap_columns
+    return sum(len(cols['timestamp']) for cols in iter_pcap_columns(path))
+
+def bench_scapy(path):
+    from pcap_to_csv import iter_features
+    return sum(len(df) for df in iter_features(path, 0, fast=False))
+
+def bench_pyshark(path):
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'mininet_archive'))
+    import pcap_to_features
+    from pcap_to_features import PcapFeatureExtractor
+    if pcap_to_features.pyshark is None:
+        raise ImportError('pyshark is not installed')
+    return len(PcapFeatureExtractor(path, backend='pyshark').extract_features())
+
+def bench_tshark(path):
+    from src.tshark_export import iter_tshark_features, tshark_available
+    if not tshark_available():
+        raise ImportError('tshark is not on PATH')
+    return sum(len(df) for df in iter_tshark_features(path))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--packets', type=int, default=10_000_000)
+    parser.add_argument('--sample', type=int, default=100_000, help='packets timed with scapy')
+    parser.add_argument('--pyshark-sample', type=int, default=10_000, help='packets timed with pyshark')
+    parser.add_argument('--dir', default=tempfile.gettempdir())
+    parser.add_argument('--ethernet', action='store_true',
+                        help='Ethernet frames instead of the Linux cooked frames of `tcpdump -i any`')
+    args = parser.parse_args()
+
+    kind = 'ether' if args.ethernet else 'sll'
+    full = os.path.join(args.dir, f'bench_{kind}_{args.packets}.pcap')
+    sample = os.path.join(args.dir, f'bench_{kind}_{args.sample}.pcap')
+    small = os.path.join(args.dir, f'bench_{kind}_{args.pyshark_sample}.pcap')
+    for path, n in ((full, args.packets), (sample, args.sample), (small, args.pyshark_sample)):
+        if not os.path.exists(path):
+            write_synthetic_pcap(path, n, cooked=not args.ethernet)
+
+    bulk = _rate('bulk decoder (mmap/NumPy)', lambda: bench_bulk(full))
+    runs = (('scapy PcapReader', sample, bench_scapy), ('tshark field export', sample, bench_tshark),
+            ('pyshark JSON', small, bench_pyshark))
+    for name, path, fn in runs:
+        try:
+            rate = _rate(name, lambda: fn(path))
+            print(f"{'':<28} bulk decoder is {bulk / rate:,.0f}x faster")
+        except ImportError as e:
+            print(f"{name:<28} skipped ({e})")
+
+if __name__ == '__main__':
+    main()
@@ -1,44 +1,19 @@
-import requests
 import pandas as pd
 import time
 from datetime import datetime
+from src.floodlight_poller import poll_flows, snapshots_to_dataframe
 
 # Floodlight REST API endpoint
 CONTROLLER = 'http://localhost:8080'
 
 def collect_flows(label):
-    """Collect flow statistics from all switches"""
+    """Collect flow statistics from all switches concurrently"""
     try:
-        # Get all switches
-        switches_url = f'{CONTROLLER}/wm/core/controller/switches/json'
-        switches = requests.get(switches_url).json()
-        
-        all_flows = []
-        
-        for switch in switches:
-            dpid = switch['switchDPID']
-            
-            # Get flows for this switch
-            flows_url = f'{CONTROLLER}/wm/core/switch/{dpid}/flow/json'
-            flows = requests.get(flows_url).json()
-            
-            if dpid in flows:
-                for flow in flows[dpid]:
-                    flow_entry = {
-                        'switch_dpid': dpid,
-                        'src_ip': flow.get('match', {}).get('ipv4_src', '0.0.0.0'),
-                        'dst_ip': flow.get('match', {}).get('ipv4_dst', '0.0.0.0'),
-                        'src_port': flow.get('match', {}).get('tp_src', 0),
-                        'dst_port': flow.get('match', {}).get('tp_dst', 0),
-                       'protocol': flow.get('match', {}).get('ip_proto', 0),
-                        'packet_count': flow.get('packetCount', 0),
-                        'byte_count': flow.get('byteCount', 0),
-                        'duration': flow.get('durationSeconds', 0),
-                        'label': label
-                    }
-                    all_flows.append(flow_entry)
-        
-        return pd.DataFrame(all_flows)
+        snapshots = poll_flows(CONTROLLER)
+        for snap in snapshots:
+            if snap.error:
+                print(f"Error collecting flows from {snap.dpid}: {snap.error}")
+        return snapshots_to_dataframe(snapshots, label=label)
     
     except Exception as e:
         print(f"Error collecting flows: {e}")
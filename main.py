@@ -1,7 +1,8 @@
+import argparse
 import pandas as pd
 import os
-from src.data_processing import load_data, preprocess_sdn_data, split_data, get_ip_frequency
-from src.models import get_models, train_model
+from src.data_processing import load_data, preprocess_sdn_data, split_data, get_ip_frequency, SDNPreprocessor, file_hash
+from src.models import get_models, train_model, train_models_parallel
 from src.evaluation import evaluate_model, print_evaluation
 from src.visualization import (
     plot_roc_curves, plot_feature_importance, 
@@ -9,8 +10,11 @@ from src.visualization import (
     plot_scatter_matrix
 )
 from src.eda import comprehensive_eda
+from src.registry import ModelRegistry
+from src.cascade import build_cascade, cascade_report, print_cascade_report
 
-def run_pipeline(csv_path, dataset_name="SDN Data"):
+def run_pipeline(csv_path, dataset_name="SDN Data", parallel=False, core_budget=None, registry_dir=None,
+                 cascade_band=None):
     print(f"\n{'='*60}")
     print(f"ML Pipeline for: {dataset_name}")
     print(f"{'='*60}\n")
@@ -46,11 +50,15 @@ def run_pipeline(csv_path, dataset_name="SDN Data"):
     if 'ABF' in df.columns:
         feature_set = ['Time', 'Source', 'Destination', 'Protocol', 'Length']
         label_col = 'ABF'
+        # Source/Destination mix MAC and IPv4 addresses, so keep them ordinal
+        ip_encoding = 'ordinal'
     else:
         feature_set = None
         label_col = 'label'
+        ip_encoding = 'uint32'
         
-    X, y, feature_names = preprocess_sdn_data(df, feature_set=feature_set, label_column=label_col)
+    preprocessor = SDNPreprocessor(feature_set, label_column=label_col, ip_encoding=ip_encoding)
+    X, y, feature_names = preprocess_sdn_data(df, preprocessor=preprocessor)
     X_train, X_test, y_train, y_test = split_data(X, y)
 
     # Step 5: Model Training and Evaluation
@@ -60,10 +68,17 @@ def run_pipeline(csv_path, dataset_name="SDN Data"):
     metrics_log = {}
     models_probs = {}
 
+    if parallel:
+        print(f"Training {len(models)} models in parallel (core budget: {core_budget or os.cpu_count()})...")
+        trained_models = train_models_parallel(models, X_train, y_train, core_budget=core_budget)
+
     for name, model in models.items():
-        print(f"Training {name}...")
-        trained_model = train_model(model, X_train, y_train)
-        trained_models[name] = trained_model
+        if parallel:
+            trained_model = trained_models[name]
+        else:
+            print(f"Training {name}...")
+            trained_model = train_model(model, X_train, y_train)
+            trained_models[name] = trained_model
         
         metrics = evaluate_model(trained_model, X_test, y_test, X_train, y_train)
         metrics_log[name] = metrics
@@ -71,6 +86,18 @@ def run_pipeline(csv_path, dataset_name="SDN Data"):
         
         print_evaluation(name, metrics)
 
+    if cascade_band and {"naive_bayes", "random_forest"} <= set(trained_models):
+        cascade = build_cascade(trained_models, band=cascade_band)
+        print_cascade_report(cascade_report(cascade, X_test, y_test))
+
+    if registry_dir:
+        registry = ModelRegistry(registry_dir)
+        dataset_hash = file_hash(csv_path)
+        for name, trained_model in trained_models.items():
+            version = registry.save(name, trained_model, preprocessor=preprocessor,
+                                    metrics=metrics_log[name], dataset_hash=dataset_hash)
+            print(f"Saved {name} to registry: {registry_dir}/{name}/{version}")
+
     # Step 6: Results Visualization
     print("\nStep 6: Visualizing Model Performance...")
     
@@ -89,10 +116,20 @@ def run_pipeline(csv_path, dataset_name="SDN Data"):
     print(f"  - Model plots saved to: plots/")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SDN ML pipeline")
+    parser.add_argument("--parallel", action="store_true", help="train models concurrently in a process pool")
+    parser.add_argument("--cores", type=int, default=None, help="total core budget for parallel training")
+    parser.add_argument("--registry", default=None, help="directory to save trained models in (e.g. models)")
+    parser.add_argument("--cascade", type=float, nargs=2, metavar=("LOW", "HIGH"), default=None,
+                        help="also report naive_bayes -> random_forest cascade scoring with this uncertainty band")
+    args = parser.parse_args()
+
     # Process main dataset
     if os.path.exists("dataset_sdn.csv"):
-        run_pipeline("dataset_sdn.csv", "Primary Dataset")
+        run_pipeline("dataset_sdn.csv", "Primary Dataset", parallel=args.parallel, core_budget=args.cores,
+                     registry_dir=args.registry, cascade_band=args.cascade)
     
     # Process second dataset if exists
     if os.path.exists("Finalv3.csv"):
-        run_pipeline("Finalv3.csv", "Secondary Dataset")
+        run_pipeline("Finalv3.csv", "Secondary Dataset", parallel=args.parallel, core_budget=args.cores,
+                     registry_dir=args.registry, cascade_band=args.cascade)
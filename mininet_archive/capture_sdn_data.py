@@ -6,10 +6,14 @@ Captures flow statistics from Floodlight controller for ML analysis
 
 import requests
 import json
-import csv
+import os
+import sys
 import time
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.flow_sink import FlowSink
+
 class FloodlightDataCollector:
     def __init__(self, controller_ip="192.168.1.16", controller_port=8080):
         self.base_url = f"http://{controller_ip}:{controller_port}/wm"
@@ -81,74 +85,52 @@ class FloodlightDataCollector:
         
         return flow_records
     
-    def save_to_csv(self, records, filename='sdn_flow_data.csv'):
-        """Save flow records to CSV file"""
+    def save_records(self, sink, records):
+        """Queue flow records on the columnar sink"""
         if not records:
             print("[!] No records to save")
             return
         
-        # Define CSV headers
-        headers = [
-            'timestamp', 'switch', 'priority', 'duration_sec', 
-            'idle_timeout', 'hard_timeout', 'packet_count', 'byte_count',
-            'table_id', 'in_port', 'dl_src', 'dl_dst', 'dl_type',
-            'nw_src', 'nw_dst', 'nw_proto', 'tp_src', 'tp_dst', 'action'
-        ]
-        
-        # Check if file exists to determine if we need to write headers
-        try:
-            with open(filename, 'r'):
-                write_header = False
-        except FileNotFoundError:
-            write_header = True
-        
-        # Write to CSV
-        with open(filename, 'a', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=headers)
-            
-            if write_header:
-                writer.writeheader()
-            
-            writer.writerows(records)
-        
-        print(f"[+] Saved {len(records)} flow records to {filename}")
+        sink.write(records)
+        print(f"[+] Queued {len(records)} flow records for {sink.directory}")
     
-    def collect_continuously(self, interval=10, duration=300, output_file='sdn_flow_data.csv'):
+    def collect_continuously(self, interval=10, duration=300, output_dir='sdn_flow_data'):
         """
         Continuously collect flow data
         
         Args:
             interval: Collection interval in seconds
             duration: Total collection duration in seconds
-            output_file: Output CSV filename
+            output_dir: Directory for the Parquet flow files
         """
         print(f"[*] Starting continuous data collection")
         print(f"[*] Interval: {interval} seconds")
         print(f"[*] Duration: {duration} seconds")
-        print(f"[*] Output: {output_file}")
+        print(f"[*] Output: {output_dir}")
         
         start_time = time.time()
         collection_count = 0
         
-        while (time.time() - start_time) < duration:
-            # Fetch flows
-            flows = self.get_flows()
-            
-            if flows:
-                # Parse and save
-                records = self.parse_flow_data(flows)
-                self.save_to_csv(records, output_file)
+        with FlowSink(output_dir) as sink:
+            while (time.time() - start_time) < duration:
+                # Fetch flows
+                flows = self.get_flows()
                 
-                collection_count += 1
-                print(f"[+] Collection #{collection_count}: {len(records)} flows captured")
-            else:
-                print(f"[!] No flows retrieved at collection #{collection_count + 1}")
-            
-            # Wait for next interval
-            time.sleep(interval)
+                if flows:
+                    # Parse and save
+                    records = self.parse_flow_data(flows)
+                    self.save_records(sink, records)
+                    
+                    collection_count += 1
+                    print(f"[+] Collection #{collection_count}: {len(records)} flows captured")
+                else:
+                    print(f"[!] No flows retrieved at collection #{collection_count + 1}")
+                
+                # Wait for next interval
+                time.sleep(interval)
         
         print(f"\n[✓] Data collection completed: {collection_count} collections")
-        print(f"[✓] Data saved to: {output_file}")
+        print(f"[✓] Data saved to: {output_dir}")
 
 def main():
     print("=== SDN Flow Data Collector ===\n")
@@ -178,7 +160,7 @@ def main():
         collector.collect_continuously(
             interval=10,      # Collect every 10 seconds
             duration=300,     # Run for 5 minutes
-            output_file='sdn_attack_dataset.csv'
+            output_dir='sdn_attack_dataset'
         )
     except KeyboardInterrupt:
         print("\n[!] Collection stopped by user")
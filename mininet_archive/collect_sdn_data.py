@@ -12,12 +12,16 @@ import os
 import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.flow_deltas import FlowDeltaEngine, DELTA_COLUMNS
+
 class RobustSDNCollector:
     def __init__(self, controller_ip="localhost", controller_port=8080):
         self.controller_ip = controller_ip
         self.controller_port = controller_port
         self.base_url = f"http://{controller_ip}:{controller_port}/wm"
         self.dataset_dir = "ml_dataset"
+        self.deltas = FlowDeltaEngine(idle_timeout=60)
         os.makedirs(self.dataset_dir, exist_ok=True)
         
     def cleanup_containers(self):
@@ -83,16 +87,27 @@ class RobustSDNCollector:
             pass
         return None
     
-    def flows_to_dataframe(self, flows):
-        """Convert flow statistics to DataFrame"""
+    def flows_to_dataframe(self, flows, changed_only=True):
+        """
+        Convert flow statistics to DataFrame with per-interval rates.
+        With changed_only, flows whose counters did not move since the last
+        snapshot are left out, since they carry no new information.
+        """
         records = []
+        now = datetime.now()
+        timestamp = now.timestamp()
         
         for switch_dpid, switch_flows in flows.items():
-            for flow in switch_flows:
+            if isinstance(switch_flows, dict):
+                switch_flows = switch_flows.get('flows', [])
+            deltas = self.deltas.update(switch_dpid, switch_flows, timestamp)
+            for i, flow in enumerate(switch_flows):
+                if changed_only and not deltas['new'][i] and deltas['packet_delta'][i] == 0:
+                    continue
                 match = flow.get('match', {})
                 
                 record = {
-                    'timestamp': datetime.now().isoformat(),
+                    'timestamp': now.isoformat(),
                     'switch': switch_dpid,
                     'priority': flow.get('priority', 0),
                     'duration_sec': flow.get('durationSeconds', 0),
@@ -108,6 +123,8 @@ class RobustSDNCollector:
                     'tp_dst': match.get('transportDestination', ''),
                     'action': str(flow.get('actions', 'DROP'))
                 }
+                for column in DELTA_COLUMNS:
+                    record[column] = deltas[column][i]
                 records.append(record)
         
         return pd.DataFrame(records)
@@ -4,22 +4,48 @@ PCAP to Feature Extraction for ML
 Converts captured PCAP files to feature-rich CSV for machine learning
 """
 
-import pyshark
+import argparse
+try:
+    import pyshark
+except ImportError:  # the tshark backend does not need it
+    pyshark = None
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 import os
 import sys
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.flow_aggregator import pcap_to_flows
+from src.tshark_export import read_tshark_features, tshark_available
+
 class PcapFeatureExtractor:
-    def __init__(self, pcap_file):
+    def __init__(self, pcap_file, backend='auto'):
+        """
+        backend: 'tshark' exports only the needed fields in one tab-separated
+        stream (src/tshark_export.py); 'pyshark' decodes every packet to JSON.
+        'auto' picks tshark whenever it is on PATH.
+        """
         self.pcap_file = pcap_file
         self.features = []
+        if backend == 'auto':
+            backend = 'tshark' if tshark_available() else 'pyshark'
+        self.backend = backend
         
     def extract_features(self):
         """Extract ML features from PCAP file"""
         print(f"[*] Processing: {os.path.basename(self.pcap_file)}")
         
+        if self.backend == 'tshark':
+            try:
+                df = read_tshark_features(self.pcap_file)
+                print(f"  [✓] Extracted features from {len(df)} packets")
+                return df
+            except (OSError, RuntimeError) as e:
+                print(f"  [!] Error processing PCAP: {e}")
+                return pd.DataFrame()
+        
         try:
             # Load PCAP file
             cap = pyshark.FileCapture(self.pcap_file, use_json=True, include_raw=True)
@@ -115,8 +141,88 @@ class PcapFeatureExtractor:
         except Exception as e:
             return None
 
-def process_all_pcaps(input_dir, output_dir):
-    """Process all PCAP files in directory"""
+def label_features(df, pcap_file):
+    """Tag rows with label / attack_type based on the capture's filename"""
+    name = pcap_file.lower()
+    if 'attack' in name:
+        df['label'] = 'attack'
+        if 'hijack' in name:
+            df['attack_type'] = 'host_hijack'
+        elif 'fabrication' in name:
+            df['attack_type'] = 'link_fabrication'
+        elif 'ddos' in name:
+            df['attack_type'] = 'ddos'
+        else:
+            df['attack_type'] = 'unknown'
+    else:
+        df['label'] = 'normal'
+        df['attack_type'] = 'none'
+    return df
+
+def shard_path(output_dir, pcap_file, flows=False):
+    """Parquet shard written for one input capture"""
+    suffix = '_flows.parquet' if flows else '_features.parquet'
+    return os.path.join(output_dir, pcap_file[:-len('.pcap')] + suffix)
+
+def is_up_to_date(pcap_path, output_file):
+    """True if output_file exists and is at least as new as its input"""
+    return os.path.exists(output_file) and os.path.getmtime(output_file) >= os.path.getmtime(pcap_path)
+
+def convert_pcap(pcap_path, output_file, flows=False, backend='auto'):
+    """
+    Converts one capture into a labelled Parquet shard and returns its row count.
+    Captures without packets still get an (empty) shard so resumed runs skip them.
+    """
+    if flows:
+        df = pcap_to_flows(pcap_path)
+    else:
+        df = PcapFeatureExtractor(pcap_path, backend).extract_features()
+    label_features(df, os.path.basename(pcap_path))
+    tmp_file = output_file + '.tmp'
+    df.to_parquet(tmp_file, index=False)
+    os.replace(tmp_file, output_file)
+    return len(df)
+
+def process_all_pcaps_parallel(input_dir, output_dir, workers=None, flows=False, force=False, backend='auto'):
+    """
+    Converts every capture in input_dir concurrently in a process pool, one
+    Parquet shard per input. Inputs whose shard is newer than the capture are
+    skipped unless force=True, so an interrupted run resumes where it stopped.
+    Returns {pcap_file: row count} for the files converted in this run.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    pcap_files = sorted(f for f in os.listdir(input_dir) if f.endswith('.pcap'))
+    jobs = {f: shard_path(output_dir, f, flows) for f in pcap_files}
+    pending = {f: out for f, out in jobs.items()
+               if force or not is_up_to_date(os.path.join(input_dir, f), out)}
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pending) or 1))
+
+    print(f"\n=== PCAP Feature Extraction ({workers} workers) ===")
+    print(f"Input Directory: {input_dir}")
+    print(f"Output Directory: {output_dir}")
+    print(f"Files to process: {len(pending)} ({len(jobs) - len(pending)} up to date)\n")
+
+    rows = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(convert_pcap, os.path.join(input_dir, f), out, flows, backend): f
+                   for f, out in pending.items()}
+        for future in as_completed(futures):
+            pcap_file = futures[future]
+            try:
+                rows[pcap_file] = future.result()
+                print(f"  [✓] {os.path.basename(pending[pcap_file])} ({rows[pcap_file]} records)")
+            except Exception as e:
+                print(f"  [!] Failed {pcap_file}: {e}")
+
+    print("\n=== Feature Extraction Complete ===\n")
+    return rows
+
+def process_all_pcaps(input_dir, output_dir, flows=False, backend='auto'):
+    """
+    Process all PCAP files in directory.
+    With flows=True each output row is a bidirectional flow record
+    (src/flow_aggregator.py) instead of a single packet.
+    """
     
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
@@ -132,42 +238,41 @@ def process_all_pcaps(input_dir, output_dir):
         pcap_path = os.path.join(input_dir, pcap_file)
         
         # Extract features
-        extractor = PcapFeatureExtractor(pcap_path)
-        df = extractor.extract_features()
+        if flows:
+            print(f"[*] Aggregating flows: {pcap_file}")
+            df = pcap_to_flows(pcap_path)
+        else:
+            extractor = PcapFeatureExtractor(pcap_path, backend)
+            df = extractor.extract_features()
         
         if not df.empty:
-            # Add label based on filename
-            if 'attack' in pcap_file.lower():
-                df['label'] = 'attack'
-                if 'hijack' in pcap_file.lower():
-                    df['attack_type'] = 'host_hijack'
-                elif 'fabrication' in pcap_file.lower():
-                    df['attack_type'] = 'link_fabrication'
-                elif 'ddos' in pcap_file.lower():
-                    df['attack_type'] = 'ddos'
-                else:
-                    df['attack_type'] = 'unknown'
-            else:
-                df['label'] = 'normal'
-                df['attack_type'] = 'none'
+            label_features(df, pcap_file)
             
             # Save to CSV
-            output_file = os.path.join(output_dir, pcap_file.replace('.pcap', '_features.csv'))
+            suffix = '_flows.csv' if flows else '_features.csv'
+            output_file = os.path.join(output_dir, pcap_file.replace('.pcap', suffix))
             df.to_csv(output_file, index=False)
             print(f"  [✓] Saved: {os.path.basename(output_file)} ({len(df)} records)\n")
     
     print("=== Feature Extraction Complete ===\n")
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        input_dir = sys.argv[1]
-    else:
-        input_dir = "captured_traffic"
+    parser = argparse.ArgumentParser(description='Convert captured PCAP files to ML features')
+    parser.add_argument('input_dir', nargs='?', default='captured_traffic')
+    parser.add_argument('--flows', action='store_true', help='one row per bidirectional flow')
+    parser.add_argument('--workers', type=int, help='convert files in a process pool, one Parquet shard each')
+    parser.add_argument('--force', action='store_true', help='reconvert shards that are already up to date')
+    parser.add_argument('--backend', choices=['auto', 'tshark', 'pyshark'], default='auto')
+    args = parser.parse_args()
     
     output_dir = "ml_dataset"
     
     try:
-        process_all_pcaps(input_dir, output_dir)
+        if args.workers:
+            process_all_pcaps_parallel(args.input_dir, output_dir, args.workers, args.flows, args.force,
+                                       args.backend)
+        else:
+            process_all_pcaps(args.input_dir, output_dir, flows=args.flows, backend=args.backend)
     except Exception as e:
         print(f"[!] Error: {e}")
         print("\nNote: This script requires pyshark. Install with:")
@@ -16,6 +16,9 @@ import sys
 from datetime import datetime
 import threading
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.flow_sink import FlowSink, load_flows
+
 class ProductionSDNCollector:
     def __init__(self):
         self.controller_ip = "localhost"
@@ -90,8 +93,8 @@ class ProductionSDNCollector:
                 })
         return pd.DataFrame(records)
     
-    def collect_data_thread(self, duration, data_list):
-        """Background thread to collect data"""
+    def collect_data_thread(self, duration, sink):
+        """Background thread to collect data into the flow sink"""
         self.collecting = True
         end_time = time.time() + duration
         round_num = 0
@@ -102,7 +105,7 @@ class ProductionSDNCollector:
                 df = self.flows_to_df(flows)
                 if not df.empty:
                     df['round'] = round_num
-                    data_list.append(df)
+                    sink.write(df)
                     print(f"    • Round {round_num + 1}: {len(df)} flows")
                     round_num += 1
             time.sleep(3)  # Collect every 3 seconds
@@ -133,16 +136,17 @@ EOF
         time.sleep(15)
         print("  - Network active, collecting data...")
         
-        # Start data collection in background
-        collected_data = []
-        collector_thread = threading.Thread(
-            target=self.collect_data_thread,
-            args=(duration - 15, collected_data)
-        )
-        collector_thread.start()
-        
-        # Wait for collection to complete
-        collector_thread.join()
+        # Start data collection in background; rounds stream to disk as they arrive
+        flows_dir = os.path.join(self.dataset_dir, f"flows_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        with FlowSink(flows_dir) as sink:
+            collector_thread = threading.Thread(
+                target=self.collect_data_thread,
+                args=(duration - 15, sink)
+            )
+            collector_thread.start()
+            
+            # Wait for collection to complete
+            collector_thread.join()
         
         # Stop Mininet
         try:
@@ -153,9 +157,9 @@ EOF
         
         print(f"  ✓ Simulation complete")
         
-        # Combine data
-        if collected_data:
-            df = pd.concat(collected_data, ignore_index=True)
+        # Load the collected row groups back
+        df = load_flows(flows_dir)
+        if not df.empty:
             print(f"  ✓ Collected {len(df)} total flow records")
             return df
         else:
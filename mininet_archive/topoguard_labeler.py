@@ -4,10 +4,13 @@ TopoGuard-Based Ground Truth Labeler
 Uses TopoGuard security alerts to label flows with validated ground truth
 """
 
+import numpy as np
 import pandas as pd
-import re
-from datetime import datetime, timedelta
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.floodlight_log import ATTACK_PATTERNS, iter_alerts, follow
 
 class TopoGuardLabeler:
     def __init__(self, log_file=None):
@@ -18,54 +21,30 @@ class TopoGuardLabeler:
             log_file: Path to Floodlight log file (or capture from running instance)
         """
         self.log_file = log_file
-        self.topoguard_patterns = {
-            'host_hijack': r'Host location hijacking detected|Suspicious host migration|MAC address conflict',
-            'link_fabrication': r'Link fabrication detected|Fake LLDP packet|Topology poisoning',
-            'port_migration': r'Rapid port migration|Port flapping detected',
-            'unauthorized_switch': r'Unauthorized switch connection|Unknown switch DPID'
-        }
+        self.topoguard_patterns = ATTACK_PATTERNS
     
     def parse_topoguard_alerts(self, log_content):
         """
         Parse TopoGuard security alerts from log content
         
+        Args:
+            log_content: Log text, or any iterable of log lines (e.g. an open file)
+        
         Returns:
             List of alert events with timestamps and types
         """
-        alerts = []
-        
-        for line in log_content.split('\n'):
-            # Parse timestamp from Floodlight log format
-            # Format: HH:MM:SS.mmm LEVEL [Class:Thread] Message
-            timestamp_match = re.match(r'^(\d{2}:\d{2}:\d{2}\.\d{3})\s+(\w+)\s+\[(.*?)\]\s+(.*)', line)
-            
-            if timestamp_match:
-                time_str, level, source, message = timestamp_match.groups()
-                
-                # Check if this is a TopoGuard alert
-                if 'TopoloyUpdateChecker' in source or 'TopoGuard' in source:
-                    
-                    # Classify attack type
-                    attack_type = 'unknown'
-                    for alert_type, pattern in self.topoguard_patterns.items():
-                        if re.search(pattern, message, re.IGNORECASE):
-                            attack_type = alert_type
-                            break
-                    
-                    # If we found any security-related keyword, it's an alert
-                    security_keywords = ['detected', 'suspicious', 'attack', 'unauthorized', 
-                                       'fabrication', 'hijacking', 'poisoning']
-                    
-                    if any(kw in message.lower() for kw in security_keywords):
-                        alerts.append({
-                            'timestamp': time_str,
-                            'level': level,
-                            'source': source,
-                            'attack_type': attack_type,
-                            'message': message
-                        })
+        if isinstance(log_content, str):
+            log_content = log_content.split('\n')
+        return list(iter_alerts(log_content))
+    
+    def follow_logs(self, log_file_path, callback, from_start=False):
+        """
+        Tail a live Floodlight log, calling callback(alert) for each new alert
         
-        return alerts
+        Returns:
+            The running LogTailer; call .stop() to end it
+        """
+        return follow(log_file_path, callback, from_start=from_start)
     
     def label_flows_from_logs(self, flows_df, log_file_path):
         """
@@ -80,10 +59,10 @@ class TopoGuardLabeler:
         """
         print(f"\n[TopoGuard Labeler] Reading logs from: {log_file_path}")
         
-        # Read log file
+        # Stream the log file line by line
         try:
             with open(log_file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                log_content = f.read()
+                alerts = self.parse_topoguard_alerts(f)
         except FileNotFoundError:
             print(f"  ! Log file not found: {log_file_path}")
             print("  ! Labeling all flows as normal (0)")
@@ -91,8 +70,6 @@ class TopoGuardLabeler:
             flows_df['attack_type'] = 'normal'
             return flows_df
         
-        # Parse alerts
-        alerts = self.parse_topoguard_alerts(log_content)
         print(f"  ✓ Found {len(alerts)} TopoGuard alerts")
         
         if len(alerts) > 0:
@@ -100,24 +77,8 @@ class TopoGuardLabeler:
             for alert in alerts:
                 print(f"    - {alert['timestamp']}: {alert['attack_type']} ({alert['level']})")
         
-        # Initialize all flows as normal
-        flows_df['label'] = 0
-        flows_df['attack_type'] = 'normal'
-        
-        # Label flows that coincide with alerts
-        for alert in alerts:
-            alert_time = self._parse_time(alert['timestamp'])
-            
-            # Label flows within ±10 seconds of alert as attacks
-            for idx, row in flows_df.iterrows():
-                flow_time = self._parse_timestamp(row['timestamp'])
-                
-                if flow_time and alert_time:
-                    time_diff = abs((flow_time - alert_time).total_seconds())
-                    
-                    if time_diff <= 10:  # Within 10 seconds
-                        flows_df.at[idx, 'label'] = 1
-                        flows_df.at[idx, 'attack_type'] = alert['attack_type']
+        # Label flows that coincide with alerts (within ±10 seconds)
+        flows_df = self.label_flows(flows_df, alerts, window=10)
         
         # Summary
         normal_count = len(flows_df[flows_df['label'] == 0])
@@ -129,19 +90,72 @@ class TopoGuardLabeler:
         
         return flows_df
     
-    def _parse_time(self, time_str):
-        """Parse HH:MM:SS.mmm format"""
-        try:
-            return datetime.strptime(time_str, "%H:%M:%S.%f")
-        except:
-            return None
+    @staticmethod
+    def flow_times_ns(timestamps):
+        """
+        Flow timestamps as int64 nanoseconds, parsed once for the whole column.
+        Accepts ISO strings (timezone offsets are dropped, keeping wall-clock time
+        to match the controller log), epoch seconds or epoch nanoseconds.
+        Unparseable values become -1.
+        """
+        if pd.api.types.is_numeric_dtype(timestamps):
+            values = pd.to_numeric(timestamps, errors='coerce').to_numpy(dtype=np.float64)
+            ns = np.where(values > 1e14, values, values * 1e9)
+            return np.where(np.isnan(ns), -1, ns).astype(np.int64)
+        # Drop UTC offsets so times stay on the controller log's wall clock
+        local = pd.Series(timestamps).astype(str).str.replace(r'(?:Z|[+-]\d{2}:?\d{2})$', '', regex=True)
+        parsed = pd.to_datetime(local, errors='coerce', format='ISO8601')
+        ns = parsed.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        return np.where(pd.isna(parsed).to_numpy(), -1, ns)
     
-    def _parse_timestamp(self, timestamp_str):
-        """Parse ISO format timestamp"""
-        try:
-            return datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-        except:
-            return None
+    @staticmethod
+    def alert_times_ns(alerts, anchor_ns):
+        """
+        Alert HH:MM:SS.mmm times as int64 nanoseconds on the day of anchor_ns.
+        Logs are chronological, so a time earlier than the previous alert's
+        means the log crossed midnight and moves to the next day.
+        """
+        day_ns = 86400 * 10**9
+        tod = pd.to_timedelta([a['timestamp'] for a in alerts], errors='coerce').to_numpy(dtype='timedelta64[ns]')
+        valid = ~np.isnat(tod)
+        tod = tod.astype(np.int64)
+        rollover = np.cumsum(np.r_[False, np.diff(np.where(valid, tod, 0)) < 0])
+        times = anchor_ns - anchor_ns % day_ns + tod + rollover * day_ns
+        return np.where(valid, times, -1)
+    
+    def label_flows(self, flows_df, alerts, window=10, time_column='timestamp'):
+        """
+        Interval join of flows against alert windows [t - window, t + window].
+        Flow times are parsed once, alerts are sorted, and each flow finds its
+        covering alert with one searchsorted: O((flows + alerts) log alerts).
+        When windows overlap, the latest alert wins (the log-order tie-break
+        of the original per-alert loop), so the result is deterministic.
+        """
+        flows_df['label'] = 0
+        flows_df['attack_type'] = 'normal'
+        if not alerts or time_column not in flows_df.columns or flows_df.empty:
+            return flows_df
+        
+        flow_ns = self.flow_times_ns(flows_df[time_column])
+        known = flow_ns >= 0
+        if not known.any():
+            return flows_df
+        alert_ns = self.alert_times_ns(alerts, flow_ns[known].min())
+        types = np.array([a['attack_type'] for a in alerts], dtype=object)
+        keep = alert_ns >= 0
+        order = np.argsort(alert_ns[keep], kind='stable')
+        alert_ns, types = alert_ns[keep][order], types[keep][order]
+        if not len(alert_ns):
+            return flows_df
+        
+        window_ns = int(window * 1e9)
+        idx = np.searchsorted(alert_ns, flow_ns + window_ns, side='right') - 1
+        hit = known & (idx >= 0)
+        hit[hit] = alert_ns[idx[hit]] >= flow_ns[hit] - window_ns
+        
+        flows_df['label'] = hit.astype(int)
+        flows_df['attack_type'] = np.where(hit, types[np.maximum(idx, 0)], 'normal')
+        return flows_df
 
 def label_with_topoguard(flow_csv, log_file, output_csv=None):
     """
@@ -251,8 +265,6 @@ def capture_live_logs_and_label():
     label_with_topoguard(latest_flow, log_file)
 
 if __name__ == "__main__":
-    import sys
-    
     if len(sys.argv) == 3:
         # Command line usage
         flow_csv = sys.argv[1]
@@ -1,71 +1,158 @@
-from scapy.all import rdpcap, IP, TCP, UDP, ICMP
+from scapy.all import PcapReader, IP, TCP, UDP, ICMP
+import numpy as np
 import pandas as pd
+import argparse
 import os
+from src.flow_aggregator import iter_pcap_flows
+from src.pcap_decoder import iter_pcap_columns, uint32_to_ipv4, ETH_IPV4
+
+# str(scapy FlagValue) for every 9-bit TCP flag combination, e.g. 0x12 -> 'SA'
+TCP_FLAG_NAMES = np.array([''.join(c for i, c in enumerate('FSRPAUECN') if v >> i & 1)
+                           for v in range(512)], dtype=object)
+
+def packet_features(pkt, label):
+    """Feature dict for one IP packet"""
+    feature = {
+        'src_ip': pkt[IP].src,
+        'dst_ip': pkt[IP].dst,
+        'protocol': pkt[IP].proto,
+        'packet_len': len(pkt),
+        'ttl': pkt[IP].ttl,
+        'src_port': 0,
+        'dst_port': 0,
+        'label': label
+    }
+
+    if TCP in pkt:
+        feature['src_port'] = pkt[TCP].sport
+        feature['dst_port'] = pkt[TCP].dport
+        feature['flags'] = pkt[TCP].flags
+    elif UDP in pkt:
+        feature['src_port'] = pkt[UDP].sport
+        feature['dst_port'] = pkt[UDP].dport
+        feature['flags'] = 0
+    else:
+        feature['flags'] = 0
+
+    return feature
+
+def columns_to_features(cols, label):
+    """packet_features() columns for the IPv4 frames of a bulk-decoded batch"""
+    ip = cols['eth_type'] == ETH_IPV4
+    # Like scapy, only first fragments carry a TCP header
+    tcp = (cols['ip_proto'][ip] == 6) & (cols['ip_frag_offset'][ip] == 0)
+    flags = np.where(tcp, TCP_FLAG_NAMES[cols['tcp_flags'][ip]], 0)
+    return pd.DataFrame({
+        'src_ip': uint32_to_ipv4(cols['ip_src'][ip]),
+        'dst_ip': uint32_to_ipv4(cols['ip_dst'][ip]),
+        'protocol': cols['ip_proto'][ip],
+        'packet_len': cols['caplen'][ip],
+        'ttl': cols['ip_ttl'][ip],
+        'src_port': cols['tcp_srcport'][ip] | cols['udp_srcport'][ip],
+        'dst_port': cols['tcp_dstport'][ip] | cols['udp_dstport'][ip],
+        'label': label,
+        'flags': flags
+    })
+
+def iter_features(pcap_file, label, batch_size=50000, fast=True):
+    """
+    Stream network features from a pcap file as DataFrames of up to batch_size
+    packets. Classic Ethernet and Linux cooked (tcpdump -i any) pcaps go through
+    the bulk header decoder; other formats (pcapng, other link types) fall back
+    to PcapReader, which decodes one frame at a time. Either way memory is
+    bounded by the batch size rather than the capture size.
+    """
+    if not os.path.exists(pcap_file):
+        print(f"File not found: {pcap_file}")
+        return
+
+    if fast:
+        try:
+            batches = iter_pcap_columns(pcap_file, chunk_packets=batch_size)
+            first = next(batches, None)
+        except ValueError as e:
+            print(f"  {e}; decoding packet by packet")
+        else:
+            if first is not None:
+                yield columns_to_features(first, label)
+            for cols in batches:
+                yield columns_to_features(cols, label)
+            return
+
+    features = []
+    with PcapReader(pcap_file) as reader:
+        for pkt in reader:
+            if IP in pkt:
+                features.append(packet_features(pkt, label))
+                if len(features) >= batch_size:
+                    yield pd.DataFrame(features)
+                    features = []
+
+    if features:
+        yield pd.DataFrame(features)
 
 def extract_features(pcap_file, label):
     """Extract network features from pcap file"""
     print(f"Processing {pcap_file}...")
-    
+    batches = list(iter_features(pcap_file, label))
+    return pd.concat(batches, ignore_index=True) if batches else pd.DataFrame()
+
+def iter_flow_features(pcap_file, label):
+    """Stream bidirectional flow records (one row per flow) from a pcap file"""
     if not os.path.exists(pcap_file):
         print(f"File not found: {pcap_file}")
-        return pd.DataFrame()
-    
-    packets = rdpcap(pcap_file)
-    features = []
-    
-    for pkt in packets:
-        if IP in pkt:
-            feature = {
-                'src_ip': pkt[IP].src,
-                'dst_ip': pkt[IP].dst,
-                'protocol': pkt[IP].proto,
-                'packet_len': len(pkt),
-                'ttl': pkt[IP].ttl,
-                'src_port': 0,
-                'dst_port': 0,
-                'label': label
-            }
-            
-            if TCP in pkt:
-                feature['src_port'] = pkt[TCP].sport
-                feature['dst_port'] = pkt[TCP].dport
-                feature['flags'] = pkt[TCP].flags
-            elif UDP in pkt:
-                feature['src_port'] = pkt[UDP].sport
-                feature['dst_port'] = pkt[UDP].dport
-                feature['flags'] = 0
-            else:
-                feature['flags'] = 0
-                
-            features.append(feature)
-    
-    return pd.DataFrame(features)
-
-print("=== Converting PCAP to CSV ===\n")
-
-# Process normal traffic
-normal_df = extract_features('normal.pcap', label=0)
-print(f"Normal traffic: {len(normal_df)} packets\n")
-
-# Process attack traffic
-attack_df = extract_features('attack.pcap', label=1)
-print(f"Attack traffic: {len(attack_df)} packets\n")
-
-# Combine datasets
-if len(normal_df) > 0 and len(attack_df) > 0:
-    combined = pd.concat([normal_df, attack_df], ignore_index=True)
-    
-    # Save to ml_dataset
+        return
+    for batch in iter_pcap_flows(pcap_file):
+        batch['label'] = label
+        yield batch
+
+def write_features(pcap_file, label, output_file, write_header, flows=False):
+    """Append the features of one capture to output_file batch by batch; returns the row count"""
+    print(f"Processing {pcap_file}...")
+    rows = 0
+    batches = iter_flow_features(pcap_file, label) if flows else iter_features(pcap_file, label)
+    for batch in batches:
+        batch.to_csv(output_file, mode='a', index=False, header=write_header and rows == 0)
+        rows += len(batch)
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert normal.pcap / attack.pcap into a training CSV')
+    parser.add_argument('--flows', action='store_true', help='one row per bidirectional flow instead of per packet')
+    args = parser.parse_args()
+    unit = 'flows' if args.flows else 'packets'
+
+    print("=== Converting PCAP to CSV ===\n")
+
     os.makedirs('ml_dataset', exist_ok=True)
-    output_file = 'ml_dataset/sdn_training_data.csv'
-    combined.to_csv(output_file, index=False)
-    
-    print(f"✓ Training dataset created: {output_file}")
-    print(f"\nDataset Summary:")
-    print(f"  Total samples: {len(combined)}")
-    print(f"  Normal (label=0): {len(normal_df)}")
-    print(f"  Attack (label=1): {len(attack_df)}")
-    print(f"  Features: {list(combined.columns)}")
-    print(f"\n✓ Ready for ML training!")
-else:
-    print("✗ Error: No data captured")
+    output_file = 'ml_dataset/sdn_training_flows.csv' if args.flows else 'ml_dataset/sdn_training_data.csv'
+    tmp_file = output_file + '.tmp'
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+
+    # Process normal traffic
+    normal_rows = write_features('normal.pcap', 0, tmp_file, write_header=True, flows=args.flows)
+    print(f"Normal traffic: {normal_rows} {unit}\n")
+
+    # Process attack traffic
+    attack_rows = write_features('attack.pcap', 1, tmp_file, write_header=normal_rows == 0, flows=args.flows)
+    print(f"Attack traffic: {attack_rows} {unit}\n")
+
+    # Keep the combined dataset only when both captures produced packets
+    if normal_rows > 0 and attack_rows > 0:
+        os.replace(tmp_file, output_file)
+
+        print(f"✓ Training dataset created: {output_file}")
+        print(f"\nDataset Summary:")
+        print(f"  Total samples: {normal_rows + attack_rows}")
+        print(f"  Normal (label=0): {normal_rows}")
+        print(f"  Attack (label=1): {attack_rows}")
+        print(f"  Features: {list(pd.read_csv(output_file, nrows=0).columns)}")
+        print(f"\n✓ Ready for ML training!")
+    else:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        print("✗ Error: No data captured")
+
+if __name__ == '__main__':
+    main()
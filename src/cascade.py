@@ -0,0 +1,97 @@
+"""
+Cascade Scoring
+Scores every flow with a cheap model and escalates only uncertain flows to the forest
+"""
+import time
+import numpy as np
+from sklearn.metrics import accuracy_score
+
+DEFAULT_BAND = (0.05, 0.95)
+
+class CascadeClassifier:
+    """
+    Two-stage classifier over already fitted models:
+    - `first` (e.g. naive_bayes or decision_tree from get_models) scores every row,
+    - rows whose first-stage probability falls inside `band` are rescored by `second`
+      (e.g. the random forest, or its compile_model form).
+    For binary problems the band applies to the positive-class probability; for
+    multiclass problems a row is uncertain when its top probability is below band[1].
+    """
+
+    def __init__(self, first, second, band=DEFAULT_BAND):
+        low, high = band
+        if not 0 <= low <= high <= 1:
+            raise ValueError(f"band must satisfy 0 <= low <= high <= 1, got {band}")
+        if not np.array_equal(first.classes_, second.classes_):
+            raise ValueError("Both stages must be fitted on the same classes")
+        self.first = first
+        self.second = second
+        self.band = (low, high)
+        self.classes_ = first.classes_
+
+    def escalation_mask(self, proba):
+        """Rows of first-stage probabilities that need the second stage."""
+        low, high = self.band
+        if proba.shape[1] == 2:
+            return (proba[:, 1] >= low) & (proba[:, 1] <= high)
+        return proba.max(axis=1) < high
+
+    def _cascade_proba(self, X):
+        proba = self.first.predict_proba(X)
+        escalate = self.escalation_mask(proba)
+        if escalate.any():
+            proba[escalate] = self.second.predict_proba(X[escalate])
+        return proba, escalate
+
+    def predict_proba(self, X):
+        return self._cascade_proba(np.asarray(X))[0]
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+def build_cascade(trained_models, first='naive_bayes', second='random_forest', band=DEFAULT_BAND):
+    """Builds a cascade from the trained get_models zoo, keyed by model name."""
+    return CascadeClassifier(trained_models[first], trained_models[second], band=band)
+
+def _timed(fn, X, repeats):
+    best, result = float('inf'), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(X)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def cascade_report(cascade, X_test, y_test, repeats=3):
+    """
+    Compares the cascade against scoring every row with its second stage alone.
+    Returns throughput (rows/s) of both, the escalation rate, both accuracies
+    and the accuracy delta (cascade minus forest-only).
+    """
+    X_test = np.asarray(X_test)
+    forest_s, forest_proba = _timed(cascade.second.predict_proba, X_test, repeats)
+    cascade_s, (cascade_proba, escalate) = _timed(cascade._cascade_proba, X_test, repeats)
+
+    forest_acc = accuracy_score(y_test, cascade.classes_[np.argmax(forest_proba, axis=1)])
+    cascade_acc = accuracy_score(y_test, cascade.classes_[np.argmax(cascade_proba, axis=1)])
+    return {
+        'band': cascade.band,
+        'forest_rows_per_s': len(X_test) / forest_s,
+        'cascade_rows_per_s': len(X_test) / cascade_s,
+        'speedup': forest_s / cascade_s,
+        'escalation_rate': float(escalate.mean()) if len(escalate) else 0.0,
+        'forest_accuracy': forest_acc,
+        'cascade_accuracy': cascade_acc,
+        'accuracy_delta': cascade_acc - forest_acc
+    }
+
+def print_cascade_report(report):
+    """
+    Prints a cascade report in the same layout as print_evaluation.
+    """
+    low, high = report['band']
+    print(f"\nCascade (uncertainty band {low:.2f}-{high:.2f})")
+    print(f"Escalation Rate: {report['escalation_rate']:.2%}")
+    print(f"Throughput: {report['cascade_rows_per_s']:,.0f} rows/s "
+          f"vs forest-only {report['forest_rows_per_s']:,.0f} rows/s ({report['speedup']:.1f}x)")
+    print(f"Accuracy: {report['cascade_accuracy']:.4f} "
+          f"(forest-only {report['forest_accuracy']:.4f}, delta {report['accuracy_delta']:+.4f})")
@@ -1,54 +1,489 @@
+import hashlib
+import os
+import struct
+import joblib
 import pandas as pd
 import numpy as np
-import nltk
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import OrdinalEncoder
+from src.heavy_hitters import SpaceSaving
 
-def load_data(filepath):
+# Declared column types for the known datasets. Integer widths follow the
+# observed value ranges; IPs and protocol names are low-cardinality strings
+# and are stored as categoricals.
+SDN_SCHEMA = {
+    'dt': 'int32', 'switch': 'int16', 'src': 'category', 'dst': 'category',
+    'pktcount': 'int32', 'bytecount': 'int64', 'dur': 'int32', 'dur_nsec': 'int32',
+    'tot_dur': 'float64', 'flows': 'int16', 'packetins': 'int32', 'pktperflow': 'int32',
+    'byteperflow': 'int32', 'pktrate': 'int32', 'Pairflow': 'int8', 'Protocol': 'category',
+    'port_no': 'int16', 'tx_bytes': 'int64', 'rx_bytes': 'int64', 'tx_kbps': 'int32',
+    'rx_kbps': 'float64', 'tot_kbps': 'float64', 'label': 'int8'
+}
+
+FINALV3_SCHEMA = {
+    'No.': 'int32', 'Time': 'float64', 'Source': 'category', 'Destination': 'category',
+    'Protocol': 'category', 'Length': 'int32', 'Attack': 'int8', 'ABF': 'int8'
+}
+
+KNOWN_SCHEMAS = [SDN_SCHEMA, FINALV3_SCHEMA]
+
+# Address columns that SDNPreprocessor(ip_encoding='uint32') encodes numerically
+IP_COLUMNS = ('src', 'dst', 'Source', 'Destination')
+
+# Bump when a schema changes so stale cache files are not reused
+SCHEMA_VERSION = 1
+CACHE_DIR = '.sdn_cache'
+
+# Default feature set for primary dataset (dataset_sdn.csv)
+DEFAULT_FEATURE_SET = [
+    'dt', 'switch', 'src', 'dst', 'pktcount', 'bytecount', 'dur', 'dur_nsec', 'tot_dur',
+    'flows', 'packetins', 'pktperflow', 'byteperflow', 'pktrate', 'Pairflow',
+    'Protocol', 'port_no', 'tx_bytes', 'rx_bytes', 'tx_kbps', 'rx_kbps', 'tot_kbps'
+]
+
+# Fixed size reserved for .npy headers written by the chunked preprocessor
+_NPY_HEADER_SIZE = 128
+
+def file_hash(filepath, block_size=1 << 20):
+    """
+    Returns the SHA-256 hex digest of a file, read in fixed-size blocks.
+    """
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def select_schema(columns):
+    """
+    Returns the known schema restricted to the given columns, or an empty
+    dict if the header does not match any known dataset.
+    """
+    columns = list(columns)
+    best = max(KNOWN_SCHEMAS, key=lambda schema: len(set(schema) & set(columns)))
+    if not set(best) & set(columns):
+        return {}
+    return {col: dtype for col, dtype in best.items() if col in columns}
+
+def _apply_schema(df, schema):
+    """
+    Casts columns to the schema, leaving integer columns with missing values
+    as floats instead of failing.
+    """
+    for col, dtype in schema.items():
+        if col not in df.columns:
+            continue
+        if dtype.startswith('int'):
+            values = pd.to_numeric(df[col], errors='coerce')
+            if values.isna().any():
+                df[col] = values.astype('float64')
+            else:
+                df[col] = values.astype(dtype)
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+def _read_csv_typed(filepath, schema):
+    """
+    Parses a CSV with the declared dtypes. Falls back to a plain parse
+    followed by per-column casts if the file violates the schema.
+    """
+    try:
+        return pd.read_csv(filepath, dtype=schema)
+    except (ValueError, OverflowError, TypeError):
+        return _apply_schema(pd.read_csv(filepath), schema)
+
+def _cache_path(filepath, cache_dir, schema):
+    """
+    Cache file name derived from the source content hash and the schema.
+    """
+    key = hashlib.sha256(f"{file_hash(filepath)}|{sorted(schema.items())}|{SCHEMA_VERSION}".encode())
+    stem = os.path.splitext(os.path.basename(filepath))[0]
+    return os.path.join(cache_dir, f"{stem}.{key.hexdigest()[:16]}.parquet")
+
+def load_data(filepath, schema=None, cache_dir=CACHE_DIR, use_cache=True):
     """
     Loads the SDN dataset from a CSV file.
+    - Applies the declared schema (narrow numeric types, categorical IPs/protocols).
+    - Caches the typed frame as Parquet, keyed by the source file's SHA-256 and
+      the schema, so re-runs skip CSV parsing entirely.
     """
-    df = pd.read_csv(filepath)
+    if schema is None:
+        schema = select_schema(pd.read_csv(filepath, nrows=0).columns)
+    if not use_cache:
+        return _read_csv_typed(filepath, schema)
+
+    cache_file = _cache_path(filepath, cache_dir, schema)
+    if os.path.exists(cache_file):
+        try:
+            return pd.read_parquet(cache_file)
+        except (ImportError, OSError, ValueError) as e:
+            print(f"Ignoring unreadable cache {cache_file}: {e}")
+
+    df = _read_csv_typed(filepath, schema)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_file = cache_file + '.tmp'
+        df.to_parquet(tmp_file, index=False)
+        os.replace(tmp_file, cache_file)
+    except (ImportError, OSError, ValueError) as e:
+        print(f"Skipping Parquet cache for {filepath}: {e}")
     return df
 
-def preprocess_sdn_data(df, feature_set=None, label_column='label'):
+class SDNPreprocessor:
+    """
+    Persistable fit/transform encoder for SDN flow features.
+    The first feature is passed through as continuous and the rest are
+    ordinal-encoded against sorted categories, giving the same columns as
+    preprocess_sdn_data: [encoded features..., continuous feature].
+    Values not seen during fit are encoded as unknown_value.
+    """
+    
+    # Batches up to this size are encoded with dict lookups instead of pandas
+    SMALL_BATCH = 32
+    
+    def __init__(self, feature_set=None, label_column='label', unknown_value=-1,
+                 ip_encoding='ordinal', ip_prefixes=()):
+        if ip_encoding not in ('ordinal', 'uint32'):
+            raise ValueError(f"ip_encoding must be 'ordinal' or 'uint32', got {ip_encoding!r}")
+        self.feature_set = list(feature_set if feature_set is not None else DEFAULT_FEATURE_SET)
+        self.label_column = label_column
+        self.unknown_value = unknown_value
+        self.ip_encoding = ip_encoding
+        self.ip_prefixes = tuple(ip_prefixes) if ip_encoding == 'uint32' else ()
+        self.categories_ = None
+        self._indexes = {}
+        self._lookups = {}
+    
+    @property
+    def continuous_feature(self):
+        return self.feature_set[0]
+    
+    @property
+    def encoded_features(self):
+        return self.feature_set[1:]
+    
+    @property
+    def ip_features(self):
+        """Encoded features converted to integer addresses instead of ordinals."""
+        if self.ip_encoding != 'uint32':
+            return []
+        return [col for col in self.encoded_features if col in IP_COLUMNS]
+    
+    @property
+    def prefix_features(self):
+        return [f"{col}_p{bits}" for col in self.ip_features for bits in self.ip_prefixes]
+    
+    @property
+    def feature_names_(self):
+        return self.encoded_features + self.prefix_features + [self.continuous_feature]
+    
+    @property
+    def is_fitted(self):
+        return self.categories_ is not None
+    
+    def fit(self, df):
+        """Learns the categories of every encoded feature from scratch."""
+        self.categories_ = None
+        return self.partial_fit(df)
+    
+    def partial_fit(self, df):
+        """Adds the categories seen in df (e.g. one chunk) to the fitted ones."""
+        if self.categories_ is None:
+            self.categories_ = {}
+        ip_features = self.ip_features
+        for col in self.encoded_features:
+            if col in ip_features:
+                continue
+            values = pd.unique(np.asarray(df[col]))
+            values = values[pd.notna(values)]
+            known = self.categories_.get(col)
+            self.categories_[col] = np.unique(values) if known is None else np.union1d(known, values)
+        self._indexes = {}
+        self._lookups = {}
+        return self
+    
+    def transform(self, data, dtype=np.float64):
+        """
+        Encodes a DataFrame or a mapping of column -> value(s), e.g. a single
+        flow as a dict. Returns an (n_rows, n_features) array.
+        """
+        if not self.is_fitted:
+            raise ValueError("SDNPreprocessor is not fitted yet; call fit() first")
+        
+        cont = np.atleast_1d(np.asarray(data[self.continuous_feature]))
+        X = np.empty((len(cont), len(self.feature_names_)), dtype=dtype)
+        small = len(cont) <= self.SMALL_BATCH
+        ip_features = self.ip_features
+        prefix_col = len(self.encoded_features)
+        for j, col in enumerate(self.encoded_features):
+            if col in ip_features:
+                X[:, j] = addrs = ipv4_to_uint32(data[col])
+                for prefix in ip_prefix_features(addrs, self.ip_prefixes).values():
+                    X[:, prefix_col] = prefix
+                    prefix_col += 1
+            elif small:
+                X[:, j] = self._encode_small(col, data[col])
+            else:
+                X[:, j] = self._encode(col, data[col])
+        X[:, -1] = cont
+        return X
+    
+    def fit_transform(self, df, dtype=np.float64):
+        return self.fit(df).transform(df, dtype=dtype)
+    
+    def save(self, path):
+        joblib.dump(self, path)
+    
+    @classmethod
+    def load(cls, path):
+        preprocessor = joblib.load(path)
+        if not isinstance(preprocessor, cls):
+            raise TypeError(f"{path} does not contain an {cls.__name__}")
+        return preprocessor
+    
+    def _encode(self, col, values):
+        """
+        Vectorized lookup: binary search for numeric categories, a hash index
+        for strings. Categorical inputs only look up their categories.
+        """
+        if isinstance(getattr(values, 'dtype', None), pd.CategoricalDtype):
+            category_codes = self._encode(col, np.asarray(values.cat.categories))
+            codes = values.cat.codes.to_numpy()
+            return np.where(codes >= 0, category_codes[codes], self.unknown_value)
+        
+        categories = self.categories_[col]
+        values = np.atleast_1d(np.asarray(values))
+        if categories.dtype.kind in 'biuf' and values.dtype.kind in 'biuf':
+            if len(categories) == 0:
+                return np.full(len(values), self.unknown_value)
+            codes = np.minimum(np.searchsorted(categories, values), len(categories) - 1)
+            return np.where(categories[codes] == values, codes, self.unknown_value)
+        
+        index = self._indexes.get(col)
+        if index is None:
+            index = self._indexes[col] = pd.Index(categories)
+        codes = index.get_indexer(values)
+        return np.where(codes >= 0, codes, self.unknown_value)
+    
+    def _encode_small(self, col, values):
+        lookup = self._lookups.get(col)
+        if lookup is None:
+            lookup = self._lookups[col] = {v: i for i, v in enumerate(self.categories_[col].tolist())}
+        unknown = self.unknown_value
+        if isinstance(values, (str, int, float, np.generic)):
+            return lookup.get(values, unknown)
+        return [lookup.get(v, unknown) for v in np.asarray(values).tolist()]
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_indexes'] = {}
+        state['_lookups'] = {}
+        return state
+
+def preprocess_sdn_data(df, feature_set=None, label_column='label', preprocessor=None):
     """
     Performs preprocessing on SDN datasets as per fullcode.py logic.
     - Handles missing values.
     - Extracts features and labels.
-    - Applies OrdinalEncoding to selected features.
+    - Applies OrdinalEncoding to selected features through an SDNPreprocessor,
+      fitted here unless an already fitted one is passed in.
     - Correctly aligns feature names with column order in X.
     """
-    # 1. Handle missing values
-    df = df.copy().dropna()
+    # 1. Handle missing values (dropna already returns a new frame)
+    df = df.dropna()
     
-    if feature_set is None:
-        # Default feature set for primary dataset (dataset_sdn.csv)
-        feature_set = [
-            'dt', 'switch', 'src', 'dst', 'pktcount', 'bytecount', 'dur', 'dur_nsec', 'tot_dur', 
-            'flows', 'packetins', 'pktperflow', 'byteperflow', 'pktrate', 'Pairflow', 
-            'Protocol', 'port_no', 'tx_bytes', 'rx_bytes', 'tx_kbps', 'rx_kbps', 'tot_kbps'
-        ]
+    if preprocessor is None:
+        preprocessor = SDNPreprocessor(feature_set, label_column=label_column)
     
     # 3. Label extraction
-    y = df[label_column]
+    y = df[preprocessor.label_column]
     
     # 4. Ordinal Encoding
     # Logic: The first feature in feature_set is treated as continuous, the rest are encoded.
-    le = OrdinalEncoder()
-    cont_feat = feature_set[0]
-    encoded_feats = feature_set[1:]
+    if not preprocessor.is_fitted:
+        preprocessor.fit(df)
+    X = preprocessor.transform(df)
     
-    cat_encoded = le.fit_transform(df[encoded_feats])
-    cont_data = df[cont_feat].to_numpy().reshape(-1, 1)
+    return X, y, preprocessor.feature_names_
+
+def ipv4_to_uint32(values, return_valid=False):
+    """
+    Converts dotted-quad IPv4 strings to uint32 addresses without a per-row
+    Python loop: the strings are viewed as a fixed-width byte matrix and the
+    octets are accumulated one character column at a time.
+    Values that are not valid IPv4 addresses (e.g. MACs in Finalv3.csv) become 0;
+    pass return_valid=True to also get the validity mask.
+    """
+    if isinstance(getattr(values, 'dtype', None), pd.CategoricalDtype):
+        # Parse each distinct address once and broadcast through the codes
+        addrs, valid = ipv4_to_uint32(np.asarray(values.cat.categories), return_valid=True)
+        codes = values.cat.codes.to_numpy()
+        known = codes >= 0
+        addrs = np.where(known, addrs[codes], 0).astype(np.uint32)
+        valid = known & valid[codes]
+        return (addrs, valid) if return_valid else addrs
+    
+    values = np.atleast_1d(np.asarray(values))
+    if values.dtype.kind in 'iu':
+        valid = (values >= 0) & (values <= 0xFFFFFFFF)
+        addrs = np.where(valid, values, 0).astype(np.uint32)
+        return (addrs, valid) if return_valid else addrs
     
-    # X columns order: [encoded_feats, cont_feat]
-    X = np.append(cat_encoded, cont_data, axis=1)
+    if len(values) > 1024 and values.dtype.kind == 'O':
+        # Flow data repeats a small set of hosts: parse each distinct string once
+        codes, uniques = pd.factorize(values)
+        addrs, valid = _parse_ipv4(np.asarray(uniques, dtype=object))
+        addrs = np.where(codes >= 0, addrs[codes], 0).astype(np.uint32)
+        valid = (codes >= 0) & valid[codes]
+    else:
+        addrs, valid = _parse_ipv4(values)
+    return (addrs, valid) if return_valid else addrs
+
+def _parse_ipv4(values):
+    """Column-at-a-time dotted-quad parser behind ipv4_to_uint32."""
+    # 'xxx.xxx.xxx.xxx' is 15 bytes; a 16th byte means the value is too long
+    width = 16
+    try:
+        buf = values.astype(f'S{width}')
+    except UnicodeEncodeError:
+        buf = np.char.encode(values.astype(str), 'ascii', 'replace').astype(f'S{width}')
+    chars = buf.view(np.uint8).reshape(-1, width)
     
-    # Final feature names in matching order
-    final_feature_names = encoded_feats + [cont_feat]
+    n = len(chars)
+    addrs = np.zeros(n, dtype=np.uint32)
+    octet = np.zeros(n, dtype=np.uint16)
+    n_digits = np.zeros(n, dtype=np.uint8)
+    n_dots = np.zeros(n, dtype=np.uint8)
+    ended = np.zeros(n, dtype=bool)
+    valid = np.ones(n, dtype=bool)
+    # Branch-free arithmetic on masks is much faster than np.where per column
+    for j in range(width):
+        c = chars[:, j]
+        digit = c - np.uint8(48)
+        is_digit = digit < 10
+        is_dot = c == 46
+        is_end = (c == 0) & ~ended
+        valid &= is_digit | is_dot | ended | is_end
+        
+        octet = octet * (1 + 9 * is_digit.astype(np.uint16)) + digit * is_digit
+        n_digits += is_digit
+        
+        # A dot or the terminating NUL closes the current octet
+        closes = is_dot | is_end
+        valid &= ~closes | ((n_digits - np.uint8(1) < 3) & (octet <= 255))
+        addrs = (addrs << (closes.astype(np.uint32) * 8)) | (octet * closes)
+        octet *= ~closes
+        n_digits *= ~closes
+        n_dots += is_dot
+        ended |= is_end
+        if ended.all():
+            break
     
-    return X, y, final_feature_names
+    valid &= ended & (n_dots == 3)
+    addrs[~valid] = 0
+    return addrs, valid
+
+def ip_prefix_features(addrs, prefixes=(8, 16, 24)):
+    """
+    Network prefixes of uint32 addresses as a dict of bits -> array,
+    e.g. the /24 of 10.0.1.7 is 10.0.1 (addr >> 8).
+    """
+    addrs = np.asarray(addrs, dtype=np.uint32)
+    features = {}
+    for bits in prefixes:
+        if not 0 < bits <= 32:
+            raise ValueError(f"Prefix length must be between 1 and 32, got {bits}")
+        features[bits] = addrs >> np.uint32(32 - bits)
+    return features
+
+def fit_preprocessor_chunked(filepath, feature_set=None, label_column='label', chunksize=100000):
+    """
+    Streams a CSV and fits an SDNPreprocessor on the union of the categories
+    seen in every chunk, matching what preprocess_sdn_data would learn from
+    the full frame.
+    """
+    preprocessor = SDNPreprocessor(feature_set, label_column=label_column)
+    for chunk in _iter_csv_chunks(filepath, preprocessor.feature_set, label_column, chunksize):
+        preprocessor.partial_fit(chunk)
+    return preprocessor
+
+def preprocess_sdn_data_chunked(filepath, out_path, preprocessor=None, feature_set=None,
+                                label_column='label', chunksize=100000, dtype=np.float64):
+    """
+    Out-of-core variant of preprocess_sdn_data for flow captures larger than RAM.
+    - Streams the CSV in chunks, dropping rows with missing values.
+    - Encodes each chunk with a pre-fitted SDNPreprocessor (fitted by streaming if None).
+    - Writes the feature matrix to out_path and the labels to <out_path>_labels.npy.
+    Returns read-only memory-mapped X and y plus the feature names.
+    """
+    if preprocessor is None:
+        preprocessor = fit_preprocessor_chunked(filepath, feature_set, label_column, chunksize)
+
+    label_column = preprocessor.label_column
+    n_cols = len(preprocessor.feature_set)
+    labels_path = os.path.splitext(out_path)[0] + '_labels.npy'
+
+    n_rows = 0
+    label_dtype = None
+    with open(out_path, 'wb') as fx, open(labels_path, 'wb') as fy:
+        # Reserve the headers; the row count is only known after streaming
+        fx.seek(_NPY_HEADER_SIZE)
+        fy.seek(_NPY_HEADER_SIZE)
+        for chunk in _iter_csv_chunks(filepath, preprocessor.feature_set, label_column, chunksize):
+            fx.write(preprocessor.transform(chunk, dtype=dtype).tobytes())
+
+            y = chunk[label_column].to_numpy()
+            if label_dtype is None:
+                if y.dtype.kind not in 'biuf':
+                    raise ValueError(f"Chunked mode needs numeric labels, got {y.dtype} for '{label_column}'")
+                label_dtype = np.dtype(np.int64) if y.dtype.kind in 'biu' else np.dtype(np.float64)
+            fy.write(y.astype(label_dtype).tobytes())
+            n_rows += len(chunk)
+
+        _write_npy_header(fx, (n_rows, n_cols), dtype)
+        _write_npy_header(fy, (n_rows,), label_dtype or np.int64)
+
+    X = np.load(out_path, mmap_mode='r')
+    y = np.load(labels_path, mmap_mode='r')
+    return X, y, preprocessor.feature_names_
+
+def iter_batches(X, y=None, batch_size=65536):
+    """
+    Yields consecutive in-memory row batches from (possibly memory-mapped) arrays,
+    e.g. for estimators trained with partial_fit.
+    """
+    for start in range(0, len(X), batch_size):
+        stop = start + batch_size
+        if y is None:
+            yield np.asarray(X[start:stop])
+        else:
+            yield np.asarray(X[start:stop]), np.asarray(y[start:stop])
+
+def _iter_csv_chunks(filepath, feature_set, label_column, chunksize):
+    """
+    Reads only the needed columns, chunk by chunk, with rows containing
+    missing values removed. String columns are read as categoricals.
+    """
+    usecols = list(dict.fromkeys(list(feature_set) + [label_column]))
+    schema = select_schema(usecols)
+    dtypes = {col: dtype for col, dtype in schema.items() if dtype == 'category'}
+    for chunk in pd.read_csv(filepath, usecols=usecols, dtype=dtypes, chunksize=chunksize):
+        yield chunk.dropna()
+
+def _write_npy_header(f, shape, dtype):
+    """
+    Writes a .npy v1.0 header padded to exactly _NPY_HEADER_SIZE bytes, so it
+    can be filled in after the data has been streamed behind it.
+    """
+    header = "{'descr': %r, 'fortran_order': False, 'shape': %r, }" % (
+        np.lib.format.dtype_to_descr(np.dtype(dtype)), tuple(shape))
+    # magic string (8 bytes) + header length (2 bytes) + header + newline
+    header = header.ljust(_NPY_HEADER_SIZE - 11) + '\n'
+    f.seek(0)
+    f.write(np.lib.format.magic(1, 0))
+    f.write(struct.pack('<H', len(header)))
+    f.write(header.encode('latin1'))
 
 def split_data(X, y, test_size=0.4, random_state=42):
     """
@@ -56,17 +491,13 @@ def split_data(X, y, test_size=0.4, random_state=42):
     """
     return train_test_split(X, y, test_size=test_size, random_state=random_state)
 
-def get_ip_frequency(df, column='src'):
+def get_ip_frequency(df, column='src', capacity=10000):
     """
     Calculates the frequency distribution of IP addresses.
+    Comma-separated values are split into individual addresses. Counting goes
+    through a bounded SpaceSaving summary, which is exact unless the column
+    holds more than `capacity` distinct addresses.
     """
-    ip_list = [i.split(',') for i in df[column]]
-    all_ip = [item for sublist in ip_list for item in sublist]
-    freq_dist = nltk.FreqDist(all_ip)
-    
-    all_ip_df = pd.DataFrame({
-        'ip': list(freq_dist.keys()),
-        'Count': list(freq_dist.values())
-    })
-    
-    return all_ip_df
+    counter = SpaceSaving(capacity)
+    counter.update(df[column], sep=',')
+    return counter.to_frame()
@@ -0,0 +1,243 @@
+"""
+Real-time Detection Service
+Scores live flow feature batches from the collectors and emits deduplicated alerts
+"""
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import json
+import time
+import aiohttp
+import numpy as np
+import pandas as pd
+from src.floodlight_poller import CONTROLLER, FloodlightPoller
+from src.live_features import LiveFeatureEngine
+from src.registry import REGISTRY_DIR
+from src.scoring import BatchScorer
+
+# Flow identity for alert deduplication (LiveFeatureEngine / dataset_sdn columns)
+DEDUP_KEYS = ('switch', 'src', 'dst')
+NORMAL_LABELS = (0, '0', 'normal', 'benign')
+
+_STOP = object()
+
+class DetectionService:
+    """
+    Three concurrent stages joined by bounded asyncio queues:
+    collectors -> submit() -> scoring -> output -> on_alert(alert).
+    - submit() waits while `max_pending` batches are queued, so a collector
+      that outpaces scoring is slowed down instead of growing memory;
+      thread-based collectors use submit_threadsafe(), which blocks likewise.
+    - The scoring stage merges whatever is queued (up to `max_rows` flows)
+      into one frame and scores it with a single vectorized call on a
+      dedicated thread, so ingest and output keep running meanwhile.
+    - The output stage reports a flow (switch, src, dst) and class at most
+      once per `dedup_seconds`; repeats only add to `suppressed`.
+    - stats() reports flows/sec, queue depths, alert counts and p50/p99
+      end-to-end latency (submit() to verdict) per batch.
+    Use as `async with DetectionService(scorer, on_alert=print) as service: await service.submit(df)`.
+    """
+
+    def __init__(self, scorer, on_alert=None, threshold=0.5, max_pending=64, max_rows=50000,
+                 dedup_seconds=60.0, key_columns=DEDUP_KEYS, normal_labels=NORMAL_LABELS, window=10000):
+        self.scorer = scorer
+        self.on_alert = on_alert
+        self.threshold = threshold
+        self.max_pending = max_pending
+        self.max_rows = max_rows
+        self.dedup_seconds = dedup_seconds
+        self.key_columns = list(key_columns)
+        self.normal_labels = list(normal_labels)
+        self.flows_in = 0
+        self.flows_scored = 0
+        self.alerts = 0
+        self.suppressed = 0
+        self.errors = 0
+        self._latencies = collections.deque(maxlen=window)
+        # (time, flows) of the batches scored in the last 10 s, for the recent rate
+        self._recent = collections.deque()
+        self._last_alert = {}
+        self._pruned = 0.0
+        self._started = None
+        self._loop = None
+        self._ingest = None
+        self._output = None
+        self._tasks = []
+        self._executor = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._ingest = asyncio.Queue(maxsize=self.max_pending)
+        self._output = asyncio.Queue(maxsize=self.max_pending)
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='scoring')
+        self._started = time.monotonic()
+        self._tasks = [asyncio.create_task(self._score_stage()), asyncio.create_task(self._output_stage())]
+
+    async def stop(self):
+        """Scores and reports everything already submitted, then stops the stages."""
+        if not self._tasks:
+            return
+        await self._ingest.put(_STOP)
+        await asyncio.gather(*self._tasks)
+        self._tasks = []
+        self._executor.shutdown()
+
+    async def submit(self, features):
+        """Queues one batch of feature rows (a DataFrame); waits while the queue is full."""
+        if len(features):
+            self.flows_in += len(features)
+            await self._ingest.put((features, time.monotonic()))
+
+    def submit_threadsafe(self, features, timeout=None):
+        """submit() for collectors running on other threads; blocks while the queue is full."""
+        asyncio.run_coroutine_threadsafe(self.submit(features), self._loop).result(timeout)
+
+    async def run_collector(self, poller, interval=1.0, engine=None, cycles=None, packetins=None):
+        """Polls the controller every `interval` seconds and submits each poll's feature rows."""
+        engine = engine or LiveFeatureEngine()
+        next_start = self._loop.time()
+        done = 0
+        while cycles is None or done < cycles:
+            try:
+                await self.submit(await engine.poll(poller, packetins))
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                print(f"Error polling switches: {e}")
+            done += 1
+            next_start += interval
+            await asyncio.sleep(max(0.0, next_start - self._loop.time()))
+
+    def stats(self):
+        now = time.monotonic()
+        while self._recent and now - self._recent[0][0] > 10.0:
+            self._recent.popleft()
+        latencies = np.array(self._latencies) if self._latencies else np.zeros(1)
+        elapsed = now - self._started if self._started else 0.0
+        return {
+            'flows_in': self.flows_in,
+            'flows_scored': self.flows_scored,
+            'flows_per_sec': round(self.flows_scored / elapsed, 1) if elapsed else 0.0,
+            'recent_flows_per_sec': round(sum(n for _, n in self._recent) / 10.0, 1),
+            'ingest_queue': self._ingest.qsize() if self._ingest else 0,
+            'output_queue': self._output.qsize() if self._output else 0,
+            'alerts': self.alerts,
+            'suppressed': self.suppressed,
+            'errors': self.errors,
+            'latency_p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 3),
+            'latency_p99_ms': round(float(np.percentile(latencies, 99)) * 1000, 3)
+        }
+
+    async def _score_stage(self):
+        while True:
+            item = await self._ingest.get()
+            batch, stop = [], item is _STOP
+            rows = 0
+            while not stop:
+                batch.append(item)
+                rows += len(item[0])
+                if rows >= self.max_rows or self._ingest.empty():
+                    break
+                item = self._ingest.get_nowait()
+                stop = item is _STOP
+            if batch:
+                features = pd.concat([f for f, _ in batch], ignore_index=True) if len(batch) > 1 else batch[0][0]
+                try:
+                    labels, confidence = await self._loop.run_in_executor(self._executor, self.scorer.score,
+                                                                          features)
+                except Exception as e:
+                    print(f"Error scoring {len(features)} flows: {e}")
+                    self.errors += len(features)
+                else:
+                    await self._output.put((features, labels, confidence, [t for _, t in batch]))
+            if stop:
+                await self._output.put(_STOP)
+                return
+
+    async def _output_stage(self):
+        while True:
+            item = await self._output.get()
+            if item is _STOP:
+                return
+            features, labels, confidence, ingested = item
+            now = time.monotonic()
+            self.flows_scored += len(features)
+            self._recent.append((now, len(features)))
+            while now - self._recent[0][0] > 10.0:
+                self._recent.popleft()
+            self._latencies.extend(now - t for t in ingested)
+            for alert in self._alerts(features, labels, confidence, now):
+                self.alerts += 1
+                if self.on_alert is not None:
+                    try:
+                        self.on_alert(alert)
+                    except Exception as e:
+                        # A failing consumer must not stall the pipeline behind it
+                        print(f"Error in alert callback: {e}")
+
+    def _alerts(self, features, labels, confidence, now):
+        labels, confidence = np.asarray(labels), np.asarray(confidence)
+        attack = ~pd.Series(labels).isin(self.normal_labels).to_numpy() & (confidence >= self.threshold)
+        if not attack.any():
+            return []
+        hits = features.loc[attack, [c for c in self.key_columns if c in features.columns]].copy()
+        hits['attack'] = labels[attack].astype(str)
+        hits['confidence'] = confidence[attack]
+        # One candidate per flow and class in this batch: the most confident row
+        hits = hits.sort_values('confidence', ascending=False, kind='stable')
+        unique = hits.drop_duplicates(subset=[c for c in hits.columns if c != 'confidence'])
+        self.suppressed += len(hits) - len(unique)
+
+        if now - self._pruned > self.dedup_seconds:
+            self._last_alert = {k: t for k, t in self._last_alert.items() if now - t < self.dedup_seconds}
+            self._pruned = now
+        alerts = []
+        wall = time.time()
+        for row in unique.to_dict('records'):
+            key = tuple(str(row[c]) for c in row if c != 'confidence')
+            last = self._last_alert.get(key)
+            if last is not None and now - last < self.dedup_seconds:
+                self.suppressed += 1
+                continue
+            self._last_alert[key] = now
+            row['confidence'] = round(float(row['confidence']), 4)
+            alerts.append({'time': wall, **{k: (v.item() if isinstance(v, np.generic) else v)
+                                            for k, v in row.items()}})
+        return alerts
+
+async def _serve(args):
+    scorer = BatchScorer.from_registry(args.model, args.registry)
+    print_alert = lambda alert: print(json.dumps(alert), flush=True)
+    async with DetectionService(scorer, on_alert=print_alert, threshold=args.threshold,
+                                dedup_seconds=args.dedup) as service:
+        async with FloodlightPoller(args.controller) as poller:
+            collector = asyncio.create_task(service.run_collector(poller, args.interval, cycles=args.cycles))
+            while not collector.done():
+                await asyncio.wait([collector], timeout=args.stats_interval)
+                print(f"[stats] {json.dumps(service.stats())}", flush=True)
+            collector.result()
+
+def main():
+    parser = argparse.ArgumentParser(description='Score live Floodlight flows and print alerts as JSON lines')
+    parser.add_argument('--controller', default=CONTROLLER)
+    parser.add_argument('--interval', type=float, default=1.0, help='seconds between controller polls')
+    parser.add_argument('--cycles', type=int, default=None, help='stop after this many polls')
+    parser.add_argument('--model', default='random_forest', help='registry model name')
+    parser.add_argument('--registry', default=REGISTRY_DIR)
+    parser.add_argument('--threshold', type=float, default=0.5, help='minimum attack probability')
+    parser.add_argument('--dedup', type=float, default=60.0, help='seconds before a flow is reported again')
+    parser.add_argument('--stats-interval', type=float, default=10.0)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
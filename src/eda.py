@@ -240,7 +240,7 @@ def comprehensive_eda(df, target_col='label', save_summary=True):
     
     # Identify column types
     numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-    categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+    categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
     
     # Execute all EDA sections
     results = {}
@@ -1,36 +1,108 @@
-from sklearn.metrics import classification_report, confusion_matrix, accuracy_score, roc_auc_score, mean_squared_error
+import numpy as np
+from sklearn.metrics import roc_auc_score
 
-def evaluate_model(model, X_test, y_test, X_train=None, y_train=None):
+# Training-set accuracy is estimated on at most this many rows by default
+TRAIN_SAMPLE_SIZE = 10000
+
+def predict_once(model, X):
     """
-    Evaluates a model and returns a dictionary of metrics.
+    Scores X with a single model call and returns (y_pred, scores), where
+    scores is the predict_proba matrix, the decision_function output, or None.
+    Predictions are derived from the scores rather than from a second predict call.
     """
-    y_pred = model.predict(X_test)
-    
-    # Check if model has predict_proba for ROC AUC
     if hasattr(model, "predict_proba"):
-        y_prob = model.predict_proba(X_test)[:, 1]
-    elif hasattr(model, "decision_function"):
-        y_prob = model.decision_function(X_test)
+        scores = model.predict_proba(X)
+        return model.classes_[np.argmax(scores, axis=1)], scores
+    if hasattr(model, "decision_function") and hasattr(model, "classes_"):
+        scores = model.decision_function(X)
+        if scores.ndim == 1:
+            return model.classes_[(scores > 0).astype(int)], scores
+        return model.classes_[np.argmax(scores, axis=1)], scores
+    return model.predict(X), None
+
+def confusion_counts(y_true, y_pred):
+    """
+    Confusion matrix over the sorted union of labels in one bincount.
+    Returns (labels, matrix) with true labels as rows.
+    """
+    labels, codes = np.unique(np.concatenate([np.asarray(y_true), np.asarray(y_pred)]), return_inverse=True)
+    n = len(labels)
+    true_codes, pred_codes = codes[:len(y_true)], codes[len(y_true):]
+    matrix = np.bincount(true_codes * n + pred_codes, minlength=n * n).reshape(n, n)
+    return labels, matrix
+
+def _safe_divide(num, den):
+    return np.divide(num, den, out=np.zeros(len(num), dtype=np.float64), where=den > 0)
+
+def report_from_confusion(labels, matrix):
+    """Same dict as classification_report(output_dict=True), from a confusion matrix."""
+    tp = np.diag(matrix).astype(np.float64)
+    support = matrix.sum(axis=1)
+    precision = _safe_divide(tp, matrix.sum(axis=0))
+    recall = _safe_divide(tp, support)
+    f1 = _safe_divide(2 * precision * recall, precision + recall)
+    total = int(support.sum())
+
+    report = {}
+    for i, label in enumerate(labels):
+        report[str(label)] = {
+            'precision': float(precision[i]), 'recall': float(recall[i]),
+            'f1-score': float(f1[i]), 'support': float(support[i])
+        }
+    report['accuracy'] = float(tp.sum() / total) if total else 0.0
+    weights = support / total if total else np.zeros(len(labels))
+    for name, w in (('macro avg', np.full(len(labels), 1 / len(labels))), ('weighted avg', weights)):
+        report[name] = {
+            'precision': float(precision @ w), 'recall': float(recall @ w),
+            'f1-score': float(f1 @ w), 'support': float(total)
+        }
+    return report
+
+def mse_from_confusion(labels, matrix):
+    """Mean squared error between numeric true and predicted labels."""
+    values = labels.astype(np.float64)
+    squared = (values[:, None] - values[None, :]) ** 2
+    return float((matrix * squared).sum() / matrix.sum())
+
+def evaluate_model(model, X_test, y_test, X_train=None, y_train=None, train_sample_size=TRAIN_SAMPLE_SIZE,
+                   random_state=42):
+    """
+    Evaluates a model and returns a dictionary of metrics.
+    The test set is scored exactly once; every metric comes from that one
+    confusion matrix and probability vector. Training accuracy is computed only
+    when X_train/y_train are given, on a random sample of train_sample_size
+    rows (None scores the whole training set).
+    """
+    y_pred, scores = predict_once(model, X_test)
+    if scores is not None and scores.ndim == 2:
+        y_prob = scores[:, 1]
     else:
-        y_prob = None
-    
+        y_prob = scores
+
+    labels, conf_matrix = confusion_counts(y_test, y_pred)
+    report = report_from_confusion(labels, conf_matrix)
     metrics = {
-        "accuracy": accuracy_score(y_test, y_pred),
-        "report": classification_report(y_test, y_pred, output_dict=True),
-        "conf_matrix": confusion_matrix(y_test, y_pred),
-        "mse": mean_squared_error(y_test, y_pred),
+        "accuracy": report['accuracy'],
+        "report": report,
+        "conf_matrix": conf_matrix,
+        "mse": mse_from_confusion(labels, conf_matrix),
         "y_prob": y_prob
     }
-    
+
     if X_train is not None and y_train is not None:
-        metrics["train_accuracy"] = accuracy_score(y_train, model.predict(X_train))
-    
+        if train_sample_size is not None and len(X_train) > train_sample_size:
+            rows = np.random.default_rng(random_state).choice(len(X_train), train_sample_size, replace=False)
+            X_train, y_train = X_train[rows], np.asarray(y_train)[rows]
+        train_pred, _ = predict_once(model, X_train)
+        metrics["train_accuracy"] = float(np.mean(train_pred == np.asarray(y_train)))
+        metrics["train_rows"] = len(X_train)
+
     if y_prob is not None:
         try:
             metrics["roc_auc"] = roc_auc_score(y_test, y_prob)
         except:
             pass
-    
+
     return metrics
 
 def print_evaluation(name, metrics):
@@ -39,7 +111,7 @@ def print_evaluation(name, metrics):
     """
     print(f"\nModel: {name}")
     if 'train_accuracy' in metrics:
-        print(f"Train Accuracy: {metrics['train_accuracy']:.4f}")
+        print(f"Train Accuracy: {metrics['train_accuracy']:.4f} ({metrics.get('train_rows', '?')} rows)")
     print(f"Test Accuracy: {metrics['accuracy']:.4f}")
     if 'roc_auc' in metrics:
         print(f"ROC AUC Score: {metrics['roc_auc']:.4f}")
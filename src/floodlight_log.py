@@ -0,0 +1,164 @@
+"""
+Floodlight Log Tailer
+Follows a growing floodlight.log and emits TopoGuard alerts as they are written
+"""
+import os
+import re
+import threading
+
+# Attack type -> message pattern, checked in order (first match wins)
+ATTACK_PATTERNS = {
+    'host_hijack': r'Host location hijacking detected|Suspicious host migration|MAC address conflict',
+    'link_fabrication': r'Link fabrication detected|Fake LLDP packet|Topology poisoning',
+    'port_migration': r'Rapid port migration|Port flapping detected',
+    'unauthorized_switch': r'Unauthorized switch connection|Unknown switch DPID'
+}
+SECURITY_KEYWORDS = ('detected', 'suspicious', 'attack', 'unauthorized', 'fabrication', 'hijacking',
+                     'poisoning')
+
+# HH:MM:SS.mmm LEVEL [Class:Thread] Message, from a TopoGuard class, with a
+# security keyword somewhere in the message. Lines that are not alerts fail on
+# the source check, so the keyword scan only runs for the few that remain.
+ALERT_LINE = re.compile(
+    r'(\d{2}:\d{2}:\d{2}\.\d{3})\s+(\w+)\s+'
+    r'\[([^\]]*?(?:TopoloyUpdateChecker|TopoGuard)[^\]]*)\]\s+'
+    r'((?i:(?=.*?(?:' + '|'.join(SECURITY_KEYWORDS) + r'))).*)')
+
+# One lookahead per attack type at the start of the message; alternation tries
+# them in ATTACK_PATTERNS order, and lastgroup names the one that matched
+_ATTACK_TYPE = re.compile('|'.join(f'(?=.*?(?P<{name}>{pattern}))' for name, pattern in ATTACK_PATTERNS.items()),
+                          re.IGNORECASE)
+
+def parse_alert_line(line):
+    """Alert dict for one log line, or None when the line is not a TopoGuard alert."""
+    m = ALERT_LINE.match(line)
+    if m is None:
+        return None
+    time_str, level, source, message = m.groups()
+    kind = _ATTACK_TYPE.match(message)
+    return {
+        'timestamp': time_str,
+        'level': level,
+        'source': source,
+        'attack_type': kind.lastgroup if kind else 'unknown',
+        'message': message.rstrip('\r\n')
+    }
+
+def iter_alerts(lines):
+    """Alerts from an iterable of log lines, e.g. an open file, one line at a time."""
+    for line in lines:
+        alert = parse_alert_line(line)
+        if alert is not None:
+            yield alert
+
+class LogTailer:
+    """
+    Follows a Floodlight log like `tail -F` and hands each alert to a callback
+    and/or a queue.Queue (`alerts`) as soon as its line is complete.
+    - Memory is bounded by one partial line; the file is never reread.
+    - Rotation (the path now names a different file) and truncation are
+      detected on EOF; the old file is drained before the new one is opened.
+    - `poll()` reads whatever is available once; `start()` runs it on a
+      background thread every `poll_interval` seconds until `stop()`.
+    - `from_start=False` skips what is already in the log at start-up.
+    """
+
+    def __init__(self, path, callback=None, alerts=None, poll_interval=0.5, from_start=True):
+        self.path = path
+        self.callback = callback
+        self.alerts = alerts
+        self.poll_interval = poll_interval
+        self.from_start = from_start
+        self.lines_read = 0
+        self.alert_count = 0
+        self._file = None
+        self._inode = None
+        self._partial = b''
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def poll(self):
+        """Reads all complete new lines and returns the alerts found in them."""
+        found = []
+        if self._file is None and not self._open(self.from_start):
+            return found
+        found += self._drain()
+        if self._rotated():
+            self._close()
+            if self._open(True):
+                found += self._drain()
+        return found
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='LogTailer', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.poll()
+            self._stop.wait(self.poll_interval)
+
+    def _open(self, from_start):
+        try:
+            self._file = open(self.path, 'rb')
+        except FileNotFoundError:
+            return False
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        if not from_start:
+            self._file.seek(0, os.SEEK_END)
+        self._partial = b''
+        return True
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _rotated(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return st.st_ino != self._inode or st.st_size < self._file.tell()
+
+    def _drain(self):
+        found = []
+        for raw in self._file:
+            if not raw.endswith(b'\n'):
+                # Line still being written; keep it until the rest arrives
+                self._partial += raw
+                break
+            line = (self._partial + raw).decode('utf-8', errors='ignore')
+            self._partial = b''
+            self.lines_read += 1
+            alert = parse_alert_line(line)
+            if alert is not None:
+                found.append(alert)
+                self._emit(alert)
+        return found
+
+    def _emit(self, alert):
+        self.alert_count += 1
+        if self.callback is not None:
+            self.callback(alert)
+        if self.alerts is not None:
+            self.alerts.put(alert)
+
+def follow(path, callback, poll_interval=0.5, from_start=False):
+    """Starts a background LogTailer on path; call .stop() on the result to end it."""
+    return LogTailer(path, callback=callback, poll_interval=poll_interval, from_start=from_start).start()
@@ -0,0 +1,131 @@
+"""
+Floodlight Flow Poller
+Concurrent asyncio polling of per-switch flow tables over a pooled HTTP client
+"""
+import asyncio
+import time
+from collections import namedtuple
+import aiohttp
+import pandas as pd
+
+CONTROLLER = 'http://localhost:8080'
+SWITCHES_PATH = '/wm/core/controller/switches/json'
+FLOWS_PATH = '/wm/core/switch/{dpid}/flow/json'
+PORTS_PATH = '/wm/statistics/port/all/json'
+
+# One switch's flow table as returned at timestamp_ns (wall clock, taken when the
+# response arrived); latency_s is the request round trip, error is None on success
+FlowSnapshot = namedtuple('FlowSnapshot', ['dpid', 'flows', 'timestamp_ns', 'latency_s', 'error'])
+
+class FloodlightPoller:
+    """
+    Polls every switch's /wm/core/switch/{dpid}/flow/json concurrently.
+    - One aiohttp session with a bounded connection pool is reused across cycles.
+    - Every request has its own deadline (`timeout` seconds); a slow or failed
+      switch yields a snapshot with `error` set instead of stalling the cycle.
+    Use as `async with FloodlightPoller() as poller: snapshots = await poller.poll()`.
+    """
+
+    def __init__(self, controller=CONTROLLER, timeout=2.0, max_connections=64):
+        self.controller = controller.rstrip('/')
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=30)
+        self.session = aiohttp.ClientSession(connector=connector)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+        self.session = None
+
+    async def _get_json(self, path):
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with self.session.get(self.controller + path, timeout=timeout) as resp:
+            resp.raise_for_status()
+            return await resp.json(content_type=None)
+
+    async def fetch_switches(self):
+        """DPIDs of all connected switches."""
+        switches = await self._get_json(SWITCHES_PATH)
+        return [switch['switchDPID'] for switch in switches]
+
+    async def fetch_flows(self, dpid):
+        """One switch's flow table as a FlowSnapshot; never raises."""
+        start = time.perf_counter()
+        try:
+            data = await self._get_json(FLOWS_PATH.format(dpid=dpid))
+            if not isinstance(data, dict):
+                raise ValueError(f"unexpected flow table response: {type(data).__name__}")
+            flows, error = data.get(dpid, data.get('flows', [])), None
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            flows, error = [], repr(e)
+        return FlowSnapshot(dpid, flows, time.time_ns(), time.perf_counter() - start, error)
+
+    async def fetch_port_stats(self):
+        """Port counters of all switches; an empty dict if the request fails."""
+        try:
+            return await self._get_json(PORTS_PATH)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            print(f"Error fetching port stats: {e}")
+            return {}
+
+    async def poll(self, dpids=None):
+        """Fetches the flow tables of `dpids` (default: all switches) concurrently."""
+        if dpids is None:
+            dpids = await self.fetch_switches()
+        return list(await asyncio.gather(*(self.fetch_flows(dpid) for dpid in dpids)))
+
+    async def run(self, interval, callback, cycles=None):
+        """
+        Polls every `interval` seconds and passes each cycle's snapshots to callback.
+        Cycles are scheduled against a fixed start time, so slow cycles do not
+        accumulate drift; a cycle that overruns its slot starts the next one immediately.
+        """
+        loop = asyncio.get_running_loop()
+        next_start = loop.time()
+        done = 0
+        while cycles is None or done < cycles:
+            try:
+                snapshots = await self.poll()
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                print(f"Error polling switches: {e}")
+                snapshots = []
+            callback(snapshots)
+            done += 1
+            next_start += interval
+            await asyncio.sleep(max(0.0, next_start - loop.time()))
+
+def snapshots_to_dataframe(snapshots, label=None):
+    """
+    Flattens snapshots into one row per flow entry with the collectors' columns,
+    plus the snapshot's timestamp_ns.
+    """
+    rows = []
+    for snap in snapshots:
+        for flow in snap.flows:
+            match = flow.get('match', {})
+            rows.append({
+                'switch_dpid': snap.dpid,
+                'src_ip': match.get('ipv4_src', '0.0.0.0'),
+                'dst_ip': match.get('ipv4_dst', '0.0.0.0'),
+                'src_port': match.get('tp_src', 0),
+                'dst_port': match.get('tp_dst', 0),
+                'protocol': match.get('ip_proto', 0),
+                'packet_count': flow.get('packetCount', 0),
+                'byte_count': flow.get('byteCount', 0),
+                'duration': flow.get('durationSeconds', 0),
+                'timestamp_ns': snap.timestamp_ns,
+                'label': label
+            })
+    return pd.DataFrame(rows)
+
+async def _poll_once(controller, timeout):
+    async with FloodlightPoller(controller, timeout=timeout) as poller:
+        return await poller.poll()
+
+def poll_flows(controller=CONTROLLER, timeout=2.0):
+    """Blocking helper for scripts: one concurrent poll of all switches."""
+    return asyncio.run(_poll_once(controller, timeout))
@@ -0,0 +1,228 @@
+"""
+Floodlight REST Stand-in
+Local aiohttp server that serves synthetic or recorded flow tables on Floodlight's
+REST paths, for exercising the collectors and pollers without a controller
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import random
+import time
+import numpy as np
+from aiohttp import web
+
+PROTOCOLS = (6, 17, 1)
+
+def _dpid(i):
+    return ':'.join(f"{b:02x}" for b in (i + 1).to_bytes(8, 'big'))
+
+def _ip(net, host):
+    return f"10.{net >> 8 & 255}.{net & 255}.{host}"
+
+def _mac(i):
+    return ':'.join(f"{b:02x}" for b in (0x020000000000 + i).to_bytes(6, 'big'))
+
+def _read_json(path):
+    # Snapshots written by `curl ... || true` may be empty when the controller was down
+    with open(path) as f:
+        text = f.read().strip()
+    return json.loads(text) if text else None
+
+class SwitchTable:
+    """
+    One switch's flow entries: static match/priority fields in `entries`, and
+    cumulative counters that grow at each flow's own packet rate as time passes.
+    """
+
+    def __init__(self, dpid, entries, pkt_rate, pkt_size, installed):
+        self.dpid = dpid
+        self.entries = entries
+        self.pkt_rate = np.asarray(pkt_rate, dtype=np.float64)
+        self.pkt_size = np.asarray(pkt_size, dtype=np.float64)
+        self.installed = installed
+
+    def flows(self, now):
+        """Flow entries as Floodlight returns them at time `now`."""
+        age = max(now - self.installed, 0.0)
+        packets = (self.pkt_rate * age).astype(np.int64)
+        byte_counts = (packets * self.pkt_size).astype(np.int64)
+        seconds, nanos = int(age), int((age % 1) * 1e9)
+        return [dict(entry, packetCount=str(p), byteCount=str(b), durationSeconds=str(seconds),
+                     durationNSeconds=str(nanos))
+                for entry, p, b in zip(self.entries, packets.tolist(), byte_counts.tolist())]
+
+    def port_stats(self, now):
+        """Per-port rx/tx counters aggregated from the flows entering each port."""
+        ports = {}
+        for flow in self.flows(now):
+            port = ports.setdefault(flow['match'].get('in_port', '1'), [0, 0])
+            port[0] += int(flow['packetCount'])
+            port[1] += int(flow['byteCount'])
+        return [{'port_number': number, 'receive_packets': str(p), 'receive_bytes': str(b),
+                 'transmit_packets': str(p), 'transmit_bytes': str(b)}
+                for number, (p, b) in sorted(ports.items())]
+
+class FlowTableModel:
+    """Every switch's SwitchTable, keyed by DPID in insertion order."""
+
+    def __init__(self, tables):
+        self.tables = {table.dpid: table for table in tables}
+
+    def __len__(self):
+        return len(self.tables)
+
+    @property
+    def n_flows(self):
+        return sum(len(table.entries) for table in self.tables.values())
+
+    @classmethod
+    def synthesize(cls, n_switches=16, flows_per_switch=64, seed=0, start=None):
+        """Random 5-tuple flows with log-normal packet rates and mixed packet sizes."""
+        rng = np.random.default_rng(seed)
+        start = time.time() if start is None else start
+        tables = []
+        for s in range(n_switches):
+            entries = []
+            for f in range(flows_per_switch):
+                proto = PROTOCOLS[int(rng.integers(len(PROTOCOLS)))]
+                src, dst = rng.integers(1, 255, size=2)
+                match = {'in_port': str(int(rng.integers(1, 5))), 'eth_type': '0x800',
+                         'eth_src': _mac(int(src)), 'eth_dst': _mac(int(dst)),
+                         'ipv4_src': _ip(s, int(src)), 'ipv4_dst': _ip(s, int(dst)),
+                         'ip_proto': str(proto)}
+                if proto != 1:
+                    match['tp_src'] = str(int(rng.integers(1024, 65536)))
+                    match['tp_dst'] = str(int(rng.choice([22, 53, 80, 443, 8080])))
+                entries.append({'cookie': str(f), 'tableId': '0x0', 'priority': '1',
+                                'idleTimeoutSec': '5', 'hardTimeoutSec': '0', 'match': match})
+            # Stagger installation so durations and counters differ between flows
+            installed = start - float(rng.uniform(0, 30))
+            tables.append(SwitchTable(_dpid(s), entries, rng.lognormal(2.0, 1.0, flows_per_switch),
+                                      rng.choice([64, 576, 1500], flows_per_switch), installed))
+        return cls(tables)
+
+    @classmethod
+    def from_snapshots(cls, label_dir='labels', timestamp=None, scale=1, seed=0, start=None):
+        """
+        Replays the switches_*.json / flows_*.json snapshots written by
+        simulate_attack.sh, cloned `scale` times with distinct DPIDs and subnets.
+        Uses the latest non-empty pair unless `timestamp` picks one.
+        """
+        pattern = f"flows_{timestamp or '*'}.json"
+        for flows_path in sorted(glob.glob(os.path.join(label_dir, pattern)), reverse=True):
+            flows = _read_json(flows_path)
+            if flows:
+                break
+        else:
+            raise ValueError(f"No non-empty {pattern} snapshot in {label_dir}")
+        switches_path = flows_path.replace('flows_', 'switches_')
+        switches = _read_json(switches_path) if os.path.exists(switches_path) else None
+        dpids = [s['switchDPID'] for s in switches or []] or list(flows)
+
+        rng = np.random.default_rng(seed)
+        start = time.time() if start is None else start
+        tables = []
+        for copy in range(scale):
+            for i, dpid in enumerate(dpids):
+                entries = []
+                for entry in _flow_entries(flows.get(dpid, [])):
+                    match = dict(entry.get('match', {}))
+                    for key in ('ipv4_src', 'ipv4_dst'):
+                        if copy and key in match:
+                            match[key] = _clone_ip(match[key], copy)
+                    counters = ('packetCount', 'byteCount', 'durationSeconds', 'durationNSeconds')
+                    entries.append(dict({k: v for k, v in entry.items() if k not in counters}, match=match))
+                n = len(entries)
+                tables.append(SwitchTable(dpid if copy == 0 else _dpid(copy * len(dpids) + i), entries,
+                                          rng.lognormal(2.0, 1.0, n), rng.choice([64, 576, 1500], n),
+                                          start - float(rng.uniform(0, 30))))
+        return cls(tables)
+
+def _clone_ip(addr, copy):
+    """Moves an address (optionally masked, e.g. 10.0.0.1/32) to copy's subnet; others are kept."""
+    host, slash, mask = str(addr).partition('/')
+    try:
+        cloned = _ip(copy, int(host.rsplit('.', 1)[1]))
+    except (ValueError, IndexError):
+        return addr
+    return cloned + slash + mask
+
+def _flow_entries(entries):
+    """Flattens static flow pusher lists ([{name: entry}]) and plain flow lists alike."""
+    if isinstance(entries, dict):
+        entries = entries.get('flows', [])
+    for entry in entries:
+        if 'match' not in entry and len(entry) == 1:
+            entry = next(iter(entry.values()))
+        yield entry
+
+def make_app(model, delay=0.0, jitter=0.0, error_rate=0.0, seed=0):
+    """
+    aiohttp app serving `model` on Floodlight's REST paths. Each response waits
+    `delay` plus up to `jitter` seconds, and fails with HTTP 503 with
+    probability `error_rate`, to mimic a loaded controller.
+    """
+    rng = random.Random(seed)
+
+    async def respond(payload):
+        wait = delay + rng.uniform(0, jitter)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        if error_rate and rng.random() < error_rate:
+            raise web.HTTPServiceUnavailable()
+        return web.json_response(payload)
+
+    async def summary(request):
+        return await respond({'# Switches': len(model), '# hosts': model.n_flows,
+                              '# inter-switch links': 0, '# quarantine ports': 0})
+
+    async def switches(request):
+        return await respond([{'switchDPID': dpid, 'inetAddress': f'/127.0.0.1:{40000 + i}',
+                               'connectedSince': int(table.installed * 1000)}
+                              for i, (dpid, table) in enumerate(model.tables.items())])
+
+    async def switch_flows(request):
+        dpid = request.match_info['dpid']
+        now = time.time()
+        if dpid == 'all':
+            return await respond({d: t.flows(now) for d, t in model.tables.items()})
+        if dpid not in model.tables:
+            raise web.HTTPNotFound()
+        return await respond({'flows': model.tables[dpid].flows(now)})
+
+    async def port_stats(request):
+        now = time.time()
+        return await respond({d: t.port_stats(now) for d, t in model.tables.items()})
+
+    app = web.Application()
+    app.router.add_get('/wm/core/controller/summary/json', summary)
+    app.router.add_get('/wm/core/controller/switches/json', switches)
+    app.router.add_get('/wm/core/switch/{dpid}/flow/json', switch_flows)
+    app.router.add_get('/wm/statistics/port/all/json', port_stats)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve synthetic or recorded Floodlight flow tables')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--switches', type=int, default=16)
+    parser.add_argument('--flows', type=int, default=64, help='flows per synthetic switch')
+    parser.add_argument('--snapshots', help='replay snapshots from this labels/ directory')
+    parser.add_argument('--scale', type=int, default=1, help='copies of the recorded topology')
+    parser.add_argument('--delay', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.snapshots:
+        model = FlowTableModel.from_snapshots(args.snapshots, scale=args.scale)
+    else:
+        model = FlowTableModel.synthesize(args.switches, args.flows)
+    print(f"Serving {len(model)} switches / {model.n_flows} flows on http://{args.host}:{args.port}")
+    web.run_app(make_app(model, args.delay, args.jitter, args.error_rate),
+                host=args.host, port=args.port, print=None)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,317 @@
+"""
+Bidirectional Flow Aggregator
+Groups packets into CICFlowMeter-style bidirectional flow records with idle
+and active timeouts, evicting finished flows to a sink as the capture streams by
+"""
+import numpy as np
+import pandas as pd
+from src.pcap_decoder import ETH_IPV4, iter_pcap_columns, iter_scapy_columns, uint32_to_ipv4
+
+FLAG_BITS = {'fin': 0x01, 'syn': 0x02, 'rst': 0x04, 'psh': 0x08, 'ack': 0x10, 'urg': 0x20}
+
+# Initiator-oriented flow key, stored per slot
+KEY_FIELDS = {'src_ip': np.uint32, 'dst_ip': np.uint32, 'src_port': np.uint16, 'dst_port': np.uint16,
+              'protocol': np.uint8}
+
+# Running per-flow statistics; min fields start at +inf
+STAT_FIELDS = {
+    'first_ts': np.float64, 'last_ts': np.float64,
+    'fwd_pkts': np.int64, 'bwd_pkts': np.int64, 'fwd_bytes': np.float64, 'bwd_bytes': np.float64,
+    'fwd_sq': np.float64, 'bwd_sq': np.float64,
+    'fwd_max': np.float64, 'fwd_min': np.float64, 'bwd_max': np.float64, 'bwd_min': np.float64,
+    'iat_n': np.int64, 'iat_mean': np.float64, 'iat_m2': np.float64, 'iat_min': np.float64, 'iat_max': np.float64,
+    **{flag: np.int64 for flag in FLAG_BITS},
+}
+_SUM_FIELDS = ('fwd_pkts', 'bwd_pkts', 'fwd_bytes', 'bwd_bytes', 'fwd_sq', 'bwd_sq', *FLAG_BITS)
+_MIN_FIELDS = ('fwd_min', 'bwd_min', 'iat_min')
+_MAX_FIELDS = ('fwd_max', 'bwd_max', 'iat_max')
+
+_CANONICAL = np.dtype([('a', 'u4'), ('b', 'u4'), ('pa', 'u2'), ('pb', 'u2'), ('proto', 'u1')])
+
+def _std(sq, total, n):
+    mean = np.divide(total, n, out=np.zeros(len(n)), where=n > 0)
+    var = np.divide(sq, n, out=np.zeros(len(n)), where=n > 0) - mean ** 2
+    return mean, np.sqrt(np.maximum(var, 0))
+
+def flow_records(fields):
+    """CICFlowMeter-style columns (durations and IATs in seconds) from key and stat arrays."""
+    duration = fields['last_ts'] - fields['first_ts']
+    fwd, bwd = fields['fwd_pkts'], fields['bwd_pkts']
+    pkts, byte_total = fwd + bwd, fields['fwd_bytes'] + fields['bwd_bytes']
+    fwd_mean, fwd_std = _std(fields['fwd_sq'], fields['fwd_bytes'], fwd)
+    bwd_mean, bwd_std = _std(fields['bwd_sq'], fields['bwd_bytes'], bwd)
+    iat_n = fields['iat_n']
+    records = {
+        'src_ip': uint32_to_ipv4(fields['src_ip']), 'dst_ip': uint32_to_ipv4(fields['dst_ip']),
+        'src_port': fields['src_port'], 'dst_port': fields['dst_port'], 'protocol': fields['protocol'],
+        'timestamp': fields['first_ts'], 'flow_duration': duration,
+        'flow_byts_s': np.divide(byte_total, duration, out=np.zeros(len(duration)), where=duration > 0),
+        'flow_pkts_s': np.divide(pkts, duration, out=np.zeros(len(duration)), where=duration > 0),
+        'tot_fwd_pkts': fwd, 'tot_bwd_pkts': bwd,
+        'totlen_fwd_pkts': fields['fwd_bytes'], 'totlen_bwd_pkts': fields['bwd_bytes'],
+        'fwd_pkt_len_max': fields['fwd_max'], 'fwd_pkt_len_min': np.where(fwd > 0, fields['fwd_min'], 0),
+        'fwd_pkt_len_mean': fwd_mean, 'fwd_pkt_len_std': fwd_std,
+        'bwd_pkt_len_max': fields['bwd_max'], 'bwd_pkt_len_min': np.where(bwd > 0, fields['bwd_min'], 0),
+        'bwd_pkt_len_mean': bwd_mean, 'bwd_pkt_len_std': bwd_std,
+        'flow_iat_mean': fields['iat_mean'],
+        'flow_iat_std': np.sqrt(np.divide(fields['iat_m2'], iat_n - 1, out=np.zeros(len(iat_n)), where=iat_n > 1)),
+        'flow_iat_max': fields['iat_max'], 'flow_iat_min': np.where(iat_n > 0, fields['iat_min'], 0),
+    }
+    for flag in FLAG_BITS:
+        records[f'{flag}_flag_cnt'] = fields[flag]
+    return pd.DataFrame(records)
+
+class FlowTable:
+    """
+    Streaming bidirectional flow table keyed by the canonical 5-tuple.
+    - The first packet's sender is the flow's forward direction.
+    - A gap longer than `idle_timeout` or a flow older than `active_timeout`
+      ends the flow; the next packet starts a new one.
+    - Statistics live in preallocated per-slot arrays (grown by doubling);
+      finished flows are passed to `sink` as DataFrames from flow_records()
+      and their slots reused, so memory tracks the number of live flows.
+    update() handles a whole batch at once: packets are sorted by flow and
+    time, cut into flow segments, reduced per segment with NumPy, and merged
+    into the stored flows. A flow is cut at its first packet active_timeout
+    or more after the flow's first packet, as in expire(), so the flows do not
+    depend on how the capture is batched.
+    """
+
+    def __init__(self, sink, idle_timeout=120.0, active_timeout=1800.0, capacity=4096):
+        self.sink = sink
+        self.idle_timeout = idle_timeout
+        self.active_timeout = active_timeout
+        self.slots = {}
+        self.keys = [None] * capacity
+        self.free = list(range(capacity - 1, -1, -1))
+        self.state = {name: np.zeros(capacity, dtype=dtype) for name, dtype in {**KEY_FIELDS, **STAT_FIELDS}.items()}
+        for name in _MIN_FIELDS:
+            self.state[name][:] = np.inf
+        self.flows_emitted = 0
+
+    def __len__(self):
+        return len(self.slots)
+
+    def _grow(self):
+        old = len(self.keys)
+        self.keys.extend([None] * old)
+        self.free.extend(range(2 * old - 1, old - 1, -1))
+        for name, values in self.state.items():
+            extra = np.full(old, np.inf) if name in _MIN_FIELDS else np.zeros(old)
+            self.state[name] = np.concatenate([values, extra.astype(values.dtype)])
+
+    def _allocate(self, key):
+        if not self.free:
+            self._grow()
+        slot = self.free.pop()
+        self.slots[key] = slot
+        self.keys[slot] = key
+        return slot
+
+    def _emit(self, fields):
+        if len(fields['first_ts']):
+            self.sink(flow_records(fields))
+            self.flows_emitted += len(fields['first_ts'])
+
+    def _evict(self, slots):
+        """Emits the stored flows in `slots` and frees them."""
+        slots = np.asarray(slots, dtype=np.int64)
+        if not len(slots):
+            return
+        self._emit({name: values[slots] for name, values in self.state.items()})
+        for slot in slots.tolist():
+            del self.slots[self.keys[slot]]
+            self.keys[slot] = None
+            self.free.append(slot)
+        for name in STAT_FIELDS:
+            self.state[name][slots] = np.inf if name in _MIN_FIELDS else 0
+
+    def update(self, ts, src, dst, sport, dport, proto, length, flags):
+        """Adds a batch of IPv4 packets given as equal-length arrays; returns the number of flows emitted."""
+        emitted = self.flows_emitted
+        ts = np.asarray(ts, dtype=np.float64)
+        n = len(ts)
+        if n == 0:
+            return 0
+        src, dst = np.asarray(src, dtype=np.uint32), np.asarray(dst, dtype=np.uint32)
+        sport, dport = np.asarray(sport, dtype=np.uint16), np.asarray(dport, dtype=np.uint16)
+        proto, flags = np.asarray(proto, dtype=np.uint8), np.asarray(flags, dtype=np.uint16)
+        length = np.asarray(length, dtype=np.float64)
+
+        # Canonical key: lower (ip, port) endpoint first, so both directions share a flow
+        swap = (src > dst) | ((src == dst) & (sport > dport))
+        canon = np.empty(n, dtype=_CANONICAL)
+        canon['a'], canon['b'] = np.where(swap, dst, src), np.where(swap, src, dst)
+        canon['pa'], canon['pb'] = np.where(swap, dport, sport), np.where(swap, sport, dport)
+        canon['proto'] = proto
+        uniq, inv = np.unique(canon, return_inverse=True)
+        inv = inv.ravel()
+        order = np.lexsort((ts, inv))
+        ts, src, dst, sport, dport, proto, flags, length, inv = (
+            x[order] for x in (ts, src, dst, sport, dport, proto, flags, length, inv))
+        group_keys = uniq.tolist()
+        group_slot = np.array([self.slots.get(k, -1) for k in group_keys], dtype=np.int64)
+        slot = group_slot[inv]
+        group_start = np.r_[True, inv[1:] != inv[:-1]]
+        known = group_start & (slot >= 0)
+
+        # Runs split on idle gaps; the first run of a stored flow continues it
+        prev = np.r_[np.nan, ts[:-1]]
+        prev[group_start] = np.nan
+        prev[known] = self.state['last_ts'][slot[known]]
+        idle_break = ~(ts - prev <= self.idle_timeout)
+        run_start = group_start | idle_break
+        continuing = known & ~idle_break
+        cont_first = np.flatnonzero(continuing)
+        stored_first = self.state['first_ts'][slot[cont_first]]
+        continuing[cont_first[ts[cont_first] - stored_first >= self.active_timeout]] = False
+        self._evict(slot[known & ~continuing])
+
+        # Segments also end at the first packet active_timeout after the segment's
+        # own first packet (or the stored flow's); each pass finds the next cut of every segment
+        origin_ts = ts.copy()
+        origin_ts[continuing] = self.state['first_ts'][slot[continuing]]
+        seg_start = run_start.copy()
+        positions = np.arange(n)
+        while True:
+            head = np.maximum.accumulate(np.where(seg_start, positions, 0))
+            over = np.flatnonzero(ts - origin_ts[head] >= self.active_timeout)
+            if not len(over):
+                break
+            seg_start[over[np.r_[True, head[over[1:]] != head[over[:-1]]]]] = True
+
+        seg = np.cumsum(seg_start) - 1
+        seg_first = np.flatnonzero(seg_start)
+        seg_last = np.r_[seg_first[1:] - 1, n - 1]
+        n_seg = len(seg_first)
+        seg_cont = continuing[seg_first]
+        seg_slot = slot[seg_first]
+        seg_group = inv[seg_first]
+        seg_final = np.r_[seg_group[1:] != seg_group[:-1], True]
+
+        # The forward direction is the stored initiator, or the segment's first sender
+        init_src, init_sport = src[seg_first].copy(), sport[seg_first].copy()
+        cont_slots = seg_slot[seg_cont]
+        init_src[seg_cont] = self.state['src_ip'][cont_slots]
+        init_sport[seg_cont] = self.state['src_port'][cont_slots]
+        fwd = (src == init_src[seg]) & (sport == init_sport[seg])
+
+        iat_prev = np.r_[np.nan, ts[:-1]]
+        iat_prev[seg_start] = np.nan
+        cont_first = seg_first[seg_cont]
+        iat_prev[cont_first] = self.state['last_ts'][cont_slots]
+        iat = ts - iat_prev
+        has_iat = ~np.isnan(iat)
+        iat = np.where(has_iat, iat, 0.0)
+
+        def total(weights):
+            return np.bincount(seg, weights=weights, minlength=n_seg)
+
+        stats = {
+            'src_ip': init_src, 'src_port': init_sport,
+            'dst_ip': np.where(src[seg_first] == init_src, dst[seg_first], src[seg_first]),
+            'dst_port': np.where(src[seg_first] == init_src, dport[seg_first], sport[seg_first]),
+            'protocol': proto[seg_first],
+            'first_ts': ts[seg_first], 'last_ts': ts[seg_last],
+            'fwd_pkts': total(fwd).astype(np.int64), 'bwd_pkts': total(~fwd).astype(np.int64),
+            'fwd_bytes': total(length * fwd), 'bwd_bytes': total(length * ~fwd),
+            'fwd_sq': total(length ** 2 * fwd), 'bwd_sq': total(length ** 2 * ~fwd),
+            'fwd_max': np.maximum.reduceat(np.where(fwd, length, 0), seg_first),
+            'fwd_min': np.minimum.reduceat(np.where(fwd, length, np.inf), seg_first),
+            'bwd_max': np.maximum.reduceat(np.where(fwd, 0, length), seg_first),
+            'bwd_min': np.minimum.reduceat(np.where(fwd, np.inf, length), seg_first),
+            'iat_n': total(has_iat).astype(np.int64),
+            'iat_min': np.minimum.reduceat(np.where(has_iat, iat, np.inf), seg_first),
+            'iat_max': np.maximum.reduceat(iat, seg_first),
+        }
+        stats['iat_mean'] = np.divide(total(iat), stats['iat_n'], out=np.zeros(n_seg), where=stats['iat_n'] > 0)
+        stats['iat_m2'] = total(np.where(has_iat, (iat - stats['iat_mean'][seg]) ** 2, 0.0))
+        for flag, bit in FLAG_BITS.items():
+            stats[flag] = total((flags & bit) != 0).astype(np.int64)
+
+        # Fold continuing segments into their stored flows
+        c, s = np.flatnonzero(seg_cont), cont_slots
+        st = self.state
+        n_a, n_b = st['iat_n'][s], stats['iat_n'][c]
+        n_ab = n_a + n_b
+        delta = stats['iat_mean'][c] - st['iat_mean'][s]
+        st['iat_mean'][s] += np.divide(delta * n_b, n_ab, out=np.zeros(len(c)), where=n_ab > 0)
+        st['iat_m2'][s] += stats['iat_m2'][c] + np.divide(delta ** 2 * n_a * n_b, n_ab, out=np.zeros(len(c)),
+                                                            where=n_ab > 0)
+        st['iat_n'][s] = n_ab
+        for name in _SUM_FIELDS:
+            st[name][s] += stats[name][c]
+        for name in _MIN_FIELDS:
+            st[name][s] = np.minimum(st[name][s], stats[name][c])
+        for name in _MAX_FIELDS:
+            st[name][s] = np.maximum(st[name][s], stats[name][c])
+        st['last_ts'][s] = stats['last_ts'][c]
+        self._evict(s[~seg_final[c]])
+
+        # Segments cut short inside this batch are complete; the last one of each flow stays live
+        done = np.flatnonzero(~seg_cont & ~seg_final)
+        self._emit({name: values[done] for name, values in stats.items()})
+        new = np.flatnonzero(~seg_cont & seg_final)
+        new_slots = np.array([self._allocate(group_keys[g]) for g in seg_group[new].tolist()], dtype=np.int64)
+        for name, values in stats.items():
+            self.state[name][new_slots] = values[new]
+
+        self.expire(ts.max())
+        return self.flows_emitted - emitted
+
+    def expire(self, now):
+        """Emits flows idle past idle_timeout or older than active_timeout at time `now`."""
+        st = self.state
+        live = np.array(list(self.slots.values()), dtype=np.int64)
+        if not len(live):
+            return 0
+        stale = live[(st['last_ts'][live] < now - self.idle_timeout)
+                     | (st['first_ts'][live] <= now - self.active_timeout)]
+        self._evict(stale)
+        return len(stale)
+
+    def flush(self):
+        """Emits every live flow, e.g. at the end of a capture."""
+        self._evict(list(self.slots.values()))
+
+def update_from_columns(table, cols):
+    """Feeds the IPv4 frames of one pcap_decoder batch into a FlowTable."""
+    ip = cols['eth_type'] == ETH_IPV4
+    return table.update(cols['timestamp'][ip], cols['ip_src'][ip], cols['ip_dst'][ip],
+                        cols['tcp_srcport'][ip] | cols['udp_srcport'][ip],
+                        cols['tcp_dstport'][ip] | cols['udp_dstport'][ip],
+                        cols['ip_proto'][ip], cols['caplen'][ip], cols['tcp_flags'][ip])
+
+def _iter_columns(path, chunk_packets):
+    """Bulk-decoded batches, or scapy-decoded ones for captures the bulk decoder cannot map."""
+    try:
+        batches = iter_pcap_columns(path, chunk_packets)
+        first = next(batches, None)
+    except ValueError as e:
+        print(f"  {e}; decoding packet by packet")
+        yield from iter_scapy_columns(path, chunk_packets)
+        return
+    if first is not None:
+        yield first
+    yield from batches
+
+def iter_pcap_flows(path, idle_timeout=120.0, active_timeout=1800.0, chunk_packets=500_000):
+    """
+    Yields DataFrames of flow records as they finish while streaming a pcap file.
+    Ethernet and Linux cooked (tcpdump -i any) captures are decoded in bulk;
+    pcapng and other link types are read packet by packet.
+    """
+    finished = []
+    table = FlowTable(finished.append, idle_timeout, active_timeout)
+    for cols in _iter_columns(path, chunk_packets):
+        update_from_columns(table, cols)
+        yield from finished
+        finished.clear()
+    table.flush()
+    yield from finished
+
+def pcap_to_flows(path, **kwargs):
+    """All flow records of a pcap file as one DataFrame."""
+    frames = list(iter_pcap_flows(path, **kwargs))
+    return pd.concat(frames, ignore_index=True) if frames else flow_records(
+        {name: np.zeros(0, dtype=dtype) for name, dtype in {**KEY_FIELDS, **STAT_FIELDS}.items()})
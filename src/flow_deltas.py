@@ -0,0 +1,117 @@
+"""
+Flow Counter Deltas
+Turns cumulative Floodlight flow counters into per-interval packet and byte rates
+"""
+import numpy as np
+
+DELTA_COLUMNS = ['packet_delta', 'byte_delta', 'interval', 'pkt_rate', 'byte_rate', 'counter_reset']
+
+def match_key(match):
+    """Hashable, order-independent key for a flow's match dict."""
+    return tuple(sorted((k, str(v)) for k, v in match.items()))
+
+def flow_key(flow):
+    """Key for one flow entry: same-match entries at another priority or in another table are distinct."""
+    return str(flow.get('priority', '')), str(flow.get('tableId', '')), match_key(flow.get('match', {}))
+
+def _flow_duration(flow):
+    return float(flow.get('durationSeconds', 0)) + float(flow.get('durationNSeconds', 0)) / 1e9
+
+class FlowDeltaEngine:
+    """
+    Per-flow counter state keyed by (dpid, priority, table, match), held in parallel arrays:
+    - update() takes one switch's flow table and returns the packet/byte deltas
+      and rates since that flow was last seen.
+    - A counter or duration going backwards means the flow was removed and
+      reinstalled; the delta then restarts from zero (counter_reset is True).
+    - Flows not seen for `idle_timeout` seconds are expired and their slots reused.
+    The interval is the switch-reported duration difference when available,
+    falling back to the wall-clock time between snapshots.
+    """
+
+    def __init__(self, idle_timeout=60.0, capacity=1024):
+        self.idle_timeout = idle_timeout
+        self.slots = {}
+        self.keys = [None] * capacity
+        self.free = list(range(capacity - 1, -1, -1))
+        self.packets = np.zeros(capacity, dtype=np.int64)
+        self.bytes = np.zeros(capacity, dtype=np.int64)
+        self.duration = np.zeros(capacity, dtype=np.float64)
+        self.last_seen = np.full(capacity, -np.inf)
+        self.active = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def _grow(self):
+        old = len(self.keys)
+        self.keys.extend([None] * old)
+        self.free.extend(range(2 * old - 1, old - 1, -1))
+        self.packets = np.concatenate([self.packets, np.zeros(old, dtype=np.int64)])
+        self.bytes = np.concatenate([self.bytes, np.zeros(old, dtype=np.int64)])
+        self.duration = np.concatenate([self.duration, np.zeros(old)])
+        self.last_seen = np.concatenate([self.last_seen, np.full(old, -np.inf)])
+        self.active = np.concatenate([self.active, np.zeros(old, dtype=bool)])
+
+    def _slot(self, key):
+        slot = self.slots.get(key)
+        if slot is None:
+            if not self.free:
+                self._grow()
+            slot = self.free.pop()
+            self.slots[key] = slot
+            self.keys[slot] = key
+        return slot
+
+    def update(self, dpid, flows, timestamp):
+        """
+        Applies one flow table snapshot taken at `timestamp` (seconds).
+        Returns a dict of arrays (DELTA_COLUMNS plus 'new'), aligned with `flows`.
+        """
+        n = len(flows)
+        slots = np.empty(n, dtype=np.int64)
+        packets = np.empty(n, dtype=np.int64)
+        byte_counts = np.empty(n, dtype=np.int64)
+        duration = np.empty(n, dtype=np.float64)
+        for i, flow in enumerate(flows):
+            slots[i] = self._slot((dpid, flow_key(flow)))
+            packets[i] = int(flow.get('packetCount', 0))
+            byte_counts[i] = int(flow.get('byteCount', 0))
+            duration[i] = _flow_duration(flow)
+
+        new = ~self.active[slots]
+        reset = ~new & ((packets < self.packets[slots]) | (byte_counts < self.bytes[slots])
+                        | (duration < self.duration[slots]))
+        restart = new | reset
+
+        # New and reinstalled flows count from their installation
+        packet_delta = np.where(restart, packets, packets - self.packets[slots])
+        byte_delta = np.where(restart, byte_counts, byte_counts - self.bytes[slots])
+        interval = np.where(restart, duration, duration - self.duration[slots])
+        wall = np.where(restart, 0.0, timestamp - self.last_seen[slots])
+        interval = np.where(interval > 0, interval, wall)
+        pkt_rate = np.divide(packet_delta, interval, out=np.zeros(n), where=interval > 0)
+        byte_rate = np.divide(byte_delta, interval, out=np.zeros(n), where=interval > 0)
+
+        self.packets[slots] = packets
+        self.bytes[slots] = byte_counts
+        self.duration[slots] = duration
+        self.last_seen[slots] = timestamp
+        self.active[slots] = True
+        self.expire(timestamp)
+
+        return {
+            'packet_delta': packet_delta, 'byte_delta': byte_delta, 'interval': interval,
+            'pkt_rate': pkt_rate, 'byte_rate': byte_rate, 'counter_reset': reset, 'new': new
+        }
+
+    def expire(self, now):
+        """Drops flows idle for longer than idle_timeout; returns how many were dropped."""
+        idle = np.flatnonzero(self.active & (self.last_seen < now - self.idle_timeout))
+        for slot in idle:
+            del self.slots[self.keys[slot]]
+            self.keys[slot] = None
+            self.free.append(int(slot))
+        self.active[idle] = False
+        self.last_seen[idle] = -np.inf
+        return len(idle)
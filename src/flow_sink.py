@@ -0,0 +1,194 @@
+"""
+Columnar Flow Sink
+Buffered background writer that stores collector records as Parquet row groups
+"""
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Low-cardinality string columns written dictionary-encoded (read back as categoricals)
+DICTIONARY_COLUMNS = ('switch', 'switch_dpid', 'src', 'dst', 'src_ip', 'dst_ip', 'nw_src', 'nw_dst',
+                      'dl_src', 'dl_dst', 'eth_src', 'eth_dst', 'ipv4_src', 'ipv4_dst',
+                      'protocol', 'action', 'label')
+
+# Match fields that Floodlight reports as numbers on one poll and '' on the next;
+# always stored as strings so every batch fits the file's schema
+STRING_COLUMNS = ('in_port', 'dl_src', 'dl_dst', 'dl_type', 'nw_src', 'nw_dst', 'nw_proto', 'tp_src', 'tp_dst',
+                  'eth_type', 'ip_proto', 'ipv4_src', 'ipv4_dst', 'tcp_src', 'tcp_dst', 'udp_src', 'udp_dst')
+
+_STOP = object()
+
+def _to_table(batch, dictionary_columns, string_columns=STRING_COLUMNS):
+    df = pd.concat(batch, ignore_index=True) if len(batch) > 1 else batch[0]
+    # Controller JSON mixes '' with numbers in match fields; store those as strings.
+    # assign() builds a new frame: a single-frame batch is the caller's own DataFrame
+    df = df.assign(**{col: df[col].astype(str) for col in df.columns
+                      if col in string_columns or df[col].dtype == object})
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for i, field in enumerate(table.schema):
+        # pandas >= 3 str columns arrive as large_string; keep one string type for all batches
+        if pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            column = table.column(i).cast(pa.string())
+            if field.name in dictionary_columns:
+                column = column.dictionary_encode()
+            table = table.set_column(i, field.name, column)
+    return table
+
+def _unify_types(tables):
+    """Casts columns whose type differs between files (older sink files) to strings."""
+    types = {}
+    for table in tables:
+        for field in table.schema:
+            value_type = field.type.value_type if pa.types.is_dictionary(field.type) else field.type
+            types.setdefault(field.name, set()).add(value_type)
+    mixed = {name for name, found in types.items() if len(found) > 1}
+    unified = []
+    for table in tables:
+        for i, name in enumerate(table.column_names):
+            if name in mixed:
+                table = table.set_column(i, name, table.column(i).cast(pa.string()))
+        unified.append(table)
+    return unified
+
+class FlowSink:
+    """
+    Append-only Parquet sink fed from a background writer thread.
+    - write() only enqueues; the thread batches records into row groups of up to
+      `batch_rows` rows, or whatever arrived within `flush_interval` seconds.
+    - The queue is bounded, so a stalled disk slows the collector down instead
+      of letting memory grow.
+    - `string_columns` are always written as strings. A batch whose columns
+      still do not fit the open file's schema starts a new file instead of
+      failing the writer.
+    - Files rotate once they pass `max_file_bytes` or `max_file_seconds`. The
+      file being written is hidden (leading '.') and renamed when closed, so
+      `load_flows(directory)` / `pd.read_parquet(directory)` only see complete files.
+    Use as `with FlowSink('ml_dataset/flows') as sink: sink.write(records)`.
+    """
+
+    def __init__(self, directory, prefix='flows', batch_rows=10000, flush_interval=5.0,
+                 max_file_bytes=64 << 20, max_file_seconds=3600, max_pending=256,
+                 dictionary_columns=DICTIONARY_COLUMNS, string_columns=STRING_COLUMNS):
+        self.directory = directory
+        self.prefix = prefix
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.max_file_seconds = max_file_seconds
+        self.dictionary_columns = set(dictionary_columns)
+        self.string_columns = set(string_columns)
+        self.files = []
+        self.rows_written = 0
+        self.error = None
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._writer = None
+        self._file = None
+        self._schema = None
+        self._tmp_path = None
+        self._path = None
+        self._opened = 0.0
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name='FlowSink', daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, records):
+        """Queues a list of record dicts or a DataFrame for writing."""
+        if self.error is not None:
+            raise RuntimeError('FlowSink writer failed') from self.error
+        df = records if isinstance(records, pd.DataFrame) else pd.DataFrame.from_records(records)
+        if not df.empty:
+            self._queue.put(df)
+
+    def close(self):
+        """Flushes pending records, closes the current file and stops the thread."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        if self.error is not None:
+            raise RuntimeError('FlowSink writer failed') from self.error
+
+    def _run(self):
+        batch, rows = [], 0
+        deadline = time.monotonic() + self.flush_interval
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.01))
+                except queue.Empty:
+                    item = None
+                if item is not None and item is not _STOP:
+                    batch.append(item)
+                    rows += len(item)
+                if batch and (item is _STOP or rows >= self.batch_rows or time.monotonic() >= deadline):
+                    self._write_batch(batch)
+                    batch, rows = [], 0
+                if time.monotonic() >= deadline:
+                    deadline = time.monotonic() + self.flush_interval
+                if item is _STOP:
+                    break
+        except Exception as e:
+            self.error = e
+        finally:
+            self._close_file()
+
+    def _write_batch(self, batch):
+        table = _to_table(batch, self.dictionary_columns, self.string_columns)
+        if self._writer is not None and (
+                self._file.tell() >= self.max_file_bytes
+                or time.monotonic() - self._opened >= self.max_file_seconds):
+            self._close_file()
+        if self._writer is not None:
+            try:
+                table = table.select(self._schema.names).cast(self._schema)
+            except (KeyError, pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+                # Columns changed type or went missing: continue in a file with the new schema
+                self._close_file()
+        if self._writer is None:
+            self._open_file(table.schema)
+        self._writer.write_table(table)
+        self.rows_written += table.num_rows
+
+    def _open_file(self, schema):
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        name = f"{self.prefix}_{stamp}.parquet"
+        self._path = os.path.join(self.directory, name)
+        self._tmp_path = os.path.join(self.directory, '.' + name)
+        dictionary = [f.name for f in schema if pa.types.is_dictionary(f.type)]
+        # Written through a Python file so tell() gives the size including buffered bytes
+        self._file = open(self._tmp_path, 'wb')
+        self._writer = pq.ParquetWriter(self._file, schema, use_dictionary=dictionary or False,
+                                        compression='zstd')
+        self._schema = schema
+        self._opened = time.monotonic()
+
+    def _close_file(self):
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._file.close()
+        os.replace(self._tmp_path, self._path)
+        self.files.append(self._path)
+        self._writer = None
+
+def load_flows(directory, prefix='flows', columns=None):
+    """Reads every completed sink file in `directory`, oldest first, into one DataFrame."""
+    files = sorted(f for f in os.listdir(directory)
+                   if f.startswith(prefix + '_') and f.endswith('.parquet'))
+    if not files:
+        return pd.DataFrame(columns=columns)
+    tables = [pq.read_table(os.path.join(directory, f), columns=columns) for f in files]
+    try:
+        return pa.concat_tables(tables, promote_options='permissive').to_pandas()
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.concat_tables(_unify_types(tables), promote_options='permissive').to_pandas()
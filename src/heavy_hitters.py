@@ -0,0 +1,93 @@
+"""
+Streaming Heavy-Hitter Counting
+Bounded-memory Space-Saving summary for top-k IP address frequencies
+"""
+import numpy as np
+import pandas as pd
+
+def count_values(values, sep=None):
+    """
+    Exact counts of one chunk of values as a Series indexed by value.
+    With sep, each value is split into several items (e.g. 'ip1,ip2'),
+    splitting only the distinct values rather than every row.
+    """
+    counts = pd.Series(values).value_counts(sort=False)
+    counts = counts[counts > 0]
+    if sep is None or len(counts) == 0:
+        return counts.astype('int64')
+
+    parts = counts.index.astype(str).str.split(sep)
+    lengths = parts.str.len().to_numpy()
+    items = np.concatenate(parts.to_list())
+    repeated = np.repeat(counts.to_numpy(), lengths)
+    return pd.Series(repeated, index=items).groupby(level=0, sort=False).sum().astype('int64')
+
+class SpaceSaving:
+    """
+    Space-Saving top-k summary holding at most `capacity` counters.
+    - Counts are exact while no more than `capacity` distinct items have been seen.
+    - Beyond that, each estimate over-counts by at most its `errors` entry, and
+      any untracked item occurred at most `floor` times.
+    Chunks are merged in bulk, so the summary can be fed from CSV chunks,
+    DataFrames or live collector output.
+    """
+
+    def __init__(self, capacity=10000):
+        if capacity < 1:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self.counts = pd.Series(dtype='int64')
+        self.errors = pd.Series(dtype='int64')
+        self.floor = 0
+        self.total = 0
+
+    def __len__(self):
+        return len(self.counts)
+
+    def update(self, values, sep=None):
+        """Counts one chunk of raw values (list, array or Series)."""
+        return self.update_counts(count_values(values, sep=sep))
+
+    def update_counts(self, counts):
+        """Merges pre-aggregated item -> count pairs (dict or Series)."""
+        counts = pd.Series(counts, dtype='int64')
+        counts = counts[counts > 0]
+        if len(counts) == 0:
+            return self
+        if not counts.index.is_unique:
+            counts = counts.groupby(level=0, sort=False).sum()
+        self.total += int(counts.sum())
+
+        is_new = ~counts.index.isin(self.counts.index)
+        merged = self.counts.add(counts, fill_value=0).astype('int64')
+        errors = self.errors.reindex(merged.index, fill_value=0)
+        if self.floor:
+            # A newly tracked item may have been evicted earlier with up to `floor` hits
+            new_items = counts.index[is_new]
+            merged[new_items] += self.floor
+            errors[new_items] = self.floor
+
+        if len(merged) > self.capacity:
+            values = merged.to_numpy()
+            order = np.argpartition(-values, self.capacity)
+            self.floor = max(self.floor, int(values[order[self.capacity:]].max()))
+            keep = order[:self.capacity]
+            merged = merged.iloc[keep]
+            errors = errors.iloc[keep]
+
+        self.counts = merged
+        self.errors = errors
+        return self
+
+    def top(self, n=None):
+        """Tracked items and estimated counts, most frequent first."""
+        ranked = self.counts.sort_values(ascending=False, kind='stable')
+        return ranked if n is None else ranked.head(n)
+
+    def to_frame(self, n=None, item_column='ip', count_column='Count'):
+        """Top items as the ip/Count frame used by plot_ip_distribution."""
+        ranked = self.top(n)
+        return pd.DataFrame({
+            item_column: ranked.index.to_numpy(),
+            count_column: ranked.to_numpy()
+        })
@@ -0,0 +1,279 @@
+"""
+Attack Run Label Index
+Incrementally updated index of the labels_*.json runs written by simulate_attack.sh
+"""
+import glob
+import json
+import os
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from src.data_processing import ipv4_to_uint32
+
+# SIMULATION_DURATION in simulate_attack.sh; a run's JSON may override it
+# with 'duration' (seconds) or an explicit 'end' timestamp
+DEFAULT_DURATION = 1200
+INDEX_FILE = '.label_index.parquet'
+TIMESTAMP_FORMAT = '%Y%m%d_%H%M%S'
+
+_MAC_TIME = np.dtype([('mac', np.uint64), ('start', np.int64)])
+
+RUN_COLUMNS = ('run', 'attack_type', 'lab_prefix', 'attacker', 'victim', 'start_ns', 'end_ns',
+               'spoofed_mac', 'target_ip', 'source', 'source_mtime_ns', 'source_size')
+
+def mac_to_uint64(values):
+    """'aa:bb:cc:dd:ee:ff' strings (or integers) -> uint64, parsing each distinct MAC once."""
+    values = np.atleast_1d(np.asarray(values))
+    if values.dtype.kind in 'iu':
+        return values.astype(np.uint64)
+    codes, uniques = pd.factorize(values)
+    parsed = np.array([_parse_mac(v) for v in uniques], dtype=np.uint64)
+    return np.where(codes >= 0, parsed[np.maximum(codes, 0)] if len(parsed) else 0, 0).astype(np.uint64)
+
+def _parse_mac(mac):
+    try:
+        return int(str(mac).replace(':', '').replace('-', ''), 16)
+    except ValueError:
+        return 0
+
+def to_wall_ns(values):
+    """
+    Timestamps as int64 ns on the local wall clock the label files use.
+    Datetimes and strings are taken as written; numbers are epoch seconds.
+    Unparseable values become -1.
+    """
+    values = pd.Series(np.atleast_1d(np.asarray(values)))
+    if pd.api.types.is_numeric_dtype(values):
+        local_tz = datetime.now().astimezone().tzinfo
+        parsed = pd.to_datetime(values, unit='s', utc=True, errors='coerce').dt.tz_convert(local_tz)
+        parsed = parsed.dt.tz_localize(None)
+    else:
+        parsed = pd.to_datetime(values, errors='coerce')
+        if parsed.dt.tz is not None:
+            parsed = parsed.dt.tz_localize(None)
+    ns = parsed.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    return np.where(parsed.isna().to_numpy(), -1, ns)
+
+def read_run(path, duration=DEFAULT_DURATION):
+    """One index row for a labels_*.json file, or None if it is empty or malformed."""
+    try:
+        with open(path) as f:
+            label = json.load(f)
+        start = pd.to_datetime(label['timestamp'], format=TIMESTAMP_FORMAT)
+        if 'end' in label:
+            end = pd.to_datetime(label['end'], format=TIMESTAMP_FORMAT)
+        else:
+            end = start + pd.Timedelta(seconds=float(label.get('duration', duration)))
+        st = os.stat(path)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return {
+        'run': label['timestamp'],
+        'attack_type': label.get('attack_type', 'unknown'),
+        'lab_prefix': label.get('lab_prefix', ''),
+        'attacker': label.get('attacker', ''),
+        'victim': label.get('victim', ''),
+        'start_ns': start.value,
+        'end_ns': end.value,
+        'spoofed_mac': int(mac_to_uint64([label.get('spoofed_mac', '')])[0]),
+        'target_ip': int(ipv4_to_uint32([label.get('target_ip', '')])[0]),
+        'source': os.path.basename(path),
+        'source_mtime_ns': st.st_mtime_ns,
+        'source_size': st.st_size
+    }
+
+def _empty_runs():
+    return pd.DataFrame({c: pd.Series(dtype=object if c in ('run', 'attack_type', 'lab_prefix', 'attacker',
+                                                               'victim', 'source') else np.int64)
+                         for c in RUN_COLUMNS}).astype({'spoofed_mac': np.uint64, 'target_ip': np.uint32})
+
+class LabelIndex:
+    """
+    Sorted-array index over attack runs for ground-truth lookups.
+    - `runs` holds one row per labels_*.json, sorted by attack window start.
+    - Windows are stabbed with searchsorted over the starts plus a running
+      maximum of the ends, so a timestamp lookup is O(log n) (plus the number
+      of overlapping runs when windows overlap); MAC / target IP lookups are
+      binary searches over sorted copies of those columns, and (time, MAC)
+      lookups search the runs sorted by spoofed MAC, then start.
+    - `update()` re-reads only label files that are new or changed since the
+      last call (by mtime and size), drops deleted ones, and persists the
+      index next to the labels so later processes start from it.
+    Use as `index = LabelIndex('labels').update(); index.label(flows_df)`.
+    """
+
+    def __init__(self, label_dir='labels', index_path=None, duration=DEFAULT_DURATION):
+        self.label_dir = label_dir
+        self.index_path = index_path or os.path.join(label_dir, INDEX_FILE)
+        self.duration = duration
+        self.runs = _empty_runs()
+        self._loaded = False
+        self._build()
+
+    def __len__(self):
+        return len(self.runs)
+
+    def update(self):
+        """Indexes new or changed label files; returns self."""
+        if not self._loaded:
+            self._load()
+        current = {}
+        for path in glob.glob(os.path.join(self.label_dir, 'labels_*.json')):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            current[os.path.basename(path)] = (path, st.st_mtime_ns, st.st_size)
+
+        known = {row.source: (row.source_mtime_ns, row.source_size)
+                 for row in self.runs[['source', 'source_mtime_ns', 'source_size']].itertuples()}
+        stale = [name for name, sig in known.items() if current.get(name, (None,))[1:] != sig]
+        fresh = [read_run(path, self.duration) for name, (path, *sig) in current.items()
+                 if known.get(name) != tuple(sig)]
+        fresh = [row for row in fresh if row is not None]
+        if not stale and not fresh:
+            return self
+
+        runs = self.runs[~self.runs['source'].isin(stale)]
+        if fresh:
+            runs = pd.concat([runs, pd.DataFrame(fresh, columns=list(RUN_COLUMNS))], ignore_index=True)
+        self.runs = runs.astype(_empty_runs().dtypes.to_dict())
+        self._build()
+        self._save()
+        return self
+
+    def runs_at(self, timestamp):
+        """All runs whose attack window contains the timestamp."""
+        t = to_wall_ns([timestamp])[0]
+        if t < 0:
+            return self.runs.iloc[:0]
+        hi = np.searchsorted(self._start, t, side='right')
+        # Every run before lo ends before t: max_end is the running maximum
+        lo = np.searchsorted(self._max_end, t, side='left')
+        pos = np.arange(lo, hi)
+        return self.runs.iloc[pos[self._end[pos] >= t]]
+
+    def lookup(self, timestamps):
+        """
+        Row position in `runs` of the run covering each timestamp, or -1.
+        Where windows overlap, the run that started last wins.
+        """
+        t = to_wall_ns(timestamps)
+        if not len(self.runs):
+            return np.full(len(t), -1)
+        idx = np.searchsorted(self._start, t, side='right') - 1
+        found = (t >= 0) & (idx >= 0)
+        found[found] = self._max_end[idx[found]] >= t[found]
+        result = np.where(found, idx, -1)
+        # Runs that started later ended already; walk back to a longer, earlier one
+        for i in np.flatnonzero(found & (self._end[np.maximum(idx, 0)] < t)):
+            j = idx[i]
+            while self._end[j] < t[i]:
+                j -= 1
+            result[i] = j
+        return result
+
+    def lookup_at_mac(self, timestamps, macs):
+        """
+        Row position of the run covering each timestamp that spoofed that row's
+        MAC, or -1. Where several such runs overlap, the one that started last wins.
+        """
+        t = to_wall_ns(timestamps)
+        macs = mac_to_uint64(macs)
+        if not len(self.runs):
+            return np.full(len(t), -1)
+        query = np.empty(len(t), dtype=_MAC_TIME)
+        query['mac'], query['start'] = macs, t
+        # Latest run with this MAC that started by t
+        idx = np.searchsorted(self._mac_time, query, side='right') - 1
+        found = (t >= 0) & (idx >= 0)
+        found[found] = self._mac_sorted[idx[found]] == macs[found]
+        found[found] = self._mac_max_end[idx[found]] >= t[found]
+        # It ended already; walk back to a longer, earlier run with the same MAC
+        for i in np.flatnonzero(found & (self._mac_end[np.maximum(idx, 0)] < t)):
+            j = idx[i]
+            while self._mac_end[j] < t[i]:
+                j -= 1
+            idx[i] = j
+        result = np.full(len(t), -1)
+        result[found] = self._mac_order[idx[found]]
+        return result
+
+    def lookup_mac(self, macs):
+        """Row position of the latest run that spoofed each MAC, or -1."""
+        return self._lookup_sorted(self._mac_sorted, self._mac_order, mac_to_uint64(macs))
+
+    def lookup_ip(self, addrs):
+        """Row position of the latest run that targeted each IPv4 address, or -1."""
+        return self._lookup_sorted(self._ip_sorted, self._ip_order, ipv4_to_uint32(addrs))
+
+    def label(self, df, time_column='timestamp', mac_column=None):
+        """
+        Adds label / attack_type / run columns to a flow or packet frame.
+        A row is an attack when its time falls in a run's window and, if
+        mac_column is given, its MAC is that run's spoofed MAC.
+        """
+        if mac_column is None:
+            pos = self.lookup(df[time_column])
+        else:
+            pos = self.lookup_at_mac(df[time_column], df[mac_column])
+        hit = pos >= 0
+        attack_type = np.full(len(df), 'normal', dtype=object)
+        run = np.full(len(df), '', dtype=object)
+        attack_type[hit] = self.runs['attack_type'].to_numpy()[pos[hit]]
+        run[hit] = self.runs['run'].to_numpy()[pos[hit]]
+        df['label'] = hit.astype(int)
+        df['attack_type'] = attack_type
+        df['run'] = run
+        return df
+
+    def _lookup_sorted(self, keys, order, values):
+        idx = np.searchsorted(keys, values, side='right') - 1
+        found = idx >= 0
+        found[found] = keys[idx[found]] == values[found]
+        result = np.full(len(values), -1)
+        result[found] = order[idx[found]]
+        return result
+
+    def _build(self):
+        self.runs = self.runs.sort_values(['start_ns', 'run'], kind='stable').reset_index(drop=True)
+        self._start = self.runs['start_ns'].to_numpy(dtype=np.int64)
+        self._end = self.runs['end_ns'].to_numpy(dtype=np.int64)
+        self._max_end = np.maximum.accumulate(self._end) if len(self._end) else self._end
+        self._mac = self.runs['spoofed_mac'].to_numpy(dtype=np.uint64)
+        ip = self.runs['target_ip'].to_numpy(dtype=np.uint32)
+        # Ties sort by start, so the last entry for a key is its latest run
+        self._mac_order = np.lexsort((self._start, self._mac))
+        self._mac_sorted = self._mac[self._mac_order]
+        self._mac_time = np.empty(len(self._mac), dtype=_MAC_TIME)
+        self._mac_time['mac'], self._mac_time['start'] = self._mac_sorted, self._start[self._mac_order]
+        self._mac_end = self._end[self._mac_order]
+        # Running maximum of the ends within each MAC's runs
+        self._mac_max_end = pd.Series(self._mac_end).groupby(self._mac_sorted).cummax().to_numpy(dtype=np.int64)
+        self._ip_order = np.lexsort((self._start, ip))
+        self._ip_sorted = ip[self._ip_order]
+
+    def _load(self):
+        self._loaded = True
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            runs = pd.read_parquet(self.index_path)
+        except Exception as e:
+            print(f"Ignoring unreadable label index {self.index_path}: {e}")
+            return
+        if list(runs.columns) == list(RUN_COLUMNS):
+            self.runs = runs.astype(_empty_runs().dtypes.to_dict())
+            self._build()
+
+    def _save(self):
+        try:
+            tmp_file = self.index_path + '.tmp'
+            self.runs.to_parquet(tmp_file, index=False)
+            os.replace(tmp_file, self.index_path)
+        except Exception as e:
+            print(f"Skipping label index cache {self.index_path}: {e}")
+
+def load_label_index(label_dir='labels', duration=DEFAULT_DURATION):
+    """The up-to-date index for label_dir."""
+    return LabelIndex(label_dir, duration=duration).update()
@@ -0,0 +1,116 @@
+"""
+Live SDN Features
+Turns per-poll Floodlight flow and port statistics into rows with the
+dataset_sdn.csv columns, so trained models can score controller data directly
+"""
+import asyncio
+import time
+import numpy as np
+import pandas as pd
+from src.data_processing import SDN_SCHEMA, DEFAULT_FEATURE_SET, _apply_schema
+from src.flow_deltas import FlowDeltaEngine
+
+PROTOCOL_NAMES = {1: 'ICMP', 6: 'TCP', 17: 'UDP'}
+
+def dpid_to_int(dpid):
+    """'00:00:00:00:00:00:00:01' -> 1, matching the dataset's integer switch ids."""
+    return int(str(dpid).replace(':', ''), 16)
+
+def normalize_port_stats(data):
+    """
+    {dpid: {port_number: (tx_bytes, rx_bytes)}} from either the flat
+    {dpid: [port, ...]} layout or Floodlight's {dpid: {'port_reply': [{'port': [...]}]}}.
+    """
+    stats = {}
+    for dpid, ports in (data or {}).items():
+        if isinstance(ports, dict):
+            ports = [p for reply in ports.get('port_reply', []) for p in reply.get('port', [])]
+        stats[dpid] = {str(p.get('port_number', p.get('portNumber'))):
+                       (int(p.get('transmit_bytes', p.get('transmitBytes', 0))),
+                        int(p.get('receive_bytes', p.get('receiveBytes', 0))))
+                       for p in ports}
+    return stats
+
+def _protocol(value):
+    value = str(value or 0)
+    number = int(value, 16) if value.lower().startswith('0x') else int(value)
+    return PROTOCOL_NAMES.get(number, 'OTHER')
+
+class LiveFeatureEngine:
+    """
+    Joins each poll's flow tables with its port statistics and emits one row
+    per IPv4 flow in the dataset_sdn schema (DEFAULT_FEATURE_SET, typed per SDN_SCHEMA).
+    - pktperflow/byteperflow/pktrate come from a FlowDeltaEngine, so they are
+      per-interval values rather than cumulative counters.
+    - Pairflow is 1 when the reverse (dst -> src) flow is installed on the same
+      switch, looked up in a set of (dpid, src, dst) keys built once per poll.
+    - tx/rx/tot_kbps are the rates of the flow's in_port since the previous poll.
+    - packetins has no REST counter, so it comes from the optional per-DPID
+      `packetins` mapping passed to update() (0 otherwise).
+    """
+
+    def __init__(self, idle_timeout=60.0):
+        self.deltas = FlowDeltaEngine(idle_timeout=idle_timeout)
+        self.ports = {}
+
+    def _port_rates(self, port_stats, timestamp):
+        rates = {}
+        for dpid, ports in port_stats.items():
+            for port, (tx, rx) in ports.items():
+                prev = self.ports.get((dpid, port))
+                self.ports[(dpid, port)] = (tx, rx, timestamp)
+                if prev is None or timestamp <= prev[2] or tx < prev[0] or rx < prev[1]:
+                    rates[(dpid, port)] = (tx, rx, 0.0, 0.0)
+                    continue
+                interval = timestamp - prev[2]
+                rates[(dpid, port)] = (tx, rx, (tx - prev[0]) * 8 / 1000 / interval,
+                                       (rx - prev[1]) * 8 / 1000 / interval)
+        return rates
+
+    def update(self, snapshots, port_stats=None, timestamp=None, packetins=None):
+        """
+        snapshots: FlowSnapshots (or (dpid, flows) pairs) from one poll.
+        port_stats: raw port statistics JSON for the same poll.
+        Returns a DataFrame with DEFAULT_FEATURE_SET columns.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        rates = self._port_rates(normalize_port_stats(port_stats), timestamp)
+        packetins = packetins or {}
+
+        tables = []
+        for snap in snapshots:
+            dpid, flows = snap[0], snap[1]
+            flows = [f for f in flows if 'ipv4_src' in f.get('match', {}) and 'ipv4_dst' in f.get('match', {})]
+            tables.append((dpid, flows, self.deltas.update(dpid, flows, timestamp)))
+        pairs = {(dpid, f['match']['ipv4_src'], f['match']['ipv4_dst']) for dpid, flows, _ in tables for f in flows}
+
+        columns = {name: [] for name in DEFAULT_FEATURE_SET}
+        for dpid, flows, deltas in tables:
+            n_flows = len(flows)
+            for i, flow in enumerate(flows):
+                match = flow['match']
+                src, dst = match['ipv4_src'], match['ipv4_dst']
+                port = str(match.get('in_port', ''))
+                tx, rx, tx_kbps, rx_kbps = rates.get((dpid, port), (0, 0, 0.0, 0.0))
+                dur, dur_nsec = int(flow.get('durationSeconds', 0)), int(flow.get('durationNSeconds', 0))
+                row = {
+                    'dt': int(timestamp), 'switch': dpid_to_int(dpid), 'src': src, 'dst': dst,
+                    'pktcount': int(flow.get('packetCount', 0)), 'bytecount': int(flow.get('byteCount', 0)),
+                    'dur': dur, 'dur_nsec': dur_nsec, 'tot_dur': dur * 1e9 + dur_nsec,
+                    'flows': n_flows, 'packetins': int(packetins.get(dpid, 0)),
+                    'pktperflow': int(deltas['packet_delta'][i]), 'byteperflow': int(deltas['byte_delta'][i]),
+                    'pktrate': int(deltas['pkt_rate'][i]), 'Pairflow': int((dpid, dst, src) in pairs),
+                    'Protocol': _protocol(match.get('ip_proto')),
+                    'port_no': int(port) if port.isdigit() else 0, 'tx_bytes': tx, 'rx_bytes': rx,
+                    'tx_kbps': int(tx_kbps), 'rx_kbps': rx_kbps, 'tot_kbps': tx_kbps + rx_kbps
+                }
+                for name in DEFAULT_FEATURE_SET:
+                    columns[name].append(row[name])
+        schema = {col: SDN_SCHEMA[col] for col in DEFAULT_FEATURE_SET}
+        return _apply_schema(pd.DataFrame(columns), schema)
+
+    async def poll(self, poller, packetins=None):
+        """One concurrent poll of flow tables and port stats through a FloodlightPoller."""
+        snapshots, port_stats = await asyncio.gather(poller.poll(), poller.fetch_port_stats())
+        timestamp = np.median([s.timestamp_ns for s in snapshots]) / 1e9 if snapshots else time.time()
+        return self.update([s for s in snapshots if s.error is None], port_stats, timestamp, packetins)
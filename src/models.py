@@ -1,3 +1,8 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from threadpoolctl import threadpool_limits
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.linear_model import LogisticRegression
@@ -44,3 +49,70 @@ def train_model(model, X_train, y_train):
     """
     model.fit(X_train, y_train)
     return model
+
+# Models whose own fit is parallel (n_jobs); spare cores in the budget go to them
+PARALLEL_FIT_MODELS = ('random_forest',)
+
+# Per-worker state set up by _init_worker
+_worker_data = {}
+
+def set_n_jobs(model, n_jobs):
+    """
+    Sets the innermost n_jobs parameter of a (possibly nested) estimator to
+    n_jobs and any outer ones to 1, so nesting never multiplies threads.
+    """
+    keys = [k for k in model.get_params() if k == 'n_jobs' or k.endswith('__n_jobs')]
+    if keys:
+        params = {k: 1 for k in keys}
+        params[max(keys, key=lambda k: k.count('__'))] = n_jobs
+        model.set_params(**params)
+    return model
+
+def _init_worker(shm_name, shape, dtype, y_train):
+    # Pool workers share the parent's resource tracker, so the parent's unlink cleans up
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_data['shm'] = shm
+    _worker_data['X'] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _worker_data['y'] = y_train
+    # One BLAS/OpenMP thread per worker unless a model asks for more via n_jobs
+    _worker_data['limits'] = threadpool_limits(limits=1)
+
+def _fit_in_worker(name, model, n_jobs):
+    set_n_jobs(model, n_jobs)
+    model.fit(_worker_data['X'], _worker_data['y'])
+    return name, model
+
+def train_models_parallel(models, X_train, y_train, core_budget=None, n_workers=None):
+    """
+    Trains independent models concurrently in a process pool.
+    - X_train is copied once into shared memory; workers map the same pages
+      instead of unpickling their own copy per task.
+    - core_budget caps the total cores: each pool worker uses one, and the
+      remainder goes to models in PARALLEL_FIT_MODELS through their n_jobs.
+    Returns a dict of fitted models in the original order.
+    """
+    budget = core_budget or os.cpu_count() or 1
+    n_workers = max(1, min(n_workers or budget, len(models), budget))
+    spare = budget - n_workers
+
+    X = np.ascontiguousarray(X_train)
+    y = np.asarray(y_train)
+
+    shm = shared_memory.SharedMemory(create=True, size=max(X.nbytes, 1))
+    try:
+        np.ndarray(X.shape, dtype=X.dtype, buffer=shm.buf)[...] = X
+        # Longest fits first so they do not end up as the tail of the schedule
+        order = sorted(models, key=lambda name: name not in PARALLEL_FIT_MODELS)
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                 initargs=(shm.name, X.shape, X.dtype, y)) as pool:
+            futures = [
+                pool.submit(_fit_in_worker, name, models[name],
+                            1 + spare if name in PARALLEL_FIT_MODELS else 1)
+                for name in order
+            ]
+            fitted = dict(future.result() for future in futures)
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return {name: fitted[name] for name in models}
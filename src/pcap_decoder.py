@@ -0,0 +1,295 @@
+"""
+PCAP Header Decoder
+Bulk decoding of Ethernet / IPv4 / TCP / UDP / ICMP / ARP header fields from a
+memory-mapped classic pcap file (Ethernet or Linux cooked) into column arrays
+"""
+import mmap
+import struct
+import numpy as np
+import pandas as pd
+
+# Global header magic (as read little-endian) -> (byte order, timestamp divisor)
+PCAP_MAGIC = {
+    0xA1B2C3D4: ('<', 1e6), 0xD4C3B2A1: ('>', 1e6),
+    0xA1B23C4D: ('<', 1e9), 0x4D3CB2A1: ('>', 1e9),
+}
+LINKTYPE_ETHERNET = 1
+# Linux cooked capture, written by `tcpdump -i any`: a 16-byte header with the
+# sender's link-layer address at offset 6 and the protocol at offset 14
+LINKTYPE_LINUX_SLL = 113
+_SLL_HEADER = 16
+ETH_IPV4, ETH_ARP, ETH_VLAN, ETH_QINQ = 0x0800, 0x0806, 0x8100, 0x88A8
+
+# Bytes kept per frame: Ethernet + one VLAN tag + IPv4 with options + TCP up to the window
+_WINDOW = 14 + 4 + 60 + 16
+
+# Fixed-offset views over the start of each frame (after any VLAN tag is removed)
+_ETH_IPV4 = np.dtype([
+    ('eth_dst', 'u1', 6), ('eth_src', 'u1', 6), ('eth_type', '>u2'),
+    ('ver_ihl', 'u1'), ('tos', 'u1'), ('ip_len', '>u2'), ('ip_id', '>u2'), ('frag', '>u2'),
+    ('ip_ttl', 'u1'), ('ip_proto', 'u1'), ('ip_csum', '>u2'), ('ip_src', '>u4'), ('ip_dst', '>u4'),
+])
+_ETH_ARP = np.dtype([
+    ('eth', 'u1', 14), ('htype', '>u2'), ('ptype', '>u2'), ('hlen', 'u1'), ('plen', 'u1'),
+    ('opcode', '>u2'), ('sha', 'u1', 6), ('spa', '>u4'), ('tha', 'u1', 6), ('tpa', '>u4'),
+])
+_TCP = np.dtype([('sport', '>u2'), ('dport', '>u2'), ('seq', '>u4'), ('ack', '>u4'),
+                 ('off_flags', '>u2'), ('window', '>u2')])
+_UDP = np.dtype([('sport', '>u2'), ('dport', '>u2'), ('length', '>u2'), ('csum', '>u2')])
+
+COLUMNS = {
+    'timestamp': np.float64, 'frame_len': np.uint32, 'caplen': np.uint32,
+    'eth_src': np.uint64, 'eth_dst': np.uint64, 'eth_type': np.uint16,
+    'ip_src': np.uint32, 'ip_dst': np.uint32, 'ip_proto': np.uint8, 'ip_ttl': np.uint8, 'ip_len': np.uint16,
+    'ip_frag_offset': np.uint16,
+    'tcp_srcport': np.uint16, 'tcp_dstport': np.uint16, 'tcp_flags': np.uint16, 'tcp_window': np.uint16,
+    'udp_srcport': np.uint16, 'udp_dstport': np.uint16, 'udp_len': np.uint16,
+    'icmp_type': np.uint8, 'icmp_code': np.uint8,
+    'arp_opcode': np.uint16, 'arp_src_mac': np.uint64, 'arp_src_ip': np.uint32, 'arp_dst_ip': np.uint32,
+}
+
+def _mac_to_int(octets):
+    """(n, 6) uint8 -> uint64."""
+    out = np.zeros(len(octets), dtype=np.uint64)
+    for j in range(6):
+        out = (out << np.uint64(8)) | octets[:, j].astype(np.uint64)
+    return out
+
+def uint32_to_ipv4(addrs):
+    """uint32 addresses -> dotted-quad strings, formatting each distinct value once."""
+    codes, uniques = pd.factorize(np.asarray(addrs, dtype=np.uint32))
+    text = np.array([f"{a >> 24}.{a >> 16 & 255}.{a >> 8 & 255}.{a & 255}" for a in uniques.tolist()],
+                    dtype=object)
+    return text[codes]
+
+def uint64_to_mac(macs):
+    """uint64 MACs -> 'aa:bb:cc:dd:ee:ff' strings, formatting each distinct value once."""
+    codes, uniques = pd.factorize(np.asarray(macs, dtype=np.uint64))
+    text = np.array([':'.join(f"{m >> s & 255:02x}" for s in range(40, -8, -8)) for m in uniques.tolist()],
+                    dtype=object)
+    return text[codes]
+
+def open_pcap(path):
+    """
+    Memory-maps a classic pcap file and returns (data, byte_order, ts_divisor, linktype).
+    Raises ValueError for pcapng and for link types other than Ethernet and
+    Linux cooked (SLL), which callers should hand to a general decoder instead.
+    """
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if f.seek(0, 2) else b''
+    if len(mm) < 24:
+        raise ValueError(f"{path} is too short to be a pcap file")
+    magic = struct.unpack_from('<I', mm, 0)[0]
+    if magic not in PCAP_MAGIC:
+        raise ValueError(f"{path} is not a classic pcap file (magic {magic:#x})")
+    order, divisor = PCAP_MAGIC[magic]
+    linktype = struct.unpack_from(order + 'I', mm, 20)[0] & 0x0FFFFFFF
+    if linktype not in (LINKTYPE_ETHERNET, LINKTYPE_LINUX_SLL):
+        raise ValueError(f"{path} has link type {linktype}, only Ethernet and Linux SLL are decoded in bulk")
+    return np.frombuffer(mm, dtype=np.uint8), order, divisor, linktype
+
+def _record_offsets(data, pos, order, max_packets):
+    """Walks record headers from `pos`; returns (header offsets, next position)."""
+    read_len = struct.Struct(order + 'I').unpack_from
+    end = len(data) - 16
+    offsets = []
+    while pos <= end and len(offsets) < max_packets:
+        offsets.append(pos)
+        pos += 16 + read_len(data, pos + 8)[0]
+    offsets = np.asarray(offsets, dtype=np.int64)
+    # A record cut off at the end of the file is dropped
+    if len(offsets) and pos > len(data):
+        offsets = offsets[:-1]
+    return offsets, pos
+
+def _gather(data, starts, width, lengths=None):
+    """
+    (n, width) bytes starting at each offset, zero past `lengths`. Gathered one
+    byte column at a time so temporaries stay O(n) rather than O(n * width).
+    """
+    out = np.zeros((len(starts), width), dtype=np.uint8)
+    last = len(data) - 1
+    for j in range(width):
+        if lengths is None:
+            out[:, j] = data[starts + j]
+        else:
+            present = lengths > j
+            out[present, j] = data[np.minimum(starts[present] + j, last)]
+    return out
+
+def _sll_window(raw):
+    """
+    (n, _WINDOW + 2) Linux cooked frame starts -> (n, _WINDOW) Ethernet layout:
+    the sender's address (when it is 6 bytes) becomes eth_src, eth_dst stays 0.
+    """
+    win = np.zeros((len(raw), _WINDOW), dtype=np.uint8)
+    mac = (raw[:, 4] == 0) & (raw[:, 5] == 6)
+    win[mac, 6:12] = raw[mac, 6:12]
+    win[:, 12:] = raw[:, 14:]
+    return win
+
+def _sll_to_ethernet(frame):
+    """One Linux cooked frame rewritten as an Ethernet frame, for the fallback decoder."""
+    src = frame[6:12] if frame[4:6] == b'\x00\x06' else bytes(6)
+    return bytes(6) + src + frame[14:]
+
+def _decode_records(data, rec, order, divisor, linktype=LINKTYPE_ETHERNET):
+    n = len(rec)
+    header = _gather(data, rec, 16).view(order + 'u4').astype(np.uint32)
+    caplen = header[:, 2].astype(np.int64)
+    cols = {name: np.zeros(n, dtype=dtype) for name, dtype in COLUMNS.items()}
+    cols['timestamp'] = header[:, 0] + header[:, 1] / divisor
+    cols['caplen'] = header[:, 2].copy()
+    cols['frame_len'] = header[:, 3].copy()
+
+    # Fixed-width window over the start of each frame
+    if linktype == LINKTYPE_LINUX_SLL:
+        win = _sll_window(_gather(data, rec + 16, _WINDOW + _SLL_HEADER - 14, caplen))
+        caplen = caplen - (_SLL_HEADER - 14)
+    else:
+        win = _gather(data, rec + 16, _WINDOW, caplen)
+
+    eth_type = win[:, 12].astype(np.uint16) << 8 | win[:, 13]
+    vlan = eth_type == ETH_VLAN
+    if vlan.any():
+        # Drop the 4-byte tag so the network header sits at offset 14 for every frame
+        win[vlan, 12:-4] = win[vlan, 16:]
+        win[vlan, -4:] = 0
+        caplen = np.where(vlan, caplen - 4, caplen)
+        eth_type = win[:, 12].astype(np.uint16) << 8 | win[:, 13]
+
+    eth = np.ascontiguousarray(win[:, :_ETH_IPV4.itemsize]).view(_ETH_IPV4).ravel()
+    cols['eth_src'] = _mac_to_int(eth['eth_src'])
+    cols['eth_dst'] = _mac_to_int(eth['eth_dst'])
+    cols['eth_type'] = eth_type
+
+    unusual = (caplen < 14) | (eth_type == ETH_VLAN) | (eth_type == ETH_QINQ)
+    ip = eth_type == ETH_IPV4
+    ihl = (eth['ver_ihl'] & 0x0F).astype(np.int64) * 4
+    unusual |= ip & ((eth['ver_ihl'] >> 4 != 4) | (ihl < 20) | (caplen < 14 + ihl))
+    ip &= ~unusual
+    for name in ('ip_src', 'ip_dst', 'ip_proto', 'ip_ttl', 'ip_len'):
+        cols[name] = np.where(ip, eth[name], 0).astype(COLUMNS[name])
+
+    # Transport headers start after the IPv4 options; only first fragments carry them
+    cols['ip_frag_offset'] = np.where(ip, eth['frag'] & 0x1FFF, 0).astype(np.uint16)
+    first_fragment = cols['ip_frag_offset'] == 0
+    l4_start = np.minimum(14 + ihl, _WINDOW - _TCP.itemsize)
+    l4 = np.take_along_axis(win, l4_start[:, None] + np.arange(_TCP.itemsize), axis=1)
+    l4_caplen = caplen - 14 - ihl
+    proto = eth['ip_proto']
+
+    tcp = ip & first_fragment & (proto == 6)
+    unusual |= tcp & (l4_caplen < _TCP.itemsize)
+    tcp &= ~unusual
+    tcp_view = np.ascontiguousarray(l4).view(_TCP).ravel()
+    cols['tcp_srcport'] = np.where(tcp, tcp_view['sport'], 0).astype(np.uint16)
+    cols['tcp_dstport'] = np.where(tcp, tcp_view['dport'], 0).astype(np.uint16)
+    cols['tcp_flags'] = np.where(tcp, tcp_view['off_flags'] & 0x1FF, 0).astype(np.uint16)
+    cols['tcp_window'] = np.where(tcp, tcp_view['window'], 0).astype(np.uint16)
+
+    udp = ip & first_fragment & (proto == 17)
+    unusual |= udp & (l4_caplen < _UDP.itemsize)
+    udp &= ~unusual
+    udp_view = np.ascontiguousarray(l4[:, :_UDP.itemsize]).view(_UDP).ravel()
+    cols['udp_srcport'] = np.where(udp, udp_view['sport'], 0).astype(np.uint16)
+    cols['udp_dstport'] = np.where(udp, udp_view['dport'], 0).astype(np.uint16)
+    cols['udp_len'] = np.where(udp, udp_view['length'], 0).astype(np.uint16)
+
+    icmp = ip & first_fragment & (proto == 1)
+    unusual |= icmp & (l4_caplen < 2)
+    icmp &= ~unusual
+    cols['icmp_type'] = np.where(icmp, l4[:, 0], 0).astype(np.uint8)
+    cols['icmp_code'] = np.where(icmp, l4[:, 1], 0).astype(np.uint8)
+
+    arp = eth_type == ETH_ARP
+    unusual |= arp & (caplen < _ETH_ARP.itemsize)
+    arp &= ~unusual
+    arp_view = np.ascontiguousarray(win[:, :_ETH_ARP.itemsize]).view(_ETH_ARP).ravel()
+    cols['arp_opcode'] = np.where(arp, arp_view['opcode'], 0).astype(np.uint16)
+    cols['arp_src_mac'] = np.where(arp, _mac_to_int(arp_view['sha']), 0).astype(np.uint64)
+    cols['arp_src_ip'] = np.where(arp, arp_view['spa'], 0).astype(np.uint32)
+    cols['arp_dst_ip'] = np.where(arp, arp_view['tpa'], 0).astype(np.uint32)
+    return cols, unusual
+
+def _scapy_decode(frame):
+    """Slow path for frames the bulk decoder cannot place (QinQ, truncated or malformed headers)."""
+    from scapy.all import Ether
+    return _packet_fields(Ether(frame))
+
+def _packet_fields(pkt):
+    """COLUMNS fields of one parsed scapy packet (any link layer)."""
+    from scapy.all import IP, TCP, UDP, ICMP, ARP
+    fields = {}
+    if IP in pkt:
+        ip = pkt[IP]
+        fields.update(eth_type=ETH_IPV4, ip_src=_ip_int(ip.src), ip_dst=_ip_int(ip.dst),
+                      ip_proto=ip.proto, ip_ttl=ip.ttl, ip_len=ip.len or 0,
+                      ip_frag_offset=ip.frag)
+        if TCP in pkt:
+            fields.update(tcp_srcport=pkt[TCP].sport, tcp_dstport=pkt[TCP].dport,
+                          tcp_flags=int(pkt[TCP].flags), tcp_window=pkt[TCP].window)
+        elif UDP in pkt:
+            fields.update(udp_srcport=pkt[UDP].sport, udp_dstport=pkt[UDP].dport, udp_len=pkt[UDP].len or 0)
+        elif ICMP in pkt:
+            fields.update(icmp_type=pkt[ICMP].type, icmp_code=pkt[ICMP].code)
+    elif ARP in pkt:
+        arp = pkt[ARP]
+        fields.update(eth_type=ETH_ARP, arp_opcode=arp.op, arp_src_mac=int(arp.hwsrc.replace(':', ''), 16),
+                      arp_src_ip=_ip_int(arp.psrc), arp_dst_ip=_ip_int(arp.pdst))
+    return fields
+
+def _ip_int(addr):
+    a, b, c, d = (int(x) for x in addr.split('.'))
+    return a << 24 | b << 16 | c << 8 | d
+
+def iter_pcap_columns(path, chunk_packets=500_000, fallback=_scapy_decode):
+    """
+    Yields dicts of column arrays (see COLUMNS) for up to chunk_packets frames
+    at a time. Frames the fixed-offset decoder cannot handle are re-decoded one
+    by one with `fallback(frame_bytes) -> {column: value}`; pass None to leave
+    their fields at 0.
+    """
+    data, order, divisor, linktype = open_pcap(path)
+    pos = 24
+    while True:
+        rec, pos = _record_offsets(data, pos, order, chunk_packets)
+        if not len(rec):
+            return
+        cols, unusual = _decode_records(data, rec, order, divisor, linktype)
+        if fallback is not None:
+            for i in np.flatnonzero(unusual):
+                start = int(rec[i]) + 16
+                frame = bytes(data[start:start + int(cols['caplen'][i])])
+                if linktype == LINKTYPE_LINUX_SLL:
+                    frame = _sll_to_ethernet(frame)
+                for name, value in fallback(frame).items():
+                    cols[name][i] = value
+        yield cols
+
+def iter_scapy_columns(path, chunk_packets=500_000):
+    """
+    iter_pcap_columns() batches for captures the bulk decoder rejects (pcapng,
+    other link types), parsed one packet at a time with scapy.
+    """
+    from scapy.all import PcapReader
+    rows = []
+    with PcapReader(path) as reader:
+        for pkt in reader:
+            rows.append(dict(_packet_fields(pkt), timestamp=float(pkt.time), caplen=len(pkt),
+                             frame_len=getattr(pkt, 'wirelen', None) or len(pkt)))
+            if len(rows) >= chunk_packets:
+                yield _rows_to_columns(rows)
+                rows = []
+    if rows:
+        yield _rows_to_columns(rows)
+
+def _rows_to_columns(rows):
+    return {name: np.array([row.get(name, 0) for row in rows], dtype=dtype) for name, dtype in COLUMNS.items()}
+
+def read_pcap_columns(path, chunk_packets=500_000, fallback=_scapy_decode):
+    """Decodes a whole capture into one DataFrame with the COLUMNS layout."""
+    frames = [pd.DataFrame(cols) for cols in iter_pcap_columns(path, chunk_packets, fallback)]
+    if not frames:
+        return pd.DataFrame({name: np.zeros(0, dtype=dtype) for name, dtype in COLUMNS.items()})
+    return pd.concat(frames, ignore_index=True)
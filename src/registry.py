@@ -0,0 +1,112 @@
+"""
+Model Registry
+Versioned joblib persistence for trained models with their preprocessor and metrics
+"""
+import hashlib
+import json
+import os
+from collections import namedtuple
+from datetime import datetime
+import joblib
+import numpy as np
+
+REGISTRY_DIR = 'models'
+
+LoadedModel = namedtuple('LoadedModel', ['model', 'preprocessor', 'metadata'])
+
+def _jsonable(value):
+    """Converts metrics (numpy arrays/scalars, nested dicts) to JSON-safe types."""
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+class ModelRegistry:
+    """
+    Stores each trained estimator under <root>/<name>/<version>/:
+    - model.joblib and preprocessor.joblib, uncompressed so their numpy arrays
+      can be memory-mapped and shared between scoring processes.
+    - meta.json with the dataset hash, parameters and metrics.
+    The version is derived from the dataset hash and the model parameters, so
+    retraining the same configuration on the same data overwrites in place.
+    """
+
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = root
+
+    @staticmethod
+    def make_version(dataset_hash, params):
+        payload = json.dumps({'dataset': dataset_hash, 'params': params}, sort_keys=True, default=repr)
+        return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+    def save(self, name, model, preprocessor=None, metrics=None, dataset_hash=None, params=None):
+        """Persists a trained model and returns its version id."""
+        if params is None and hasattr(model, 'get_params'):
+            params = model.get_params()
+        # Nested estimators are covered by their flattened 'outer__inner' entries,
+        # and n_jobs only affects speed, so neither takes part in versioning
+        params = {k: v for k, v in (params or {}).items()
+                  if isinstance(v, (str, int, float, bool, type(None))) and not k.endswith('n_jobs')}
+        version = self.make_version(dataset_hash, params)
+        version_dir = os.path.join(self.root, name, version)
+        os.makedirs(version_dir, exist_ok=True)
+
+        joblib.dump(model, os.path.join(version_dir, 'model.joblib'))
+        if preprocessor is not None:
+            joblib.dump(preprocessor, os.path.join(version_dir, 'preprocessor.joblib'))
+
+        # Per-sample outputs are not worth keeping; everything else is summary metrics
+        metrics = {k: v for k, v in (metrics or {}).items() if k != 'y_prob'}
+        metadata = {
+            'name': name,
+            'version': version,
+            'model_class': type(model).__name__,
+            'dataset_hash': dataset_hash,
+            'params': params,
+            'metrics': _jsonable(metrics),
+            'created': datetime.now().isoformat()
+        }
+        tmp_path = os.path.join(version_dir, 'meta.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(metadata, f, indent=2)
+        os.replace(tmp_path, os.path.join(version_dir, 'meta.json'))
+        return version
+
+    def versions(self, name):
+        """Metadata of every saved version of a model, oldest first."""
+        model_dir = os.path.join(self.root, name)
+        if not os.path.isdir(model_dir):
+            return []
+        found = []
+        for version in os.listdir(model_dir):
+            meta_path = os.path.join(model_dir, version, 'meta.json')
+            if os.path.exists(meta_path):
+                with open(meta_path) as f:
+                    found.append(json.load(f))
+        return sorted(found, key=lambda meta: meta['created'])
+
+    def latest(self, name):
+        versions = self.versions(name)
+        return versions[-1]['version'] if versions else None
+
+    def load(self, name, version=None, mmap_mode='r'):
+        """
+        Loads a model, its preprocessor (or None) and its metadata.
+        With mmap_mode, large numpy arrays are mapped from disk instead of read.
+        """
+        version = version or self.latest(name)
+        if version is None:
+            raise FileNotFoundError(f"No saved versions of model '{name}' in {self.root}")
+        version_dir = os.path.join(self.root, name, version)
+
+        with open(os.path.join(version_dir, 'meta.json')) as f:
+            metadata = json.load(f)
+        model = joblib.load(os.path.join(version_dir, 'model.joblib'), mmap_mode=mmap_mode)
+        preprocessor_path = os.path.join(version_dir, 'preprocessor.joblib')
+        preprocessor = joblib.load(preprocessor_path) if os.path.exists(preprocessor_path) else None
+        return LoadedModel(model, preprocessor, metadata)
@@ -0,0 +1,60 @@
+"""
+Batch Scoring
+Preloads a registry model once and scores whole batches of feature rows per call
+"""
+import numpy as np
+import pandas as pd
+from src.compiled_trees import compile_model
+from src.registry import ModelRegistry, REGISTRY_DIR
+
+class BatchScorer:
+    """
+    A trained model and its preprocessor, loaded once and kept warm:
+    - Tree ensembles are compiled to flat node arrays (compiled_trees), which
+      score a batch in a handful of NumPy passes; other models are used as is.
+    - `score(rows)` takes a DataFrame, a list of feature dicts, or an already
+      encoded matrix and makes one predict_proba call for the whole batch.
+    """
+
+    def __init__(self, model, preprocessor=None, metadata=None, compile=True):
+        self.model = model
+        self.preprocessor = preprocessor
+        self.metadata = metadata or {}
+        self.name = self.metadata.get('name', type(model).__name__)
+        self.compiled = False
+        if compile:
+            try:
+                self.model = compile_model(model)
+                self.compiled = True
+            except (TypeError, ValueError):
+                pass
+        self.classes_ = np.asarray(getattr(self.model, 'classes_', [0, 1]))
+
+    @classmethod
+    def from_registry(cls, name='random_forest', registry_dir=REGISTRY_DIR, version=None, compile=True):
+        loaded = ModelRegistry(registry_dir).load(name, version)
+        return cls(loaded.model, loaded.preprocessor, loaded.metadata, compile=compile)
+
+    def encode(self, rows):
+        if isinstance(rows, np.ndarray):
+            return rows
+        if not isinstance(rows, pd.DataFrame):
+            rows = pd.DataFrame.from_records(list(rows))
+        if self.preprocessor is not None:
+            return self.preprocessor.transform(rows)
+        return rows.to_numpy(dtype=np.float64)
+
+    def predict_proba(self, rows):
+        X = self.encode(rows)
+        if not len(X):
+            return np.empty((0, len(self.classes_)))
+        if not hasattr(self.model, 'predict_proba'):
+            # e.g. the LinearSVC pipeline: one-hot of the predicted class
+            return (self.model.predict(X)[:, None] == self.classes_[None, :]).astype(np.float64)
+        return self.model.predict_proba(X)
+
+    def score(self, rows):
+        """(predicted class, its probability) arrays for a batch of rows."""
+        proba = self.predict_proba(rows)
+        best = np.argmax(proba, axis=1)
+        return self.classes_[best], proba[np.arange(len(best)), best]
@@ -0,0 +1,105 @@
+"""
+tshark Field Export
+Reads selected packet fields through one `tshark -T fields` stream and parses it
+in large chunks into the pcap_to_features columns
+"""
+import shutil
+import subprocess
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Output column -> (tshark field, default for packets without that layer)
+FIELDS = {
+    'timestamp': ('frame.time_epoch', 0.0),
+    'frame_len': ('frame.len', 0),
+    'ip_src': ('ip.src', '0.0.0.0'),
+    'ip_dst': ('ip.dst', '0.0.0.0'),
+    'ip_proto': ('ip.proto', 0),
+    'ip_ttl': ('ip.ttl', 0),
+    'ip_len': ('ip.len', 0),
+    'tcp_srcport': ('tcp.srcport', 0),
+    'tcp_dstport': ('tcp.dstport', 0),
+    'tcp_flags': ('tcp.flags', 0),
+    'tcp_window': ('tcp.window_size', 0),
+    'udp_srcport': ('udp.srcport', 0),
+    'udp_dstport': ('udp.dstport', 0),
+    'udp_len': ('udp.length', 0),
+    'icmp_type': ('icmp.type', 0),
+    'icmp_code': ('icmp.code', 0),
+    'arp_opcode': ('arp.opcode', 0),
+    'arp_src_mac': ('arp.src.hw_mac', '00:00:00:00:00:00'),
+}
+_HEX_COLUMNS = ('tcp_flags',)
+_STRING_COLUMNS = ('ip_src', 'ip_dst', 'arp_src_mac')
+
+def tshark_available():
+    return shutil.which('tshark') is not None
+
+def tshark_command(pcap_file, display_filter=None):
+    cmd = ['tshark', '-r', pcap_file, '-n', '-T', 'fields', '-E', 'separator=/t', '-E', 'header=n',
+           '-E', 'occurrence=f']
+    for field, _ in FIELDS.values():
+        cmd += ['-e', field]
+    if display_filter:
+        cmd += ['-Y', display_filter]
+    return cmd
+
+def _parse_hex(values):
+    """'0x0012'-style strings -> ints, parsing each distinct value once."""
+    codes, uniques = pd.factorize(values)
+    if not len(uniques):
+        return np.zeros(len(codes), dtype=np.int64)
+    parsed = np.array([int(v, 16) for v in uniques], dtype=np.int64)
+    return np.where(codes >= 0, parsed[np.maximum(codes, 0)], 0)
+
+def _finish_chunk(chunk):
+    for col in _HEX_COLUMNS:
+        chunk[col] = _parse_hex(chunk[col])
+    for col, (_, default) in FIELDS.items():
+        if col not in _HEX_COLUMNS:
+            chunk[col] = chunk[col].fillna(default)
+    int_cols = [c for c, (_, d) in FIELDS.items() if isinstance(d, int) and c not in _HEX_COLUMNS]
+    chunk[int_cols] = chunk[int_cols].astype(np.int64)
+    return chunk
+
+def iter_tshark_features(pcap_file, chunksize=200000, display_filter=None):
+    """
+    Yields DataFrames of up to chunksize packets with the pcap_to_features
+    columns. tshark decodes the capture once and streams only the requested
+    fields; pandas parses that stream with its C reader.
+    If tshark fails after some packets were read (e.g. a capture cut short by a
+    killed tcpdump), those packets are kept and the failure is only reported;
+    a failure before any packet raises RuntimeError.
+    """
+    dtype = {col: (str if col in _STRING_COLUMNS or col in _HEX_COLUMNS else np.float64)
+             for col in FIELDS}
+    # stderr goes to a file so a chatty tshark cannot block on a full pipe
+    with tempfile.TemporaryFile() as stderr_file:
+        proc = subprocess.Popen(tshark_command(pcap_file, display_filter), stdout=subprocess.PIPE,
+                                stderr=stderr_file)
+        completed = False
+        rows = 0
+        try:
+            reader = pd.read_csv(proc.stdout, sep='\t', header=None, names=list(FIELDS), dtype=dtype,
+                                 chunksize=chunksize, quoting=3)
+            for chunk in reader:
+                rows += len(chunk)
+                yield _finish_chunk(chunk)
+            completed = True
+        except pd.errors.EmptyDataError:
+            completed = True
+        finally:
+            proc.stdout.close()
+            returncode = proc.wait()
+        if completed and returncode != 0:
+            stderr_file.seek(0)
+            message = f"tshark failed on {pcap_file}: {stderr_file.read().decode(errors='replace').strip()}"
+            if not rows:
+                raise RuntimeError(message)
+            print(f"  [!] {message}; keeping the {rows} packets read before the error")
+
+def read_tshark_features(pcap_file, chunksize=200000, display_filter=None):
+    """All packets of a capture as one DataFrame with the pcap_to_features columns."""
+    chunks = list(iter_tshark_features(pcap_file, chunksize, display_filter))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=list(FIELDS))
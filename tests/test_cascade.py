@@ -0,0 +1,25 @@
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.naive_bayes import GaussianNB
+
+from src.cascade import CascadeClassifier, cascade_report
+
+
+def test_cascade_escalates_only_uncertain_rows():
+    rng = np.random.default_rng(0)
+    X = rng.random((800, 4))
+    y = (X[:, 0] + 0.2 * X[:, 1] > 0.6).astype(int)
+    first = GaussianNB().fit(X, y)
+    forest = RandomForestClassifier(n_estimators=20, random_state=0).fit(X, y)
+
+    cascade = CascadeClassifier(first, forest, band=(0.2, 0.8))
+    proba = cascade.predict_proba(X)
+    escalate = cascade.escalation_mask(first.predict_proba(X))
+    np.testing.assert_allclose(proba[escalate], forest.predict_proba(X[escalate]))
+    np.testing.assert_allclose(proba[~escalate], first.predict_proba(X[~escalate]))
+
+    # An empty band never escalates; the full band always defers to the forest
+    assert not CascadeClassifier(first, forest, band=(0.5, 0.5)).escalation_mask(np.array([[0.9, 0.1]])).any()
+    report = cascade_report(CascadeClassifier(first, forest, band=(0, 1)), X, y, repeats=1)
+    assert report['escalation_rate'] == 1.0
+    assert report['accuracy_delta'] == 0.0
@@ -0,0 +1,21 @@
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.multiclass import OneVsRestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from src.compiled_trees import compile_model
+
+
+def test_compiled_models_match_sklearn():
+    rng = np.random.default_rng(0)
+    X = rng.random((600, 5))
+    y = (X[:, 0] * 3 + X[:, 1]).astype(int)
+    X_test = rng.random((300, 5))
+
+    for model in (DecisionTreeClassifier(random_state=0),
+                  RandomForestClassifier(n_estimators=15, max_depth=6, random_state=0),
+                  OneVsRestClassifier(RandomForestClassifier(n_estimators=5, random_state=0))):
+        model.fit(X, y)
+        compiled = compile_model(model)
+        np.testing.assert_allclose(compiled.predict_proba(X_test), model.predict_proba(X_test), atol=1e-12)
+        np.testing.assert_array_equal(compiled.predict(X_test[:1]), model.predict(X_test[:1]))
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+from src.data_processing import (
+    load_data, preprocess_sdn_data, preprocess_sdn_data_chunked, SDNPreprocessor, ipv4_to_uint32
+)
+
+
+def _write_sdn_csv(path, n=200):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'dt': rng.integers(1000, 40000, n), 'switch': rng.integers(1, 11, n),
+        'src': rng.choice(['10.0.0.1', '10.0.0.2', '10.0.0.3'], n),
+        'dst': rng.choice(['10.0.0.4', '10.0.0.5'], n),
+        'pktcount': rng.integers(0, 1000, n), 'bytecount': rng.integers(0, 10**6, n),
+        'dur': rng.integers(0, 100, n), 'dur_nsec': rng.integers(0, 10**9, n),
+        'tot_dur': rng.random(n) * 1e11, 'flows': rng.integers(1, 5, n),
+        'packetins': rng.integers(0, 100, n), 'pktperflow': rng.integers(0, 100, n),
+        'byteperflow': rng.integers(0, 10**4, n), 'pktrate': rng.integers(0, 100, n),
+        'Pairflow': rng.integers(0, 2, n), 'Protocol': rng.choice(['UDP', 'TCP', 'ICMP'], n),
+        'port_no': rng.integers(1, 5, n), 'tx_bytes': rng.integers(0, 10**8, n),
+        'rx_bytes': rng.integers(0, 10**8, n), 'tx_kbps': rng.integers(0, 100, n),
+        'rx_kbps': rng.integers(0, 100, n).astype(float), 'tot_kbps': rng.integers(0, 100, n).astype(float),
+        'label': rng.integers(0, 2, n)
+    })
+    df.loc[[3, 7], 'rx_kbps'] = np.nan
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_load_data_schema_and_cache(tmp_path):
+    csv_path = tmp_path / 'dataset_sdn.csv'
+    raw = _write_sdn_csv(csv_path)
+    cache_dir = tmp_path / 'cache'
+
+    df = load_data(str(csv_path), cache_dir=str(cache_dir))
+    assert df['src'].dtype == 'category'
+    assert df['label'].dtype == np.int8
+    assert len(list(cache_dir.iterdir())) == 1
+
+    cached = load_data(str(csv_path), cache_dir=str(cache_dir))
+    pd.testing.assert_frame_equal(df, cached)
+
+    X, _, _ = preprocess_sdn_data(cached)
+    X_raw, _, _ = preprocess_sdn_data(raw)
+    np.testing.assert_array_equal(X, X_raw)
+
+
+def test_chunked_preprocessing_matches_in_memory(tmp_path):
+    csv_path = tmp_path / 'dataset_sdn.csv'
+    raw = _write_sdn_csv(csv_path)
+
+    X, y, names = preprocess_sdn_data(raw)
+    X_mm, y_mm, names_mm = preprocess_sdn_data_chunked(str(csv_path), str(tmp_path / 'X.npy'), chunksize=37)
+
+    assert isinstance(X_mm, np.memmap)
+    assert names_mm == names
+    np.testing.assert_array_equal(X_mm, X)
+    np.testing.assert_array_equal(y_mm, y.to_numpy())
+
+
+def test_preprocessor_roundtrip_and_unknowns(tmp_path):
+    raw = _write_sdn_csv(tmp_path / 'dataset_sdn.csv').dropna()
+    preprocessor = SDNPreprocessor().fit(raw)
+    preprocessor.save(tmp_path / 'preprocessor.joblib')
+    loaded = SDNPreprocessor.load(tmp_path / 'preprocessor.joblib')
+
+    X = loaded.transform(raw)
+    np.testing.assert_array_equal(X, preprocess_sdn_data(raw)[0])
+
+    flow = raw.iloc[0].to_dict()
+    np.testing.assert_array_equal(loaded.transform(flow)[0], X[0])
+
+    flow['src'] = '192.0.2.1'
+    src_col = loaded.feature_names_.index('src')
+    assert loaded.transform(flow)[0, src_col] == -1
+
+
+def test_ipv4_to_uint32():
+    values = ['10.0.0.1', '255.255.255.255', '192.168.100.200', '256.0.0.1',
+              '1.2.3', '1.2.3.4.5', 'ae:0d:0a:07:48:a8', '', None]
+    addrs, valid = ipv4_to_uint32(values, return_valid=True)
+    assert addrs.dtype == np.uint32
+    assert addrs[:3].tolist() == [167772161, 4294967295, 3232261320]
+    assert valid.tolist() == [True] * 3 + [False] * 6
+    assert (addrs[3:] == 0).all()
+
+    categorical = pd.Series(['10.0.0.2', 'bad', '10.0.0.2'], dtype='category')
+    assert ipv4_to_uint32(categorical).tolist() == [167772162, 0, 167772162]
+
+
+def test_preprocessor_uint32_ip_features(tmp_path):
+    raw = _write_sdn_csv(tmp_path / 'dataset_sdn.csv').dropna()
+    preprocessor = SDNPreprocessor(ip_encoding='uint32', ip_prefixes=(24,))
+    X = preprocessor.fit_transform(raw)
+
+    names = preprocessor.feature_names_
+    assert names[-3:] == ['src_p24', 'dst_p24', 'dt']
+    assert X.shape == (len(raw), len(names))
+    np.testing.assert_array_equal(X[:, names.index('src')], ipv4_to_uint32(raw['src']))
+    assert set(X[:, names.index('dst_p24')]) == {0x0A0000}
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.detection_service import DetectionService
+
+
+class _ThresholdScorer:
+    """Flags rows with pktrate >= 100 as attacks (class 1)."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def score(self, df):
+        time.sleep(self.delay)
+        self.calls.append(len(df))
+        attack = df['pktrate'].to_numpy() >= 100
+        return attack.astype(int), np.where(attack, 0.9, 0.8)
+
+
+def _batch(rates, switch=1):
+    n = len(rates)
+    return pd.DataFrame({'switch': [switch] * n, 'src': [f'10.0.0.{i % 3}' for i in range(n)],
+                         'dst': ['10.0.0.9'] * n, 'pktrate': rates})
+
+
+def test_alerts_are_deduplicated_across_batches():
+    alerts = []
+
+    async def run():
+        async with DetectionService(_ThresholdScorer(), on_alert=alerts.append, dedup_seconds=60) as service:
+            await service.submit(_batch([500, 10, 500, 500]))
+            await service.submit(_batch([500, 500, 10], switch=2))
+            await service.submit(_batch([]))
+        return service
+
+    service = asyncio.run(run())
+    # Rows 0 and 3 of the first batch are the same flow (10.0.0.0 -> 10.0.0.9 on switch 1)
+    assert sorted((a['switch'], a['src']) for a in alerts) == [(1, '10.0.0.0'), (1, '10.0.0.2'),
+                                                              (2, '10.0.0.0'), (2, '10.0.0.1')]
+    assert all(a['attack'] == '1' and a['confidence'] == 0.9 for a in alerts)
+    stats = service.stats()
+    assert stats['flows_in'] == stats['flows_scored'] == 7
+    assert stats['alerts'] == 4 and stats['suppressed'] == 1
+    assert stats['ingest_queue'] == stats['output_queue'] == 0
+    assert stats['latency_p99_ms'] >= stats['latency_p50_ms'] > 0
+
+    # Within the dedup window the same flow is not reported again
+    alerts.clear()
+
+    async def again():
+        async with DetectionService(_ThresholdScorer(), on_alert=alerts.append, dedup_seconds=60) as service:
+            for _ in range(3):
+                await service.submit(_batch([500]))
+        return service
+
+    assert asyncio.run(again()).suppressed == 2
+    assert len(alerts) == 1
+
+
+def test_backpressure_and_coalescing_with_threaded_collector():
+    scorer = _ThresholdScorer(delay=0.05)
+
+    async def run():
+        async with DetectionService(scorer, max_pending=2) as service:
+            producer = threading.Thread(target=lambda: [service.submit_threadsafe(_batch([1] * 10), timeout=5)
+                                                        for _ in range(20)])
+            producer.start()
+            depth = 0
+            while producer.is_alive():
+                depth = max(depth, service.stats()['ingest_queue'])
+                await asyncio.sleep(0.005)
+            return service, depth
+
+    service, depth = asyncio.run(run())
+    assert service.flows_scored == 200
+    # The bounded queue held the producer back instead of buffering everything
+    assert depth <= 2
+    # Batches queued during a slow scoring call are scored together
+    assert len(scorer.calls) < 20 and sum(scorer.calls) == 200
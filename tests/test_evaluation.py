@@ -0,0 +1,30 @@
+import numpy as np
+from sklearn.metrics import classification_report, confusion_matrix, mean_squared_error
+from sklearn.naive_bayes import GaussianNB
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import LinearSVC
+
+from src.evaluation import evaluate_model
+
+
+def test_evaluate_model_matches_sklearn_metrics():
+    rng = np.random.default_rng(0)
+    X = rng.random((400, 3))
+    y = np.digitize(X[:, 0] + 0.3 * rng.random(400), [0.5, 0.9])
+    X_train, X_test, y_train, y_test = X[:300], X[300:], y[:300], y[300:]
+
+    for model in (GaussianNB(), make_pipeline(StandardScaler(), LinearSVC(random_state=0))):
+        model.fit(X_train, y_train)
+        y_pred = model.predict(X_test)
+        metrics = evaluate_model(model, X_test, y_test, X_train, y_train, train_sample_size=50)
+
+        np.testing.assert_array_equal(metrics['conf_matrix'], confusion_matrix(y_test, y_pred))
+        expected = classification_report(y_test, y_pred, output_dict=True, zero_division=0)
+        assert metrics['report'].keys() == expected.keys()
+        for key, value in expected.items():
+            if isinstance(value, dict):
+                for stat, number in value.items():
+                    assert np.isclose(metrics['report'][key][stat], number)
+        assert np.isclose(metrics['mse'], mean_squared_error(y_test, y_pred))
+        assert metrics['train_rows'] == 50
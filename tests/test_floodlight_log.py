@@ -0,0 +1,68 @@
+import os
+import queue
+
+from src.floodlight_log import LogTailer, iter_alerts, parse_alert_line
+
+LINES = [
+    "12:00:01.000 INFO [n.f.core.Controller:main] Listening for switch connections\n",
+    "12:00:02.500 WARN [n.f.topoguard.TopoloyUpdateChecker:Thread-3] Link fabrication detected on s1\n",
+    "12:00:03.000 INFO [n.f.topoguard.TopoGuard:Thread-3] Port status update\n",
+    "12:00:04.000 ERROR [TopoGuard] SUSPICIOUS host migration (MAC address conflict)\n",
+]
+
+
+def test_parse_alert_line_filters_and_classifies():
+    assert parse_alert_line(LINES[0]) is None
+    assert parse_alert_line(LINES[2]) is None
+    alert = parse_alert_line(LINES[1])
+    assert alert == {'timestamp': '12:00:02.500', 'level': 'WARN',
+                     'source': 'n.f.topoguard.TopoloyUpdateChecker:Thread-3',
+                     'attack_type': 'link_fabrication', 'message': 'Link fabrication detected on s1'}
+    # Case-insensitive keyword and pattern; first pattern in order wins
+    assert parse_alert_line(LINES[3])['attack_type'] == 'host_hijack'
+    assert parse_alert_line("12:00:05.000 WARN [TopoGuard] attack in progress")['attack_type'] == 'unknown'
+    assert [a['timestamp'] for a in iter_alerts(LINES)] == ['12:00:02.500', '12:00:04.000']
+
+
+def test_tailer_follows_partial_lines_and_rotation(tmp_path):
+    path = str(tmp_path / 'floodlight.log')
+    with open(path, 'w') as f:
+        f.write(LINES[0] + LINES[1] + LINES[3][:20])
+    seen, alerts = [], queue.Queue()
+    tailer = LogTailer(path, callback=seen.append, alerts=alerts)
+
+    assert [a['attack_type'] for a in tailer.poll()] == ['link_fabrication']
+    assert tailer.poll() == []
+
+    # The half-written line is completed by the next write
+    with open(path, 'a') as f:
+        f.write(LINES[3][20:])
+    assert [a['attack_type'] for a in tailer.poll()] == ['host_hijack']
+
+    # Rotated away: the remainder of the old file is drained, then the new one read
+    with open(path, 'a') as f:
+        f.write("12:00:06.000 WARN [TopoGuard] Rapid port migration detected\n")
+    os.rename(path, path + '.1')
+    with open(path, 'w') as f:
+        f.write("12:00:07.000 WARN [TopoGuard] Unknown switch DPID detected\n")
+    assert [a['attack_type'] for a in tailer.poll()] == ['port_migration', 'unauthorized_switch']
+
+    # Truncated in place (shorter than what was read): read again from the beginning
+    with open(path, 'w') as f:
+        f.write("12:00:08.000 WARN [TopoGuard] Fake LLDP packet detected\n")
+    assert [a['attack_type'] for a in tailer.poll()] == ['link_fabrication']
+    tailer.stop()
+
+    assert len(seen) == alerts.qsize() == tailer.alert_count == 5
+    assert tailer.lines_read == 6
+
+
+def test_tailer_from_end_skips_existing_lines(tmp_path):
+    path = str(tmp_path / 'floodlight.log')
+    with open(path, 'w') as f:
+        f.write(''.join(LINES))
+    tailer = LogTailer(path, from_start=False)
+    assert tailer.poll() == []
+    with open(path, 'a') as f:
+        f.write(LINES[1])
+    assert len(tailer.poll()) == 1
@@ -0,0 +1,46 @@
+import asyncio
+
+from aiohttp import web
+
+from src.floodlight_poller import FloodlightPoller, snapshots_to_dataframe
+
+
+async def _serve_and_poll():
+    async def switches(request):
+        return web.json_response([{'switchDPID': '00:01'}, {'switchDPID': '00:02'},
+                                  {'switchDPID': '00:03'}])
+
+    async def flows(request):
+        dpid = request.match_info['dpid']
+        if dpid == '00:02':
+            await asyncio.sleep(1)
+        if dpid == '00:03':
+            return web.json_response([{'match': {}}])
+        return web.json_response({dpid: [{'match': {'ipv4_src': '10.0.0.1', 'ip_proto': 6},
+                                          'packetCount': 5, 'byteCount': 300}]})
+
+    app = web.Application()
+    app.router.add_get('/wm/core/controller/switches/json', switches)
+    app.router.add_get('/wm/core/switch/{dpid}/flow/json', flows)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        async with FloodlightPoller(f'http://127.0.0.1:{port}', timeout=0.3) as poller:
+            return await poller.poll()
+    finally:
+        await runner.cleanup()
+
+
+def test_poll_applies_per_switch_deadline():
+    fast, slow, listed = asyncio.run(_serve_and_poll())
+    assert fast.error is None and slow.error is not None
+    assert listed.flows == [] and 'unexpected flow table response: list' in listed.error
+    assert slow.latency_s < 0.9
+
+    df = snapshots_to_dataframe([fast, slow], label=1)
+    assert len(df) == 1
+    assert df.loc[0, 'src_ip'] == '10.0.0.1' and df.loc[0, 'dst_ip'] == '0.0.0.0'
+    assert df.loc[0, 'timestamp_ns'] == fast.timestamp_ns
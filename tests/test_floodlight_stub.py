@@ -0,0 +1,56 @@
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+
+from src.floodlight_poller import FloodlightPoller
+from src.floodlight_stub import FlowTableModel, make_app
+
+
+async def _poll_stub(model):
+    runner = web.AppRunner(make_app(model))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        async with FloodlightPoller(f'http://127.0.0.1:{port}') as poller:
+            return await poller.poll()
+    finally:
+        await runner.cleanup()
+
+
+def test_synthetic_tables_serve_growing_counters():
+    model = FlowTableModel.synthesize(n_switches=5, flows_per_switch=20, start=0.0)
+    snapshots = asyncio.run(_poll_stub(model))
+    assert [s.dpid for s in snapshots] == list(model.tables)
+    assert all(s.error is None and len(s.flows) == 20 for s in snapshots)
+
+    table = next(iter(model.tables.values()))
+    early, late = table.flows(100.0), table.flows(200.0)
+    assert all(int(b['packetCount']) >= int(a['packetCount']) for a, b in zip(early, late))
+    assert int(late[0]['durationSeconds']) > int(early[0]['durationSeconds'])
+
+
+def test_snapshot_replay_skips_empty_and_scales(tmp_path):
+    (tmp_path / 'flows_20260101_000000.json').write_text('')
+    (tmp_path / 'flows_20260102_000000.json').write_text('')
+    (tmp_path / 'flows_20260101_120000.json').write_text(json.dumps(
+        {'00:00:00:00:00:00:00:01': [{'f1': {'match': {'ipv4_src': '10.0.0.1', 'ipv4_dst': '10.0.0.2'}}}]}))
+    with pytest.raises(ValueError):
+        FlowTableModel.from_snapshots(str(tmp_path), timestamp='20260102_000000')
+
+    model = FlowTableModel.from_snapshots(str(tmp_path), scale=3)
+    assert len(model) == 3 and model.n_flows == 3
+    sources = {t.entries[0]['match']['ipv4_src'] for t in model.tables.values()}
+    assert len(sources) == 3
+
+
+def test_snapshot_replay_keeps_masks_and_unparsed_addresses(tmp_path):
+    (tmp_path / 'flows_20260101_000000.json').write_text(json.dumps(
+        {'00:00:00:00:00:00:00:01': [{'f1': {'match': {'ipv4_src': '10.0.0.1/32', 'ipv4_dst': 'any'}}}]}))
+    model = FlowTableModel.from_snapshots(str(tmp_path), scale=2)
+    matches = [t.entries[0]['match'] for t in model.tables.values()]
+    assert [m['ipv4_src'] for m in matches] == ['10.0.0.1/32', '10.0.1.1/32']
+    assert [m['ipv4_dst'] for m in matches] == ['any', 'any']
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+from src.flow_aggregator import FlowTable
+
+A, B, C, D = 0x0A000001, 0x0A000002, 0x0A000003, 0x0A000004
+
+
+def _update(table, packets):
+    ts, src, dst, sport, dport, proto, length, flags = map(np.array, zip(*packets))
+    return table.update(ts, src, dst, sport, dport, proto, length, flags)
+
+
+def test_bidirectional_flows_merge_across_batches_and_expire():
+    out = []
+    table = FlowTable(out.append, idle_timeout=120, active_timeout=1800, capacity=1)
+    _update(table, [(0.0, A, B, 1000, 80, 6, 60, 0x02), (1.0, B, A, 80, 1000, 6, 60, 0x12),
+                    (2.0, D, C, 5000, 53, 17, 80, 0)])
+    assert len(table) == 2 and not out
+
+    assert _update(table, [(3.0, A, B, 1000, 80, 6, 100, 0x10), (200.0, A, B, 1000, 80, 6, 40, 0x10)]) == 2
+    table.flush()
+    flows = pd.concat(out, ignore_index=True)
+    assert len(flows) == 3 and len(table) == 0
+
+    first = flows.iloc[0]
+    assert (first['src_ip'], first['dst_ip'], first['src_port'], first['dst_port']) == ('10.0.0.1', '10.0.0.2', 1000, 80)
+    assert (first['tot_fwd_pkts'], first['tot_bwd_pkts']) == (2, 1)
+    assert (first['totlen_fwd_pkts'], first['totlen_bwd_pkts'], first['flow_duration']) == (160, 60, 3.0)
+    assert (first['fwd_pkt_len_mean'], first['fwd_pkt_len_std'], first['fwd_pkt_len_min']) == (80, 20, 60)
+    assert (first['syn_flag_cnt'], first['ack_flag_cnt']) == (2, 2)
+    np.testing.assert_allclose([first['flow_iat_mean'], first['flow_iat_std'], first['flow_iat_max']],
+                               [1.5, np.sqrt(0.5), 2.0])
+
+    udp = flows.iloc[1]
+    assert (udp['src_ip'], udp['src_port'], udp['tot_fwd_pkts'], udp['tot_bwd_pkts']) == ('10.0.0.4', 5000, 1, 0)
+    assert flows.iloc[2]['timestamp'] == 200.0 and flows.iloc[2]['tot_fwd_pkts'] == 1
+
+
+def test_active_timeout_splits_long_flows():
+    out = []
+    table = FlowTable(out.append, idle_timeout=60, active_timeout=10)
+    _update(table, [(float(t), A, B, 1000, 80, 6, 100, 0x10) for t in range(0, 30, 5)])
+    table.flush()
+    flows = pd.concat(out, ignore_index=True)
+    assert flows['tot_fwd_pkts'].tolist() == [2, 2, 2]
+    assert sorted(flows['timestamp']) == [0.0, 10.0, 20.0]
+
+
+def test_active_timeout_splits_do_not_depend_on_batch_size():
+    trace = [(float(t), A, B, 1000, 80, 6, 100, 0x10) for t in (0, 5, 12, 21, 29, 33, 47)]
+    trace += [(float(t), C, D, 53, 5000, 17, 80, 0) for t in (1, 9, 11, 30)]
+    trace.sort()
+    results = []
+    for batch in (len(trace), 1, 3):
+        out = []
+        table = FlowTable(out.append, idle_timeout=60, active_timeout=10)
+        for i in range(0, len(trace), batch):
+            _update(table, trace[i:i + batch])
+        table.flush()
+        flows = pd.concat(out, ignore_index=True).sort_values(['src_ip', 'timestamp'], ignore_index=True)
+        results.append(flows)
+    tcp = results[0][results[0]['protocol'] == 6]
+    assert list(zip(tcp['timestamp'], tcp['tot_fwd_pkts'])) == [(0.0, 2), (12.0, 2), (29.0, 2), (47.0, 1)]
+    for flows in results[1:]:
+        pd.testing.assert_frame_equal(flows, results[0])
+
+
+def test_flows_from_cooked_and_pcapng_captures(tmp_path):
+    from scapy.all import IP, TCP, UDP, CookedLinux, Ether, wrpcap, wrpcapng
+    from src.flow_aggregator import pcap_to_flows
+
+    layers = [IP(src='10.0.0.1', dst='10.0.0.2') / TCP(sport=40000, dport=80, flags='S'),
+              IP(src='10.0.0.2', dst='10.0.0.1') / TCP(sport=80, dport=40000, flags='SA'),
+              IP(src='10.0.0.3', dst='10.0.0.4') / UDP(sport=5353, dport=53) / b'abcd',
+              IP(src='10.0.0.1', dst='10.0.0.2') / TCP(sport=40000, dport=80, flags='A')]
+
+    def packets(link):
+        out = [link() / layer for layer in layers]
+        for i, pkt in enumerate(out):
+            pkt.time = 1700000000 + i
+        return out
+
+    # tcpdump -i any writes link type 113 (Linux cooked), decoded in bulk
+    cooked = str(tmp_path / 'cooked.pcap')
+    wrpcap(cooked, packets(lambda: CookedLinux(lladdrtype=1, lladdrlen=6, src=b'\x02' + bytes(7))),
+           linktype=113)
+    # pcapng is not mapped in bulk and goes through scapy instead
+    pcapng = str(tmp_path / 'capture.pcapng')
+    wrpcapng(pcapng, packets(Ether))
+
+    for path in (cooked, pcapng):
+        flows = pcap_to_flows(path).sort_values('timestamp', ignore_index=True)
+        assert flows['src_ip'].tolist() == ['10.0.0.1', '10.0.0.3']
+        assert (flows['tot_fwd_pkts'].tolist(), flows['tot_bwd_pkts'].tolist()) == ([2, 1], [1, 0])
+        assert (flows['syn_flag_cnt'].tolist(), flows['flow_duration'].tolist()) == ([2, 0], [3.0, 0.0])
@@ -0,0 +1,40 @@
+import numpy as np
+
+from src.flow_deltas import FlowDeltaEngine
+
+
+def _flow(src, packets, byte_count, seconds):
+    return {'match': {'ipv4_src': src}, 'packetCount': str(packets), 'byteCount': byte_count,
+            'durationSeconds': seconds}
+
+
+def test_deltas_rates_resets_and_expiry():
+    engine = FlowDeltaEngine(idle_timeout=10, capacity=1)
+    first = engine.update('00:01', [_flow('10.0.0.1', 10, 1000, 2), _flow('10.0.0.2', 4, 400, 4)], 100.0)
+    assert first['new'].all()
+    np.testing.assert_allclose(first['pkt_rate'], [5.0, 1.0])
+
+    second = engine.update('00:01', [_flow('10.0.0.1', 30, 3000, 4), _flow('10.0.0.2', 1, 100, 1)], 102.0)
+    np.testing.assert_array_equal(second['packet_delta'], [20, 1])
+    np.testing.assert_array_equal(second['counter_reset'], [False, True])
+    np.testing.assert_allclose(second['byte_rate'], [1000.0, 100.0])
+
+    assert engine.update('00:02', [], 111.0)['packet_delta'].size == 0
+    assert len(engine) == 2
+    engine.expire(113.0)
+    assert len(engine) == 0
+    assert engine.update('00:01', [_flow('10.0.0.1', 40, 4000, 15)], 115.0)['new'].all()
+
+
+def test_same_match_at_other_priority_or_table_is_a_separate_flow():
+    engine = FlowDeltaEngine()
+    flows = [dict(_flow('10.0.0.1', 10, 1000, 2), priority=100, tableId=0),
+             dict(_flow('10.0.0.1', 50, 5000, 2), priority=1, tableId=0),
+             dict(_flow('10.0.0.1', 7, 700, 2), priority=100, tableId=1)]
+    engine.update('00:01', flows, 100.0)
+    assert len(engine) == 3
+
+    flows[0]['packetCount'], flows[1]['packetCount'], flows[2]['packetCount'] = 12, 55, 9
+    second = engine.update('00:01', flows, 102.0)
+    np.testing.assert_array_equal(second['packet_delta'], [2, 5, 2])
+    assert not second['new'].any() and not second['counter_reset'].any()
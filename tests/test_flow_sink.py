@@ -0,0 +1,53 @@
+import os
+
+import pandas as pd
+
+from src.flow_sink import FlowSink, load_flows
+
+
+def _records(n, start=0):
+    return [{'switch': '00:00:00:00:00:00:00:01', 'nw_src': f'10.0.0.{i % 4}', 'in_port': '' if i % 2 else i,
+             'packet_count': i} for i in range(start, start + n)]
+
+
+def test_sink_batches_rotates_and_loads(tmp_path):
+    directory = str(tmp_path / 'flows')
+    with FlowSink(directory, batch_rows=10, flush_interval=60, max_file_bytes=1) as sink:
+        for start in range(0, 40, 5):
+            sink.write(_records(5, start))
+        sink.write(pd.DataFrame(_records(3, 40)))
+
+    # Every batch after the first lands in a fresh file since max_file_bytes is tiny
+    assert len(sink.files) > 1
+    assert not any(f.startswith('.') for f in os.listdir(directory))
+    df = load_flows(directory)
+    assert len(df) == sink.rows_written == 43
+    assert df['packet_count'].tolist() == list(range(43))
+    assert isinstance(df['nw_src'].dtype, pd.CategoricalDtype)
+    assert set(df['nw_src'].astype(str)) == {'10.0.0.0', '10.0.0.1', '10.0.0.2', '10.0.0.3'}
+
+
+def test_mixed_type_batches_keep_the_writer_alive(tmp_path):
+    directory = str(tmp_path / 'flows')
+    with FlowSink(directory, batch_rows=1, flush_interval=60) as sink:
+        # in_port is a match field (always a string); priority is not, so its
+        # change of type moves the sink to a new file
+        sink.write([{'switch': 's1', 'in_port': 1, 'priority': 10, 'packet_count': 1}])
+        sink.write([{'switch': 's1', 'in_port': '', 'priority': '', 'packet_count': 2}])
+        sink.write([{'switch': 's1', 'in_port': 3, 'priority': '', 'packet_count': 3}])
+
+    assert sink.rows_written == 3
+    assert len(sink.files) == 2
+    df = load_flows(directory)
+    assert df['packet_count'].tolist() == [1, 2, 3]
+    assert df['in_port'].tolist() == ['1', '', '3']
+    assert df['priority'].astype(str).tolist() == ['10', '', '']
+
+
+def test_written_frames_are_not_modified(tmp_path):
+    df = pd.DataFrame({'switch': ['s1', 's2'], 'in_port': [1, 2], 'packet_count': [5, 7]})
+    before = df.copy()
+    with FlowSink(str(tmp_path / 'flows'), batch_rows=1) as sink:
+        sink.write(df)
+    pd.testing.assert_frame_equal(df, before)
+    assert load_flows(str(tmp_path / 'flows'))['in_port'].astype(str).tolist() == ['1', '2']
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from src.data_processing import get_ip_frequency
+from src.heavy_hitters import SpaceSaving
+
+
+def test_get_ip_frequency_splits_lists():
+    df = pd.DataFrame({'src': ['10.0.0.1', '10.0.0.2,10.0.0.3', '10.0.0.1', '10.0.0.3']})
+    freq = get_ip_frequency(df).set_index('ip')['Count'].to_dict()
+    assert freq == {'10.0.0.1': 2, '10.0.0.2': 1, '10.0.0.3': 2}
+
+
+def test_space_saving_bounds_and_top_items():
+    rng = np.random.default_rng(0)
+    items = rng.zipf(1.5, 200000) % 5000
+    exact = pd.Series(items).value_counts()
+
+    counter = SpaceSaving(capacity=200)
+    for chunk in np.array_split(items, 20):
+        counter.update(chunk)
+
+    assert len(counter) == 200
+    assert counter.total == len(items)
+    top = counter.top(10)
+    assert list(top.index) == list(exact.index[:10])
+    overcount = top - exact.reindex(top.index)
+    assert (overcount >= 0).all()
+    assert (overcount <= counter.errors.reindex(top.index)).all()
@@ -0,0 +1,92 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.label_index import LabelIndex, load_label_index, mac_to_uint64
+
+
+def _write_label(directory, timestamp, mac, ip, **extra):
+    label = {'timestamp': timestamp, 'attack_type': 'host_location_hijack', 'lab_prefix': 'clab-sdn-simple',
+             'attacker': 'h4', 'victim': 'h1', 'spoofed_mac': mac, 'target_ip': ip, **extra}
+    with open(os.path.join(directory, f'labels_{timestamp}.json'), 'w') as f:
+        json.dump(label, f)
+
+
+def test_window_and_key_lookups(tmp_path):
+    d = str(tmp_path)
+    _write_label(d, '20260106_194003', 'ee:7f:fa:11:18:6d', '172.17.0.2')
+    # Overlaps the first run, but ends earlier
+    _write_label(d, '20260106_194634', '9a:5b:34:9c:47:e7', '172.17.0.6', duration=60)
+    _write_label(d, '20260106_210000', 'ee:7f:fa:11:18:6d', '172.20.20.9', end='20260106_210500')
+    open(os.path.join(d, 'labels_20260106_220000.json'), 'w').close()
+
+    index = load_label_index(d)
+    assert index.runs['run'].tolist() == ['20260106_194003', '20260106_194634', '20260106_210000']
+
+    times = ['2026-01-06 19:39:00', '2026-01-06 19:40:03', '2026-01-06 19:47:00',
+             '2026-01-06 19:55:00', '2026-01-06 20:10:00', '2026-01-06 21:04:59']
+    # 19:47 is inside both overlapping runs (the later one wins); 19:55 is only
+    # inside the first one since the second ended at 19:47:34
+    assert index.lookup(times).tolist() == [-1, 0, 1, 0, -1, 2]
+    assert index.runs_at('2026-01-06 19:47:00')['run'].tolist() == ['20260106_194003', '20260106_194634']
+
+    assert index.lookup_mac(['EE:7F:FA:11:18:6D', '00:00:00:00:00:01']).tolist() == [2, -1]
+    assert index.lookup_mac(mac_to_uint64(['9a:5b:34:9c:47:e7'])).tolist() == [1]
+    assert index.lookup_ip(['172.17.0.6', '10.0.0.1']).tolist() == [1, -1]
+
+    flows = pd.DataFrame({'timestamp': times, 'eth_src': ['ee:7f:fa:11:18:6d'] * 6})
+    labeled = index.label(flows, mac_column='eth_src')
+    # At 19:47 the latest run spoofed another MAC, so the overlapping first run matches
+    assert labeled['label'].tolist() == [0, 1, 1, 1, 0, 1]
+    assert labeled['run'].tolist()[2] == '20260106_194003'
+    assert labeled['attack_type'].tolist()[0] == 'normal'
+
+
+def test_update_is_incremental_and_persisted(tmp_path):
+    d = str(tmp_path)
+    _write_label(d, '20260106_194003', 'ee:7f:fa:11:18:6d', '172.17.0.2')
+    index = LabelIndex(d).update()
+    assert len(index) == 1
+    assert os.path.exists(index.index_path)
+
+    _write_label(d, '20260106_195712', '32:2e:b2:1b:55:30', '172.20.20.10')
+    os.remove(os.path.join(d, 'labels_20260106_194003.json'))
+    index.update()
+    assert index.runs['run'].tolist() == ['20260106_195712']
+
+    # A fresh process starts from the persisted index and finds nothing to reread
+    reopened = LabelIndex(d)
+    reopened._load()
+    assert reopened.runs['run'].tolist() == ['20260106_195712']
+    assert np.array_equal(reopened.update().runs['start_ns'], index.runs['start_ns'])
+
+
+def test_time_and_mac_lookup_matches_a_scan_of_covering_runs(tmp_path):
+    d = str(tmp_path)
+    macs = ['ee:7f:fa:11:18:6d', '9a:5b:34:9c:47:e7', '32:2e:b2:1b:55:30']
+    # Same-MAC runs overlap too; the later one of each pair ends first
+    _write_label(d, '20260106_190000', macs[0], '172.17.0.2', duration=3600)
+    _write_label(d, '20260106_191000', macs[0], '172.17.0.2', duration=300)
+    _write_label(d, '20260106_192000', macs[1], '172.17.0.6', duration=1800)
+    _write_label(d, '20260106_193000', macs[2], '172.17.0.7', duration=600)
+    _write_label(d, '20260106_200000', macs[1], '172.17.0.6', duration=60)
+    index = load_label_index(d)
+
+    rng = np.random.default_rng(0)
+    start = pd.Timestamp('2026-01-06 18:55:00')
+    flows = pd.DataFrame({
+        'timestamp': start + pd.to_timedelta(rng.integers(0, 4 * 3600, 500), unit='s'),
+        'eth_src': rng.choice(macs + ['02:00:00:00:00:01'], 500)})
+    labeled = index.label(flows.copy(), mac_column='eth_src')
+
+    expected = []
+    for t, mac in zip(flows['timestamp'], flows['eth_src']):
+        match = index.runs_at(t)
+        match = match[match['spoofed_mac'].to_numpy() == mac_to_uint64([mac])[0]]
+        expected.append(match['run'].iloc[-1] if len(match) else '')
+    assert labeled['run'].tolist() == expected
+    assert labeled['label'].tolist() == [int(run != '') for run in expected]
+    # 19:12 is inside both runs of macs[0]; 19:40 only inside the longer, earlier one
+    assert index.lookup_at_mac(['2026-01-06 19:12:00', '2026-01-06 19:40:00'], [macs[0]] * 2).tolist() == [1, 0]
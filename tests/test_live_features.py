@@ -0,0 +1,31 @@
+from src.data_processing import DEFAULT_FEATURE_SET
+from src.live_features import LiveFeatureEngine
+
+
+def _flow(src, dst, packets, seconds, proto='6', port='1'):
+    return {'match': {'in_port': port, 'ipv4_src': src, 'ipv4_dst': dst, 'ip_proto': proto},
+            'packetCount': str(packets), 'byteCount': str(packets * 100), 'durationSeconds': str(seconds),
+            'durationNSeconds': '0'}
+
+
+def test_rows_follow_dataset_schema_with_pairflow_and_port_rates():
+    engine = LiveFeatureEngine()
+    dpid = '00:00:00:00:00:00:00:02'
+    arp = {'match': {'in_port': '1', 'eth_type': '0x806'}, 'packetCount': '3'}
+    ports = {dpid: {'port_reply': [{'port': [{'port_number': '1', 'transmit_bytes': '1000',
+                                               'receive_bytes': '2000'}]}]}}
+    engine.update([(dpid, [_flow('10.0.0.1', '10.0.0.2', 10, 1), arp])], ports, timestamp=100.0)
+
+    ports[dpid]['port_reply'][0]['port'][0].update(transmit_bytes='2000', receive_bytes='4000')
+    df = engine.update([(dpid, [_flow('10.0.0.1', '10.0.0.2', 30, 3), _flow('10.0.0.2', '10.0.0.1', 5, 1, '17', '2'),
+                                _flow('10.0.0.3', '10.0.0.1', 7, 1, '1', '2')])], ports, timestamp=102.0)
+
+    assert list(df.columns) == DEFAULT_FEATURE_SET
+    assert len(df) == 3
+    first = df.iloc[0]
+    assert first['switch'] == 2 and first['flows'] == 3
+    assert first['pktperflow'] == 20 and first['pktrate'] == 10 and first['byteperflow'] == 2000
+    assert first['tx_kbps'] == 4 and first['rx_kbps'] == 8.0 and first['tot_kbps'] == 12.0
+    assert df['Pairflow'].tolist() == [1, 1, 0]
+    assert df['Protocol'].astype(str).tolist() == ['TCP', 'UDP', 'ICMP']
+    assert df.loc[1, 'tx_bytes'] == 0
@@ -0,0 +1,139 @@
+import asyncio
+import concurrent.futures
+import json
+import socket
+import sys
+import time
+
+import numpy as np
+
+from zeek import ml_detect
+from zeek.ml_detect import DEFAULT_RESULT, ScoringDaemon, percentile, request, score_requests
+
+
+class FakeScorer:
+    """Predicts the 'label' feature with confidence 0.9, recording each batch size."""
+    name = 'Fake'
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batches = []
+
+    def score(self, rows):
+        self.batches.append(len(rows))
+        time.sleep(self.delay)
+        return np.array([row['label'] for row in rows]), np.full(len(rows), 0.9)
+
+
+def _serve(daemon, clients):
+    """Runs the daemon on its socket while `clients(path)` runs on another thread; returns its result."""
+    async def main():
+        daemon._queue = asyncio.Queue()
+        server = await asyncio.start_unix_server(daemon._handle, path=daemon.path)
+        batcher = asyncio.create_task(daemon._batcher())
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+            try:
+                return await asyncio.get_running_loop().run_in_executor(pool, clients, daemon.path)
+            finally:
+                batcher.cancel()
+                server.close()
+                await server.wait_closed()
+                daemon._executor.shutdown()
+
+    return asyncio.run(main())
+
+
+def _concurrent(path, payloads):
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(payloads)) as pool:
+        return list(pool.map(lambda p: request(p, path), payloads))
+
+
+def test_concurrent_requests_are_scored_in_micro_batches(tmp_path):
+    scorer = FakeScorer(delay=0.05)
+    daemon = ScoringDaemon(scorer, str(tmp_path / 'ml.sock'), max_batch=3, max_wait=0.05)
+    payloads = [{'mac': f'02:00:00:00:00:{i:02x}', 'features': {'label': i % 2}} for i in range(10)]
+    replies = _serve(daemon, lambda path: _concurrent(path, payloads))
+
+    assert [r['mac'] for r in replies] == [p['mac'] for p in payloads]
+    assert [r['attack'] for r in replies] == ['normal', DEFAULT_RESULT['attack']] * 5
+    assert {r['model'] for r in replies} == {'Fake'}
+    assert sum(scorer.batches) == 10 and max(scorer.batches) == 3
+    assert daemon.requests == 10 and daemon.batches == len(scorer.batches) < 10
+
+
+def test_max_wait_bounds_how_long_a_lone_request_waits(tmp_path):
+    daemon = ScoringDaemon(None, str(tmp_path / 'ml.sock'), max_wait=0.2)
+
+    def clients(path):
+        start = time.perf_counter()
+        reply = request({'mac': 'aa:bb:cc:dd:ee:ff'}, path)
+        return reply, time.perf_counter() - start
+
+    reply, elapsed = _serve(daemon, clients)
+    assert reply == dict(DEFAULT_RESULT, mac='aa:bb:cc:dd:ee:ff')
+    assert 0.2 <= elapsed < 2.0 and daemon.batches == 1
+
+
+def test_stats_command_reports_latency_percentiles(tmp_path):
+    daemon = ScoringDaemon(FakeScorer(), str(tmp_path / 'ml.sock'), max_wait=0.0)
+
+    def clients(path):
+        for i in range(5):
+            request({'mac': str(i), 'features': {'label': 1}}, path)
+        return request({'cmd': 'stats'}, path)
+
+    stats = _serve(daemon, clients)
+    assert (stats['requests'], stats['batches'], stats['errors'], stats['model']) == (5, 5, 0, 'Fake')
+    assert stats['mean_batch'] == 1.0
+    assert 0 < stats['p50_ms'] <= stats['p99_ms']
+    assert percentile(list(range(1, 101)), 50) == 50 and percentile(list(range(1, 101)), 99) == 99
+    assert percentile([], 50) == 0.0
+
+
+def test_invalid_json_gets_an_error_reply_and_the_connection_stays_open(tmp_path):
+    daemon = ScoringDaemon(None, str(tmp_path / 'ml.sock'))
+
+    def clients(path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(5.0)
+            sock.connect(path)
+            sock.sendall(b'not json\n' + json.dumps({'mac': 'm1'}).encode() + b'\n')
+            with sock.makefile('rb') as replies:
+                return [json.loads(replies.readline()) for _ in range(2)]
+
+    invalid, ok = _serve(daemon, clients)
+    assert invalid == {'error': 'invalid JSON'}
+    assert ok['mac'] == 'm1' and ok['attack'] == DEFAULT_RESULT['attack']
+    assert daemon.requests == 1
+
+
+def test_client_falls_back_to_in_process_scoring(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(ml_detect, '_load_scorer', lambda model, registry: FakeScorer())
+    missing = str(tmp_path / 'no_daemon.sock')
+    for label, attack in ((1, DEFAULT_RESULT['attack']), (0, 'normal')):
+        monkeypatch.setattr(sys, 'argv', ['ml_detect.py', 'aa:bb', '--socket', missing,
+                                          '--features', json.dumps({'label': label})])
+        assert ml_detect.main() == 0
+        result = json.loads(capsys.readouterr().out)
+        assert result == {'attack': attack, 'confidence': 0.9, 'model': 'Fake', 'mac': 'aa:bb'}
+
+    # What run_ml() sends: no features, so no model is loaded for the rule-based verdict
+    def no_model(model, registry):
+        raise AssertionError('model loaded without features')
+    monkeypatch.setattr(ml_detect, '_load_scorer', no_model)
+    monkeypatch.setattr(sys, 'argv', ['ml_detect.py', 'aa:bb', '--socket', missing])
+    assert ml_detect.main() == 0
+    assert json.loads(capsys.readouterr().out) == dict(DEFAULT_RESULT, mac='aa:bb')
+
+    monkeypatch.setattr(sys, 'argv', ['ml_detect.py', '--stats', '--socket', missing])
+    assert ml_detect.main() == 1
+
+
+def test_class_names_map_to_verdicts():
+    scorer = FakeScorer()
+    requests = [{'mac': 'm', 'features': {'label': label}}
+                for label in (0, 1, '0', 'normal', 'BENIGN', 'link_fabrication', 1.0)]
+    results = score_requests(requests + [{'mac': 'rule'}], scorer)
+    assert [r['attack'] for r in results] == ['normal', 'host_location_hijack', 'normal', 'normal', 'normal',
+                                              'link_fabrication', 'host_location_hijack', 'host_location_hijack']
+    assert results[-1] == dict(DEFAULT_RESULT, mac='rule')
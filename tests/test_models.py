@@ -0,0 +1,30 @@
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.multiclass import OneVsRestClassifier
+from sklearn.naive_bayes import GaussianNB
+from sklearn.tree import DecisionTreeClassifier
+
+from src.models import set_n_jobs, train_models_parallel
+
+
+def test_set_n_jobs_targets_innermost_estimator():
+    model = set_n_jobs(OneVsRestClassifier(RandomForestClassifier()), 4)
+    assert model.get_params()['n_jobs'] == 1
+    assert model.get_params()['estimator__n_jobs'] == 4
+
+
+def test_train_models_parallel_matches_serial():
+    rng = np.random.default_rng(0)
+    X = rng.random((300, 5))
+    y = (X[:, 0] + X[:, 1] > 1).astype(int)
+    models = {
+        "decision_tree": DecisionTreeClassifier(random_state=0),
+        "naive_bayes": GaussianNB(),
+    }
+
+    fitted = train_models_parallel(models, X, y, core_budget=2)
+
+    assert list(fitted) == list(models)
+    for name, model in fitted.items():
+        expected = models[name].fit(X, y).predict(X)
+        np.testing.assert_array_equal(model.predict(X), expected)
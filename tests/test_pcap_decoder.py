@@ -0,0 +1,78 @@
+import struct
+
+import numpy as np
+
+from src.pcap_decoder import ETH_ARP, ETH_IPV4, read_pcap_columns, uint32_to_ipv4, uint64_to_mac
+
+MAC_A, MAC_B = bytes.fromhex('020000000001'), bytes.fromhex('020000000002')
+
+
+def _ipv4(proto, payload, src=(10, 0, 0, 1), dst=(10, 0, 0, 2), ihl=5):
+    options = b'\x01' * (ihl * 4 - 20)
+    header = struct.pack('!BBHHHBBH4B4B', 0x40 | ihl, 0, ihl * 4 + len(payload), 1, 0, 64, proto, 0, *src, *dst)
+    return MAC_B + MAC_A + b'\x08\x00' + header + options + payload
+
+
+def _sll(frame):
+    """An Ethernet frame as `tcpdump -i any` records it (Linux cooked header)."""
+    return struct.pack('!HHH', 0, 1, 6) + frame[6:12] + b'\x00\x00' + frame[12:]
+
+
+def _write_pcap(path, frames, caplens=None, linktype=1):
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<IHHiIII', 0xA1B2C3D4, 2, 4, 0, 0, 65535, linktype))
+        for i, frame in enumerate(frames):
+            data = frame[:caplens[i]] if caplens and caplens[i] is not None else frame
+            f.write(struct.pack('<IIII', 1000 + i, 500000, len(data), len(frame)) + data)
+
+
+def test_bulk_decode_of_common_and_unusual_frames(tmp_path):
+    tcp = struct.pack('!HHIIBBHHH', 40000, 443, 1, 0, 0x50, 0x12, 1024, 0, 0)
+    udp = struct.pack('!HHHH', 5353, 53, 12, 0) + b'abcd'
+    arp = (MAC_B + MAC_A + b'\x08\x06' + struct.pack('!HHBBH', 1, 0x0800, 6, 4, 2) + MAC_A
+           + bytes([10, 0, 0, 1]) + MAC_B + bytes([10, 0, 0, 2]))
+    vlan_udp = _ipv4(17, udp)
+    vlan_udp = vlan_udp[:12] + b'\x81\x00\x00\x05' + vlan_udp[12:]
+    frames = [_ipv4(6, tcp), _ipv4(17, udp), _ipv4(1, b'\x08\x00\x00\x00'), arp, vlan_udp,
+              _ipv4(6, tcp, ihl=6), _ipv4(6, tcp)]
+    path = str(tmp_path / 'mixed.pcap')
+    _write_pcap(path, frames, caplens=[None] * 6 + [40])
+
+    slow_calls = []
+    df = read_pcap_columns(path, chunk_packets=3, fallback=lambda frame: slow_calls.append(len(frame)) or {})
+
+    assert len(df) == 7
+    np.testing.assert_allclose(df['timestamp'][:2], [1000.5, 1001.5])
+    assert df['eth_type'].tolist()[:5] == [ETH_IPV4, ETH_IPV4, ETH_IPV4, ETH_ARP, ETH_IPV4]
+    assert uint32_to_ipv4(df['ip_src'])[0] == '10.0.0.1'
+    assert uint64_to_mac(df['eth_src'])[0] == '02:00:00:00:00:01'
+    assert df['tcp_srcport'].tolist()[:1] + df['tcp_dstport'].tolist()[5:6] == [40000, 443]
+    assert df.loc[0, 'tcp_flags'] == 0x12 and df.loc[0, 'tcp_window'] == 1024
+    assert df.loc[1, 'udp_dstport'] == 53 and df.loc[4, 'udp_dstport'] == 53
+    assert df.loc[2, 'icmp_type'] == 8
+    assert df.loc[3, 'arp_opcode'] == 2 and uint32_to_ipv4(df['arp_dst_ip'])[3] == '10.0.0.2'
+    # Only the truncated TCP frame needs the slow decoder
+    assert slow_calls == [40]
+    assert df.loc[6, 'tcp_srcport'] == 0 and df.loc[6, 'frame_len'] == len(frames[6])
+
+
+def test_linux_cooked_captures_decode_like_ethernet(tmp_path):
+    tcp = struct.pack('!HHIIBBHHH', 40000, 443, 1, 0, 0x50, 0x18, 512, 0, 0)
+    udp = struct.pack('!HHHH', 5353, 53, 12, 0) + b'abcd'
+    arp = (MAC_B + MAC_A + b'\x08\x06' + struct.pack('!HHBBH', 1, 0x0800, 6, 4, 1) + MAC_A
+           + bytes([10, 0, 0, 1]) + bytes(6) + bytes([10, 0, 0, 2]))
+    frames = [_ipv4(6, tcp), _ipv4(17, udp, ihl=6), arp, _ipv4(6, tcp)]
+    ether, cooked = str(tmp_path / 'ether.pcap'), str(tmp_path / 'cooked.pcap')
+    _write_pcap(ether, frames, caplens=[None] * 3 + [40])
+    _write_pcap(cooked, [_sll(f) for f in frames], caplens=[None] * 3 + [42], linktype=113)
+
+    slow_calls = []
+    df = read_pcap_columns(cooked, chunk_packets=3, fallback=lambda frame: slow_calls.append(frame) or {})
+    expected = read_pcap_columns(ether, fallback=None)
+    assert df['caplen'].tolist() == [len(f) + 2 for f in frames[:3]] + [42]
+    assert uint64_to_mac(df['eth_src']).tolist() == ['02:00:00:00:00:01'] * 4
+    assert (df['eth_dst'] == 0).all()
+    fields = [c for c in df.columns if c not in ('caplen', 'frame_len', 'eth_dst')]
+    np.testing.assert_array_equal(df[fields].to_numpy(), expected[fields].to_numpy())
+    # The truncated frame reaches the fallback rewritten as Ethernet
+    assert slow_calls == [bytes(6) + frames[3][6:40]]
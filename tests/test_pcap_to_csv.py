@@ -0,0 +1,62 @@
+import pandas as pd
+from scapy.all import ARP, ICMP, IP, TCP, UDP, Ether, wrpcap
+
+from pcap_to_csv import iter_features, write_features
+
+COLUMNS = ['src_ip', 'dst_ip', 'protocol', 'packet_len', 'ttl', 'src_port', 'dst_port', 'label', 'flags']
+
+
+def _capture(path):
+    packets = [
+        Ether() / IP(src='10.0.0.1', dst='10.0.0.2', ttl=64) / TCP(sport=40000, dport=80, flags='S'),
+        Ether() / IP(src='10.0.0.2', dst='10.0.0.1', ttl=63) / TCP(sport=80, dport=40000, flags='SA'),
+        Ether() / ARP(psrc='10.0.0.1', pdst='10.0.0.2'),
+        Ether() / IP(src='10.0.0.3', dst='10.0.0.4') / UDP(sport=5353, dport=53) / b'abcd',
+        Ether() / IP(src='10.0.0.1', dst='10.0.0.4') / ICMP(),
+    ]
+    for i, pkt in enumerate(packets):
+        pkt.time = 1700000000 + i
+    wrpcap(str(path), packets)
+
+
+def test_streamed_csv_rows_and_columns(tmp_path):
+    pcap = tmp_path / 'normal.pcap'
+    _capture(pcap)
+    output = str(tmp_path / 'out.csv')
+
+    assert write_features(str(pcap), 0, output, write_header=True) == 4
+    assert write_features(str(pcap), 1, output, write_header=False) == 4
+    df = pd.read_csv(output, keep_default_na=False)
+    assert list(df.columns) == COLUMNS
+    assert df['label'].tolist() == [0] * 4 + [1] * 4
+    first = df.iloc[:4]
+    assert first['src_ip'].tolist() == ['10.0.0.1', '10.0.0.2', '10.0.0.3', '10.0.0.1']
+    assert first['protocol'].tolist() == [6, 6, 17, 1]
+    assert first['src_port'].tolist() == [40000, 80, 5353, 0]
+    assert first['dst_port'].tolist() == [80, 40000, 53, 0]
+    assert first['ttl'].tolist() == [64, 63, 64, 64]
+    assert first['packet_len'].tolist() == [54, 54, 46, 42]
+    assert first['flags'].astype(str).tolist() == ['S', 'SA', '0', '0']
+
+
+def test_bulk_decoder_matches_per_packet_reader_across_batches(tmp_path):
+    pcap = tmp_path / 'attack.pcap'
+    _capture(pcap)
+    fast = list(iter_features(str(pcap), 1, batch_size=2))
+    slow = list(iter_features(str(pcap), 1, batch_size=2, fast=False))
+    assert max(len(b) for b in fast) <= 2 and [len(b) for b in slow] == [2, 2]
+    fast, slow = pd.concat(fast, ignore_index=True), pd.concat(slow, ignore_index=True)
+    slow['flags'] = slow['flags'].map(lambda f: f if f == 0 else str(f))
+    pd.testing.assert_frame_equal(fast.astype(str), slow.astype(str))
+
+
+def test_non_first_tcp_fragments_carry_no_flags(tmp_path):
+    pcap = tmp_path / 'fragments.pcap'
+    segment = IP(src='10.0.0.1', dst='10.0.0.2') / TCP(sport=40000, dport=80, flags='PA') / (b'x' * 64)
+    first, rest = segment.fragment(40)[:2]
+    wrpcap(str(pcap), [Ether() / first, Ether() / rest])
+    fast = pd.concat(iter_features(str(pcap), 0), ignore_index=True)
+    slow = pd.concat(iter_features(str(pcap), 0, fast=False), ignore_index=True)
+    assert fast['flags'].tolist() == ['PA', 0]
+    assert fast['src_port'].tolist() == slow['src_port'].tolist() == [40000, 0]
+    assert slow['flags'].map(lambda f: f if f == 0 else str(f)).tolist() == ['PA', 0]
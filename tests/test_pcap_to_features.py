@@ -0,0 +1,69 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from mininet_archive import pcap_to_features
+from mininet_archive.pcap_to_features import process_all_pcaps_parallel, shard_path
+
+
+def _stub_extractor(monkeypatch, calls):
+    def extract_features(self):
+        calls.append(os.path.basename(self.pcap_file))
+        with open(self.pcap_file) as f:
+            lengths = [int(line) for line in f if line.strip()]
+        return pd.DataFrame({'timestamp': [float(i) for i in range(len(lengths))], 'frame_len': lengths})
+
+    monkeypatch.setattr(pcap_to_features.PcapFeatureExtractor, 'extract_features', extract_features)
+    # Threads instead of processes, so the workers see the stub
+    monkeypatch.setattr(pcap_to_features, 'ProcessPoolExecutor', ThreadPoolExecutor)
+
+
+def _captures(tmp_path):
+    input_dir = tmp_path / 'captured_traffic'
+    input_dir.mkdir()
+    (input_dir / 'normal_1.pcap').write_text('60\n1500\n')
+    (input_dir / 'attack_hijack_1.pcap').write_text('74\n')
+    (input_dir / 'empty.pcap').write_text('')
+    (input_dir / 'notes.txt').write_text('not a capture')
+    return str(input_dir), str(tmp_path / 'ml_dataset')
+
+
+def test_one_shard_per_capture_including_empty_ones(tmp_path, monkeypatch):
+    calls = []
+    _stub_extractor(monkeypatch, calls)
+    input_dir, output_dir = _captures(tmp_path)
+
+    rows = process_all_pcaps_parallel(input_dir, output_dir, workers=2, backend='tshark')
+    assert rows == {'attack_hijack_1.pcap': 1, 'empty.pcap': 0, 'normal_1.pcap': 2}
+    assert sorted(os.listdir(output_dir)) == ['attack_hijack_1_features.parquet', 'empty_features.parquet',
+                                              'normal_1_features.parquet']
+
+    attack = pd.read_parquet(shard_path(output_dir, 'attack_hijack_1.pcap'))
+    assert attack[['frame_len', 'label', 'attack_type']].values.tolist() == [[74, 'attack', 'host_hijack']]
+    normal = pd.read_parquet(shard_path(output_dir, 'normal_1.pcap'))
+    assert normal['frame_len'].tolist() == [60, 1500] and set(normal['label']) == {'normal'}
+    assert len(pd.read_parquet(shard_path(output_dir, 'empty.pcap'))) == 0
+
+
+def test_second_run_skips_up_to_date_shards_unless_forced(tmp_path, monkeypatch):
+    calls = []
+    _stub_extractor(monkeypatch, calls)
+    input_dir, output_dir = _captures(tmp_path)
+    process_all_pcaps_parallel(input_dir, output_dir, workers=2, backend='tshark')
+    assert len(calls) == 3
+
+    calls.clear()
+    assert process_all_pcaps_parallel(input_dir, output_dir, workers=2, backend='tshark') == {}
+    assert calls == []
+
+    # A capture newer than its shard is converted again
+    shard = shard_path(output_dir, 'normal_1.pcap')
+    newer = os.path.getmtime(shard) + 10
+    os.utime(os.path.join(input_dir, 'normal_1.pcap'), (newer, newer))
+    assert process_all_pcaps_parallel(input_dir, output_dir, workers=2, backend='tshark') == {'normal_1.pcap': 2}
+    assert calls == ['normal_1.pcap']
+
+    calls.clear()
+    rows = process_all_pcaps_parallel(input_dir, output_dir, workers=2, force=True, backend='tshark')
+    assert sorted(rows) == sorted(calls) == ['attack_hijack_1.pcap', 'empty.pcap', 'normal_1.pcap']
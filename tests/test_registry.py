@@ -0,0 +1,23 @@
+import numpy as np
+from sklearn.neighbors import KNeighborsClassifier
+
+from src.registry import ModelRegistry
+
+
+def test_registry_roundtrip_with_mmap(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.random((200, 4))
+    y = (X[:, 0] > 0.5).astype(int)
+    model = KNeighborsClassifier(n_neighbors=3).fit(X, y)
+
+    registry = ModelRegistry(str(tmp_path))
+    metrics = {'accuracy': np.float64(0.9), 'conf_matrix': np.eye(2, dtype=int), 'y_prob': np.ones(5)}
+    version = registry.save('knn', model, metrics=metrics, dataset_hash='abc')
+    assert version == registry.save('knn', model.set_params(n_jobs=4), metrics=metrics, dataset_hash='abc')
+    assert registry.latest('knn') == version
+
+    loaded = registry.load('knn')
+    assert isinstance(loaded.model._fit_X, np.memmap)
+    assert loaded.preprocessor is None
+    assert loaded.metadata['metrics'] == {'accuracy': 0.9, 'conf_matrix': [[1, 0], [0, 1]]}
+    np.testing.assert_array_equal(loaded.model.predict(X), model.predict(X))
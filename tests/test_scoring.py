@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.naive_bayes import GaussianNB
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import LinearSVC
+
+from src.compiled_trees import CompiledForest
+from src.registry import ModelRegistry
+from src.scoring import BatchScorer
+
+
+def _data(n=300):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({'a': rng.random(n), 'b': rng.random(n)})
+    y = (X['a'] + 0.2 * X['b'] > 0.6).astype(int).to_numpy()
+    return X, y
+
+
+def test_registry_forest_is_compiled_and_scores_batches(tmp_path):
+    X, y = _data()
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X.to_numpy(), y)
+    ModelRegistry(str(tmp_path)).save('random_forest', model, dataset_hash='abc')
+
+    scorer = BatchScorer.from_registry('random_forest', str(tmp_path))
+    assert scorer.compiled and isinstance(scorer.model, CompiledForest)
+    assert scorer.name == 'random_forest'
+
+    labels, confidence = scorer.score(X)
+    np.testing.assert_array_equal(labels, model.predict(X.to_numpy()))
+    np.testing.assert_allclose(confidence, model.predict_proba(X.to_numpy()).max(axis=1))
+    # Feature dicts, as sent by ml_detect clients, score the same as a frame
+    labels_dicts, _ = scorer.score(X.head(5).to_dict('records'))
+    np.testing.assert_array_equal(labels_dicts, labels[:5])
+    assert scorer.predict_proba(X.iloc[:0]).shape == (0, 2)
+
+
+def test_uncompilable_models_are_used_directly():
+    X, y = _data()
+    nb = BatchScorer(GaussianNB().fit(X, y))
+    assert not nb.compiled
+    np.testing.assert_allclose(nb.predict_proba(X), nb.model.predict_proba(X))
+
+    svm = BatchScorer(make_pipeline(StandardScaler(), LinearSVC()).fit(X, y))
+    labels, confidence = svm.score(X)
+    np.testing.assert_array_equal(labels, svm.model.predict(X))
+    assert (confidence == 1.0).all()
@@ -0,0 +1,42 @@
+import pandas as pd
+
+from mininet_archive.topoguard_labeler import TopoGuardLabeler
+
+
+def _alert(time, attack_type):
+    return {'timestamp': time, 'level': 'WARN', 'source': 'TopoGuard', 'attack_type': attack_type,
+            'message': f'{attack_type} detected'}
+
+
+def _label(timestamps, alerts, window=10):
+    flows = pd.DataFrame({'timestamp': timestamps})
+    return TopoGuardLabeler().label_flows(flows, alerts, window=window)
+
+
+def test_flows_inside_and_outside_alert_windows():
+    alerts = [_alert('12:00:30.000', 'host_hijack')]
+    labeled = _label(['2026-01-05T12:00:05', '2026-01-05T12:00:20', '2026-01-05T12:00:30.500',
+                      '2026-01-05T12:00:40', '2026-01-05T12:00:41', 'not a time'], alerts)
+    assert labeled['label'].tolist() == [0, 1, 1, 1, 0, 0]
+    assert labeled['attack_type'].tolist() == ['normal', 'host_hijack', 'host_hijack', 'host_hijack',
+                                               'normal', 'normal']
+
+
+def test_overlapping_alerts_latest_wins():
+    alerts = [_alert('12:00:30.000', 'host_hijack'), _alert('12:00:38.000', 'link_fabrication')]
+    labeled = _label(['2026-01-05T12:00:21', '2026-01-05T12:00:29', '2026-01-05T12:00:45',
+                      '2026-01-05T12:00:49'], alerts)
+    assert labeled['attack_type'].tolist() == ['host_hijack', 'link_fabrication', 'link_fabrication',
+                                               'normal']
+
+
+def test_alert_log_crossing_midnight():
+    alerts = [_alert('23:59:55.000', 'port_migration'), _alert('00:00:05.000', 'host_hijack')]
+    labeled = _label(['2026-01-05T23:59:50', '2026-01-06T00:00:12', '2026-01-05T00:00:05'], alerts)
+    assert labeled['attack_type'].tolist() == ['port_migration', 'host_hijack', 'normal']
+
+
+def test_timezone_offsets_keep_wall_clock_time():
+    alerts = [_alert('12:00:30.000', 'host_hijack')]
+    labeled = _label(['2026-01-05T12:00:25+02:00', '2026-01-05T12:00:35Z', '2026-01-05T10:00:30+00:00'], alerts)
+    assert labeled['label'].tolist() == [1, 1, 0]
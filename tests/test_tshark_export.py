@@ -0,0 +1,43 @@
+import pytest
+
+from src import tshark_export
+from src.tshark_export import FIELDS, read_tshark_features
+
+
+def test_field_stream_parses_into_feature_columns(tmp_path, monkeypatch):
+    rows = [
+        ['1700000000.25', '74', '10.0.0.1', '10.0.0.2', '6', '64', '60', '40000', '443', '0x0012', '1024',
+         '', '', '', '', '', '', ''],
+        ['1700000000.50', '42', '', '', '', '', '', '', '', '', '', '', '', '', '', '', '2', '02:00:00:00:00:01'],
+        ['1700000001.00', '98', '10.0.0.3', '10.0.0.1', '1', '63', '84', '', '', '', '', '', '', '', '8', '0', '', ''],
+    ]
+    stream = tmp_path / 'fields.tsv'
+    stream.write_text(''.join('\t'.join(r) + '\n' for r in rows))
+    monkeypatch.setattr(tshark_export, 'tshark_command', lambda pcap, display_filter=None: ['cat', str(stream)])
+
+    df = read_tshark_features('capture.pcap', chunksize=2)
+    assert list(df.columns) == list(FIELDS)
+    assert df['tcp_flags'].tolist() == [0x12, 0, 0]
+    assert df['ip_src'].tolist() == ['10.0.0.1', '0.0.0.0', '10.0.0.3']
+    assert df['arp_src_mac'].tolist()[:2] == ['00:00:00:00:00:00', '02:00:00:00:00:01']
+    assert df['tcp_dstport'].tolist() == [443, 0, 0] and df['icmp_type'].tolist() == [0, 0, 8]
+    assert df['timestamp'].iloc[0] == 1700000000.25
+
+
+def test_tshark_failure_keeps_packets_already_parsed(tmp_path, monkeypatch, capsys):
+    row = ['1700000000.25', '74', '10.0.0.1', '10.0.0.2', '6', '64', '60', '40000', '443', '0x0002', '1024',
+           '', '', '', '', '', '', '']
+    stream = tmp_path / 'fields.tsv'
+    stream.write_text(''.join('\t'.join(row) + '\n' for _ in range(5)))
+    # What tshark does on a capture cut off mid-packet: print what it read, then exit non-zero
+    truncated = ['sh', '-c', f'cat {stream}; echo "appears to have been cut short" >&2; exit 2']
+    monkeypatch.setattr(tshark_export, 'tshark_command', lambda pcap, display_filter=None: truncated)
+
+    df = read_tshark_features('capture.pcap', chunksize=2)
+    assert len(df) == 5 and df['tcp_flags'].tolist() == [2] * 5
+    assert 'cut short' in capsys.readouterr().out
+
+    monkeypatch.setattr(tshark_export, 'tshark_command',
+                        lambda pcap, display_filter=None: ['sh', '-c', 'echo "no such file" >&2; exit 2'])
+    with pytest.raises(RuntimeError, match='no such file'):
+        read_tshark_features('missing.pcap')
@@ -1,17 +1,238 @@
 #!/usr/bin/env python3
-import sys
+"""
+ML confirmation hook for host_hijack.zeek
+
+    python3 zeek/ml_detect.py --serve [--model random_forest]   # long-lived daemon
+    python3 zeek/ml_detect.py <mac>                             # what run_ml() executes
+    python3 zeek/ml_detect.py --stats                           # daemon latency report
+
+The daemon loads the model once and answers newline-delimited JSON requests
+on a Unix socket, scoring concurrent requests together in micro-batches.
+The client only imports the standard library, so each Zeek alert costs a
+bare interpreter start plus one socket round trip; with no daemon running
+it scores in-process, loading the model only for requests with --features.
+run_ml() in host_hijack.zeek sends just the MAC, so it gets the rule-based
+verdict either way.
+"""
+import argparse
+import asyncio
+import collections
+import concurrent.futures
 import json
+import math
+import os
+import signal
+import socket
+import sys
 
-# Example: read Zeek-generated file or args
-mac = sys.argv[1] if len(sys.argv) > 1 else "unknown"
+SOCKET_PATH = os.environ.get('ML_DETECT_SOCKET', '/tmp/sdn_ml_detect.sock')
 
-result = {
-    "mac": mac,
+# Verdict when there are no flow features to score: the Zeek rule that fired
+# (one MAC seen with several IPs) is itself the evidence
+DEFAULT_RESULT = {
     "attack": "host_location_hijack",
     "confidence": 0.93,
     "model": "RandomForest"
 }
 
-# Zeek captures stdout
-print(json.dumps(result))
-sys.exit(0)
+# Predicted classes that mean benign traffic (numeric classes: 0)
+NORMAL_LABELS = ('normal', 'benign')
+
+def attack_name(label):
+    """Verdict for a predicted class: 'normal' for benign classes, the rule's
+    attack type for numeric attack classes, otherwise the class name."""
+    name = str(label)
+    try:
+        attack = float(name) != 0
+    except ValueError:
+        return 'normal' if name.lower() in NORMAL_LABELS else name
+    return DEFAULT_RESULT['attack'] if attack else 'normal'
+
+def score_requests(requests, scorer=None):
+    """Results for a batch of {'mac': ..., 'features': {...}} requests, in order."""
+    results = [dict(DEFAULT_RESULT, mac=req.get('mac', 'unknown')) for req in requests]
+    scored = [i for i, req in enumerate(requests) if scorer is not None and req.get('features')]
+    if scored:
+        labels, confidence = scorer.score([requests[i]['features'] for i in scored])
+        for i, label, conf in zip(scored, labels, confidence):
+            results[i].update(attack=attack_name(label), confidence=round(float(conf), 4), model=scorer.name)
+    return results
+
+def percentile(values, q):
+    """Nearest-rank percentile (q in 0-100) of a list; 0.0 when empty."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered), max(1, math.ceil(q / 100 * len(ordered)))) - 1]
+
+def request(payload, path=SOCKET_PATH, timeout=5.0):
+    """Sends one request to the daemon and returns its JSON reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(json.dumps(payload).encode() + b'\n')
+        with sock.makefile('rb') as reply:
+            line = reply.readline()
+    if not line:
+        raise ConnectionError('ml_detect daemon closed the connection')
+    return json.loads(line)
+
+def _load_scorer(model_name, registry_dir):
+    """The registry model, or None (default verdicts) if none has been saved."""
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    try:
+        from src.scoring import BatchScorer
+        return BatchScorer.from_registry(model_name, registry_dir)
+    except (ImportError, FileNotFoundError) as e:
+        print(f"[ml_detect] {e}; answering with the rule-based verdict", file=sys.stderr)
+        return None
+
+class ScoringDaemon:
+    """
+    Unix-socket scoring server with the model preloaded.
+    - Each connection may send any number of JSON lines; each gets one reply.
+    - Requests queue up while the previous batch is scored (on a dedicated
+      thread, so the event loop keeps accepting); the next batch takes everything
+      queued, up to `max_batch`, waiting at most `max_wait` seconds after the
+      first request for more to arrive.
+    - Request latency (arrival to reply) is kept for the last `window`
+      requests; {"cmd": "stats"} returns p50/p99 and batch counts.
+    """
+
+    def __init__(self, scorer, path=SOCKET_PATH, max_batch=256, max_wait=0.002, window=10000):
+        self.scorer = scorer
+        self.path = path
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self._latencies = collections.deque(maxlen=window)
+        self._queue = None
+        # One dedicated scoring thread: batches run back to back, never contend
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='ml_detect')
+
+    def stats(self):
+        latencies = list(self._latencies)
+        return {
+            'requests': self.requests,
+            'batches': self.batches,
+            'errors': self.errors,
+            'mean_batch': round(self.requests / self.batches, 2) if self.batches else 0.0,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+            'model': getattr(self.scorer, 'name', None)
+        }
+
+    async def serve(self):
+        loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        server = await asyncio.start_unix_server(self._handle, path=self.path)
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        batcher = asyncio.create_task(self._batcher())
+        print(f"[ml_detect] serving {self.path} with {self.stats()['model'] or 'rule-based verdicts'}")
+        async with server:
+            await stop.wait()
+        batcher.cancel()
+        self._executor.shutdown(wait=False)
+        os.unlink(self.path)
+        print(f"[ml_detect] {json.dumps(self.stats())}")
+
+    async def _handle(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while line := await reader.readline():
+                try:
+                    req = json.loads(line)
+                except ValueError:
+                    reply = {'error': 'invalid JSON'}
+                else:
+                    if req.get('cmd') == 'stats':
+                        reply = self.stats()
+                    else:
+                        future = loop.create_future()
+                        await self._queue.put((req, future, loop.time()))
+                        reply = await future
+                writer.write(json.dumps(reply).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                if self._queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self._queue.get_nowait())
+
+            requests = [req for req, _, _ in batch]
+            try:
+                results = await loop.run_in_executor(self._executor, score_requests, requests, self.scorer)
+            except Exception as e:
+                self.errors += len(batch)
+                results = [{'error': str(e)}] * len(batch)
+            done = loop.time()
+            for (_, future, arrived), result in zip(batch, results):
+                self._latencies.append(done - arrived)
+                if not future.done():
+                    future.set_result(result)
+            self.requests += len(batch)
+            self.batches += 1
+
+def main():
+    parser = argparse.ArgumentParser(description='Score MACs flagged by host_hijack.zeek')
+    parser.add_argument('mac', nargs='?', default='unknown')
+    parser.add_argument('--serve', action='store_true', help='run the scoring daemon')
+    parser.add_argument('--stats', action='store_true', help="print the daemon's latency stats")
+    parser.add_argument('--features', help='JSON object of flow features to score with the MAC')
+    parser.add_argument('--socket', default=SOCKET_PATH)
+    parser.add_argument('--model', default='random_forest', help='registry model name')
+    parser.add_argument('--registry', default='models', help='model registry directory')
+    parser.add_argument('--max-batch', type=int, default=256)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    if args.serve:
+        daemon = ScoringDaemon(_load_scorer(args.model, args.registry), args.socket, args.max_batch,
+                               args.max_wait_ms / 1000)
+        asyncio.run(daemon.serve())
+        return 0
+
+    payload = {'cmd': 'stats'} if args.stats else {'mac': args.mac}
+    if args.features:
+        payload['features'] = json.loads(args.features)
+    try:
+        result = request(payload, args.socket)
+    except (OSError, ValueError) as e:
+        if args.stats:
+            print(f"[ml_detect] daemon not reachable: {e}", file=sys.stderr)
+            return 1
+        # No daemon: score in this process, loading the model only if there is something to score
+        scorer = _load_scorer(args.model, args.registry) if payload.get('features') else None
+        result = score_requests([payload], scorer)[0]
+    if 'error' in result:
+        print(f"[ml_detect] {result['error']}", file=sys.stderr)
+        return 1
+
+    # Zeek captures stdout
+    print(json.dumps(result))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())